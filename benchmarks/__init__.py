@@ -0,0 +1,137 @@
+"""
+An offline benchmark suite for steam.py's hot paths.
+
+Run it with ``python -m benchmarks``, see ``python -m benchmarks --help`` for the options.
+
+Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import statistics
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeAlias
+
+__all__ = (
+    "Benchmark",
+    "Result",
+    "BENCHMARKS",
+    "benchmark",
+    "measure",
+    "run",
+)
+
+Runner: TypeAlias = Callable[[], Awaitable[Any] | Any]
+Setup: TypeAlias = Callable[[int], Runner | Awaitable[Runner] | AsyncGenerator[Runner, None]]
+
+_measurements: ContextVar[dict[str, float]] = ContextVar("_measurements")
+
+
+@dataclass(slots=True)
+class Benchmark:
+    name: str
+    group: str
+    setup: Setup
+    items: int
+    unit: str
+
+    async def run(self, *, repeat: int, scale: float) -> Result:
+        items = max(1, round(self.items * scale))
+        measurements: dict[str, float] = {}
+        token = _measurements.set(measurements)
+        try:
+            async with self._runner(items) as runner:
+                await self._call(runner)  # warm up any caches
+                times: list[float] = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await self._call(runner)
+                    times.append(time.perf_counter() - start)
+        finally:
+            _measurements.reset(token)
+        return Result(self.name, self.group, items, self.unit, times, measurements)
+
+    @asynccontextmanager
+    async def _runner(self, items: int) -> AsyncGenerator[Runner, None]:
+        if inspect.isasyncgenfunction(self.setup):
+            async with asynccontextmanager(self.setup)(items) as runner:
+                yield runner
+            return
+        runner = self.setup(items)
+        yield await runner if inspect.isawaitable(runner) else runner
+
+    @staticmethod
+    async def _call(runner: Runner) -> None:
+        result = runner()
+        if inspect.isawaitable(result):
+            await result
+
+
+@dataclass(slots=True)
+class Result:
+    name: str
+    group: str
+    items: int
+    unit: str
+    times: list[float]
+    measurements: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def per_second(self) -> float:
+        return self.items / self.median
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "group": self.group,
+            "items": self.items,
+            "unit": self.unit,
+            "times": self.times,
+            "min": min(self.times),
+            "median": self.median,
+            "mean": statistics.fmean(self.times),
+            "stdev": statistics.stdev(self.times) if len(self.times) > 1 else 0.0,
+            "per_second": self.per_second,
+            "measurements": self.measurements,
+        }
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(*, items: int, unit: str = "items") -> Callable[[Setup], Setup]:
+    """Register a benchmark.
+
+    The decorated function is called with the number of items to benchmark with and returns the function to time. It
+    can be a coroutine function or an async generator that yields the function to time, to clean up after itself.
+    """
+
+    def decorator(setup: Setup) -> Setup:
+        group = setup.__module__.rpartition(".")[2].removeprefix("bench_")
+        name = f"{group}.{setup.__name__.removeprefix('bench_')}"
+        BENCHMARKS[name] = Benchmark(name, group, setup, items, unit)
+        return setup
+
+    return decorator
+
+
+def measure(name: str, value: float) -> None:
+    """Record a figure other than time for the running benchmark, e.g. the memory used per item. It's shown under the
+    benchmark's timings."""
+    _measurements.get()[name] = value
+
+
+async def run(benchmarks: list[Benchmark], *, repeat: int, scale: float) -> AsyncGenerator[Result, None]:
+    for bench in benchmarks:
+        yield await bench.run(repeat=repeat, scale=scale)
+        await asyncio.sleep(0)
@@ -0,0 +1,114 @@
+"""Run the benchmarks, optionally saving the results as JSON and comparing them against a previous run."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import importlib
+import json
+import pkgutil
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import steam
+
+from . import BENCHMARKS, Result, run
+
+
+def load_benchmarks() -> None:
+    for module in pkgutil.iter_modules([str(Path(__file__).parent)]):
+        if module.name.startswith("bench_"):
+            importlib.import_module(f"{__package__}.{module.name}")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ("git", "rev-parse", "HEAD"), capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args: argparse.Namespace) -> dict[str, Any]:
+    return {
+        "steam": steam.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "repeat": args.repeat,
+        "scale": args.scale,
+    }
+
+
+def compare(results: list[Result], baseline_path: Path, threshold: float) -> list[str]:
+    baseline = {result["name"]: result for result in json.loads(baseline_path.read_text())["results"]}
+    regressions: list[str] = []
+    print(f"\nCompared to {baseline_path}:")
+    for result in results:
+        try:
+            previous = baseline[result.name]
+        except KeyError:
+            continue
+        # compare throughput so runs with different --scale values are still comparable
+        change = result.per_second / previous["per_second"] - 1
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(result.name)
+        print(f"  {result.name:<32} {change:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    load_benchmarks()
+    benchmarks = [
+        bench
+        for name, bench in sorted(BENCHMARKS.items())
+        if not args.k or any(fnmatch.fnmatch(name, f"*{pattern}*") for pattern in args.k)
+    ]
+    if not benchmarks:
+        print("No benchmarks matched", file=sys.stderr)
+        return 1
+
+    results: list[Result] = []
+    print(f"{'benchmark':<32} {'items':>8} {'median':>10} {'min':>10} {'throughput':>22}")
+    async for result in run(benchmarks, repeat=args.repeat, scale=args.scale):
+        results.append(result)
+        print(
+            f"{result.name:<32} {result.items:>8} {result.median * 1000:>8.2f}ms {min(result.times) * 1000:>8.2f}ms "
+            f"{result.per_second:>14,.0f} {result.unit}/s"
+        )
+        for name, value in result.measurements.items():
+            print(f"  {name:<30} {value:>12,.2f}")
+
+    if args.json:
+        args.json.write_text(
+            json.dumps({"metadata": metadata(args), "results": [result.to_dict() for result in results]}, indent=2)
+        )
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+parser.add_argument("-k", action="append", help="only run benchmarks whose name contains this, can be repeated")
+parser.add_argument("--repeat", type=int, default=5, help="the number of timed runs of each benchmark")
+parser.add_argument("--scale", type=float, default=1.0, help="multiply the number of items in each benchmark by this")
+parser.add_argument("--json", type=Path, help="write the results and some metadata about the run to this file")
+parser.add_argument("--compare", type=Path, help="a file written by --json to compare the results against")
+parser.add_argument(
+    "--threshold",
+    type=float,
+    default=0.1,
+    help="the fractional drop in throughput from --compare counted as a regression, exits with 1 if there are any",
+)
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parser.parse_args())))
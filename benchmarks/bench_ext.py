@@ -0,0 +1,82 @@
+"""Benchmarks for the extensions."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from copy import copy
+from typing import Any
+
+import steam
+from steam._gc.state import APP
+from steam.ext import commands, csgo, tf2
+from steam.types.id import ContextID
+
+from . import benchmark, fixtures
+
+
+def gc_client(cls: type[tf2.Client | csgo.Client], items: int) -> tf2.Client | csgo.Client:
+    client = cls()
+    state = client._state
+    APP.set(cls._APP)
+    client._ready.set()  # update_backpack waits for this
+    backpack_cls = tf2.Backpack if cls is tf2.Client else csgo.Backpack
+    state.backpack = backpack_cls(
+        state,
+        fixtures.inventory(items, app_id=cls._APP.id),
+        owner=steam.PartialUser(state, fixtures.ID64),  # type: ignore
+        app=cls._APP,
+        context_id=ContextID(2),
+        language=None,
+    )
+    return client
+
+
+@benchmark(items=2_000)
+def bench_tf2_update_backpack(items: int) -> Callable[[], Coroutine[Any, Any, None]]:
+    """Merging a TF2 SO cache into the backpack."""
+    state = gc_client(tf2.Client, items)._state
+    cache = fixtures.tf2_so_cache(items)
+
+    def run() -> Coroutine[Any, Any, None]:
+        return state.update_backpack(*cache, is_cache_subscribe=True)  # type: ignore
+
+    return run
+
+
+@benchmark(items=2_000)
+def bench_csgo_update_backpack(items: int) -> Callable[[], Coroutine[Any, Any, Any]]:
+    """Merging a CS:GO SO cache with paint and kill eater attributes into the backpack."""
+    state = gc_client(csgo.Client, items)._state
+    cache = fixtures.csgo_so_cache(items)
+
+    def run() -> Coroutine[Any, Any, Any]:
+        return state.update_backpack(*cache, is_cache_subscribe=True)  # type: ignore
+
+    return run
+
+
+@benchmark(items=5_000, unit="messages")
+async def bench_process_commands(items: int) -> AsyncGenerator[Callable[[], Coroutine[Any, Any, None]], None]:
+    """Bot.process_commands parsing a prefix, finding the command and converting its arguments."""
+    calls = 0
+    bot = commands.Bot(command_prefix=("!", "?", ".", "$", "steam "))
+
+    @bot.command
+    async def add(_, first: int, second: int | None = None, *, rest: str) -> None:
+        nonlocal calls
+        calls += 1
+
+    from tests.unit.mocks import GROUP_MESSAGE
+
+    message = copy(GROUP_MESSAGE)
+    message.content = message.clean_content = steam.utils.BBCodeStr("steam add 1 2 some more text", [])
+
+    async with bot:
+
+        async def run() -> None:
+            for _ in range(items):
+                await bot.process_commands(message)
+
+        yield run
+
+    assert calls, "the command was never invoked"
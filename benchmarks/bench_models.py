@@ -0,0 +1,77 @@
+"""Benchmarks for building models from large responses."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import steam
+from steam._const import VDF_LOADS
+from steam.manifest import AppInfo, Manifest
+from steam.protobufs import app_info
+from steam.types.id import AppID, ContextID
+
+from . import benchmark, fixtures
+
+
+@benchmark(items=10_000)
+def bench_inventory_update(items: int) -> Callable[[], None]:
+    """Inventory._update matching assets to their descriptions."""
+    client = steam.Client()
+    state = client._state
+    proto = fixtures.inventory(items, app_id=440)
+    inventory = steam.Inventory[steam.Item[steam.User], steam.User](
+        state,
+        fixtures.inventory(0, app_id=440),
+        owner=steam.PartialUser(state, fixtures.ID64),  # type: ignore
+        app=steam.TF2,
+        context_id=ContextID(2),
+        language=None,
+    )
+
+    def run() -> None:
+        inventory._update(proto)
+
+    return run
+
+
+@benchmark(items=10_000, unit="files")
+def bench_manifest(items: int) -> Callable[[], None]:
+    """Unzipping and parsing a manifest then building its paths."""
+    state = steam.Client()._state
+    data = fixtures.manifest(items)
+
+    def run() -> None:
+        Manifest(state, None, AppID(440), data).paths  # type: ignore
+
+    return run
+
+
+@benchmark(items=2_000, unit="files")
+def bench_manifest_walk(items: int) -> Callable[[], None]:
+    """Walking every path in a manifest from its top level directories with ManifestPath.walk."""
+    manifest = Manifest(steam.Client()._state, None, AppID(440), fixtures.manifest(items))  # type: ignore
+    top_level = [path for path in manifest.paths if len(path.parts) == 1 and path != manifest.root]
+
+    def run() -> None:
+        for directory in top_level:
+            for _ in directory.walk():
+                pass
+
+    return run
+
+
+@benchmark(items=500, unit="apps")
+def bench_product_info(items: int) -> Callable[[], Any]:
+    """Decoding the VDF in fetch_product_info's responses and building AppInfos from them."""
+    state = steam.Client()._state
+    apps = [
+        app_info.CMsgClientPicsProductInfoResponseAppInfo(appid=440 + idx, buffer=fixtures.app_info_vdf(440 + idx))
+        for idx in range(items)
+    ]
+
+    def run() -> None:
+        for app in apps:  # the same as in ConnectionState.fetch_product_info
+            AppInfo(state, VDF_LOADS(app.buffer[:-1].decode("UTF-8", "replace"))["appinfo"], app)  # type: ignore
+
+    return run
@@ -0,0 +1,78 @@
+"""Benchmarks for running many accounts in one process."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gc
+import multiprocessing
+import tracemalloc
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from typing import TYPE_CHECKING, Any
+
+import steam
+from steam.replay import DEFAULT_ID64, FakeCMServer, LogonScenario, make_refresh_token
+
+from . import benchmark, measure
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+
+def serve(connection: Connection) -> None:
+    """Run a fake CM in another process until the connection to it is closed, so none of its allocations are traced
+    along with the clients'."""
+
+    async def main() -> None:
+        async with FakeCMServer(LogonScenario()) as server:
+            connection.send(server.url)
+            with contextlib.suppress(EOFError):
+                await asyncio.to_thread(connection.recv)
+
+    asyncio.run(main())
+
+
+async def measure_overhead(items: int) -> None:
+    """Measure what each account in a pool costs once they're all logged in."""
+    connection, child = multiprocessing.Pipe()
+    process = multiprocessing.get_context("spawn").Process(target=serve, args=(child,), daemon=True)
+    process.start()
+    child.close()
+    tracemalloc.start()
+    try:
+        url = await asyncio.to_thread(connection.recv)
+        async with steam.ClientPool(login_interval=0, cms=[url]) as pool:
+            # the first login imports and caches things every later one shares
+            await pool.login(pool.add(), refresh_token=make_refresh_token(DEFAULT_ID64))
+            await pool.wait_until_ready()
+            gc.collect()
+            before, _ = tracemalloc.get_traced_memory()
+            for idx in range(1, items + 1):
+                await pool.login(pool.add(), refresh_token=make_refresh_token(DEFAULT_ID64 + idx))
+            await pool.wait_until_ready()
+            gc.collect()
+            after, _ = tracemalloc.get_traced_memory()
+            clients = pool.clients[1:]
+            measure("KiB per account", (after - before) / items / 1024)
+            measure("connectors per account", len({client.http._session.connector for client in clients}) / items)
+            measure("connections per account", len(pool.connector._acquired) / (items + 1))
+    finally:
+        tracemalloc.stop()
+        connection.close()
+        await asyncio.to_thread(process.join)
+
+
+@benchmark(items=50, unit="clients")
+async def bench_login(items: int) -> AsyncGenerator[Callable[[], Coroutine[Any, Any, None]], None]:
+    """Logging in clients in a ClientPool to a local fake CM until every one is ready, then closing them. Also reports
+    the memory, connectors and connections each logged in account uses."""
+    await measure_overhead(items)
+    async with FakeCMServer(LogonScenario()) as server:
+
+        async def run() -> None:
+            async with steam.ClientPool(login_interval=0, cms=[server.url]) as pool:
+                for idx in range(items):
+                    await pool.login(pool.add(), refresh_token=make_refresh_token(DEFAULT_ID64 + idx))
+                await pool.wait_until_ready()
+
+        yield run
@@ -0,0 +1,123 @@
+"""Benchmarks for receiving and dispatching messages from the CM."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import itertools
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import steam
+from steam.gateway import EventListener, SteamWebSocket
+from steam.protobufs import EMsg, base, friend_messages
+from steam.replay import Recording, parse_frame
+
+from . import benchmark, fixtures
+
+
+def fake_ws(parsers: dict[EMsg, Callable[..., Any]], listeners: int = 0) -> Any:
+    """Enough of a websocket to call :meth:`SteamWebSocket.receive` on with some listeners waiting for other msgs."""
+    loop = asyncio.get_running_loop()
+    return SimpleNamespace(
+        _state=SimpleNamespace(parsers=parsers),
+        listeners=[
+            EventListener(msg=EMsg.ClientLogOnResponse, check=lambda _: False, future=loop.create_future())
+            for _ in range(listeners)
+        ],
+        _metrics=None,
+    )
+
+
+def mixed_frames(count: int) -> list[bytes]:
+    frames: list[bytes] = []
+    for idx in range(count):
+        if idx % 2:
+            frames.append(bytes(fixtures.persona_state(idx)))
+        else:
+            frames.append(
+                bytes(
+                    friend_messages.IncomingMessageNotification(
+                        steamid_friend=fixtures.ID64, chat_entry_type=1, message=f"message {idx}", ordinal=idx
+                    )
+                )
+            )
+    return frames
+
+
+@benchmark(items=10_000, unit="messages")
+async def bench_receive(items: int) -> Callable[[], None]:
+    """Decoding messages in SteamWebSocket.receive and checking them against waiting listeners."""
+    ws = fake_ws({EMsg.ClientPersonaState: lambda *_: None}, listeners=10)
+    frames = mixed_frames(items)
+    receive = SteamWebSocket.receive
+
+    def run() -> None:
+        for frame in frames:
+            receive(ws, frame)
+
+    return run
+
+
+@benchmark(items=10_000, unit="messages")
+async def bench_handle_multi(items: int) -> Callable[[], None]:
+    """Unpacking a gzipped CMsgMulti and receiving each message in it."""
+    ws = fake_ws({EMsg.ClientPersonaState: lambda *_: None})
+    state = SimpleNamespace(ws=SimpleNamespace(receive=lambda frame: SteamWebSocket.receive(ws, frame)))
+    body = fixtures.length_prefixed([bytes(fixtures.persona_state(idx)) for idx in range(items)])
+    msg = base.CMsgMulti(size_unzipped=len(body), message_body=gzip.compress(body))
+
+    def run() -> None:
+        steam.state.ConnectionState.handle_multi(state, msg)  # type: ignore
+
+    return run
+
+
+@benchmark(items=100, unit="multis")
+async def bench_handle_recorded_multi(items: int) -> Callable[[], None]:
+    """Unpacking the CMsgMultis in data/multi.rec.gz, recorded with :class:`~steam.replay.CMRecorder`, and receiving
+    each message in them."""
+    ws = fake_ws({EMsg.ClientPersonaState: lambda *_: None}, listeners=10)
+    state = SimpleNamespace(ws=SimpleNamespace(receive=lambda frame: SteamWebSocket.receive(ws, frame)))
+    recording = Recording.load(Path(__file__).parent / "data" / "multi.rec.gz")
+    recorded = [parse_frame(frame.data) for frame in recording if not frame.sent and frame.msg == EMsg.Multi]
+    msgs = list(itertools.islice(itertools.cycle(recorded), items))
+
+    def run() -> None:
+        for msg in msgs:
+            steam.state.ConnectionState.handle_multi(state, msg)  # type: ignore
+
+    return run
+
+
+@benchmark(items=10_000, unit="events")
+async def bench_dispatch(items: int) -> AsyncGenerator[Callable[[], Any], None]:
+    """Client.dispatch fanning events out to an event handler and wait_for listeners that don't match them."""
+    handled = 0
+
+    class Client(steam.Client):
+        async def on_typing(self, user: Any, when: Any) -> None:
+            nonlocal handled
+            handled += 1
+
+    async with Client() as client:
+        waiters = [
+            asyncio.create_task(client.wait_for("typing", check=lambda user, _, idx=idx: user == -idx))
+            for idx in range(1, 51)
+        ]
+        await asyncio.sleep(0)
+
+        async def run() -> None:
+            nonlocal handled
+            handled = 0
+            for idx in range(items):
+                client.dispatch("typing", idx, None)
+            while handled < items:
+                await asyncio.sleep(0)
+
+        yield run
+
+        for waiter in waiters:
+            waiter.cancel()
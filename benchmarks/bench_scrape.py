@@ -0,0 +1,64 @@
+"""Benchmarks for pulling values out of saved community pages, against the BeautifulSoup fallbacks."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+from steam import _scrape
+
+from . import benchmark
+
+DATA = Path(__file__).parent / "data"
+
+
+def saved_page(name: str) -> str:
+    return (DATA / name).read_text(encoding="utf-8")
+
+
+@benchmark(items=50, unit="pages")
+def bench_clan_members(items: int) -> Callable[[], None]:
+    """Extracting the members from data/clan_members.html, a page of a clan's member list."""
+    page = saved_page("clan_members.html")
+
+    def run() -> None:
+        for _ in range(items):
+            _scrape.clan_members_page(page)
+
+    return run
+
+
+@benchmark(items=5, unit="pages")
+def bench_clan_members_soup(items: int) -> Callable[[], None]:
+    """Extracting the members from data/clan_members.html with BeautifulSoup."""
+    page = saved_page("clan_members.html")
+
+    def run() -> None:
+        for _ in range(items):
+            _scrape._clan_members_page_soup(page)
+
+    return run
+
+
+@benchmark(items=200, unit="pages")
+def bench_inventory_info(items: int) -> Callable[[], None]:
+    """Extracting the inventories listed on data/inventory.html, a user's inventory page."""
+    page = saved_page("inventory.html")
+
+    def run() -> None:
+        for _ in range(items):
+            _scrape.inventory_info(_scrape.INVENTORY_INFO_RE.search(page), page)
+
+    return run
+
+
+@benchmark(items=5, unit="pages")
+def bench_inventory_info_soup(items: int) -> Callable[[], None]:
+    """Extracting the inventories listed on data/inventory.html with BeautifulSoup."""
+    page = saved_page("inventory.html")
+
+    def run() -> None:
+        for _ in range(items):
+            _scrape.inventory_info(None, page)
+
+    return run
@@ -0,0 +1,220 @@
+"""Synthetic but representative data for the benchmarks, nothing here touches the network."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from typing import TYPE_CHECKING
+
+import vdf
+
+from steam._const import WRITE_U32
+from steam.enums import DepotFileFlag
+from steam.manifest import (
+    END_OF_MANIFEST_MAGIC,
+    METADATA_MAGIC,
+    PAYLOAD_MAGIC,
+    SIGNATURE_MAGIC,
+)
+from steam.protobufs import content_manifest, econ, friends
+from steam.utils import StructIO
+
+if TYPE_CHECKING:
+    from steam.ext.csgo.protobufs import base as csgo_base
+    from steam.ext.tf2.protobufs import base as tf2_base
+
+ID64 = 76561198000000000
+
+
+def persona_state(idx: int) -> friends.CMsgClientPersonaState:
+    return friends.CMsgClientPersonaState(
+        status_flags=idx,
+        friends=[
+            friends.CMsgClientPersonaStateFriend(
+                friendid=ID64 + idx,
+                player_name=f"user {idx}",
+                avatar_hash=idx.to_bytes(20, "little"),
+                persona_state=1,
+                game_name="Testing steam.py",
+                gameid=440,
+            )
+        ],
+    )
+
+
+def inventory(
+    items: int, *, app_id: int, descriptions: int | None = None
+) -> econ.GetInventoryItemsWithDescriptionsResponse:
+    """An inventory with ``items`` assets that share ``descriptions`` descriptions, defaulting to one per 10 items."""
+    descriptions = descriptions or max(1, items // 10)
+    return econ.GetInventoryItemsWithDescriptionsResponse(
+        assets=[
+            econ.Asset(
+                appid=app_id,
+                contextid=2,
+                assetid=idx + 1,
+                classid=idx % descriptions,
+                instanceid=0,
+                amount=1,
+            )
+            for idx in range(items)
+        ],
+        descriptions=[
+            econ.ItemDescription(
+                appid=app_id,
+                classid=idx,
+                instanceid=0,
+                market_name=f"Item {idx}",
+                market_hash_name=f"Item {idx}",
+                name=f"Item {idx}",
+                type="Level 1 Thing",
+                icon_url="icon",
+                tradable=True,
+                marketable=True,
+                tags=[econ.ItemTag(category="Quality", internal_name="Unique", localized_tag_name="Unique")],
+            )
+            for idx in range(descriptions)
+        ],
+        total_inventory_count=items,
+    )
+
+
+def tf2_so_cache(items: int) -> list[tf2_base.Item]:
+    from steam.ext.tf2.protobufs import base
+
+    return [
+        base.Item(
+            id=idx + 1,
+            account_id=ID64 & 0xFFFFFFFF,
+            inventory=idx + 1,
+            def_index=5000 + idx % 3,
+            quantity=1,
+            level=1,
+            quality=6,
+            flags=0,
+            origin=idx % 20,
+        )
+        for idx in range(items)
+    ]
+
+
+def csgo_so_cache(items: int) -> list[csgo_base.Item]:
+    from steam.ext.csgo.protobufs import base
+
+    return [
+        base.Item(
+            id=idx + 1,
+            account_id=ID64 & 0xFFFFFFFF,
+            inventory=idx + 1,
+            def_index=7,
+            quantity=1,
+            level=1,
+            quality=4,
+            flags=0,
+            origin=8,
+            attribute=[
+                base.ItemAttribute(def_index=6, value_bytes=(idx % 1000).to_bytes(4, "little")),  # paint index
+                base.ItemAttribute(def_index=80, value_bytes=idx.to_bytes(4, "little")),  # kill eater
+            ],
+        )
+        for idx in range(items)
+    ]
+
+
+def manifest(files: int, *, files_per_directory: int = 50) -> bytes:
+    """A zipped manifest with ``files`` files spread over directories nested up to three deep."""
+    mappings: list[content_manifest.PayloadFileMapping] = []
+    directories: set[str] = set()
+    for idx in range(files):
+        directory_idx = idx // files_per_directory
+        parts = [f"dir{directory_idx % 7}", f"sub{directory_idx % 5}", f"leaf{directory_idx}"]
+        for depth in range(1, len(parts) + 1):
+            directories.add("\\".join(parts[:depth]))
+        mappings.append(
+            content_manifest.PayloadFileMapping(
+                filename="\\".join((*parts, f"file{idx}.bin")),
+                size=idx,
+                flags=DepotFileFlag.ReadOnly,
+                chunks=[content_manifest.PayloadFileMappingChunkData(sha=b"\x00" * 20, cb_original=idx)],
+            )
+        )
+    mappings += (
+        content_manifest.PayloadFileMapping(filename=directory, flags=DepotFileFlag.Directory)
+        for directory in sorted(directories)
+    )
+    payload = bytes(content_manifest.Payload(mappings=mappings))
+    metadata = bytes(content_manifest.Metadata(depot_id=441, gid_manifest=1, creation_time=1))
+    signature = bytes(content_manifest.Signature(signature=b"\x00" * 128))
+
+    with StructIO() as data:
+        for magic, section in ((PAYLOAD_MAGIC, payload), (METADATA_MAGIC, metadata), (SIGNATURE_MAGIC, signature)):
+            data.write_u32(magic)
+            data.write_u32(len(section))
+            data.write(section)
+        data.write_u32(END_OF_MANIFEST_MAGIC)
+        raw = data.buffer
+
+    file = io.BytesIO()
+    with zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("z", raw)
+    return file.getvalue()
+
+
+def app_info_vdf(app_id: int, *, depots: int = 20, languages: int = 25) -> bytes:
+    """The product info buffer for an app, null terminated like the ones in CMsgClientPicsProductInfoResponse."""
+    language_names = (
+        "english", "german", "french", "italian", "spanish", "schinese", "tchinese", "japanese", "koreana"
+    )
+    app_info = {
+        "appid": str(app_id),
+        "common": {
+            "name": f"App {app_id}",
+            "type": "Game",
+            "oslist": "windows,macos,linux",
+            "icon": "icon",
+            "logo": "logo",
+            "metacritic_name": "App",
+            "metacritic_score": "90",
+            "metacritic_fullurl": "https://www.metacritic.com",
+            "controller_support": "full",
+            "steam_release_date": "1600000000",
+            "review_score": "9",
+            "review_percentage": "95",
+            "community_visible_stats": "1",
+            "community_hub_visible": "1",
+            "workshop_visible": "1",
+            "languages": {language_names[idx % len(language_names)]: "1" for idx in range(languages)},
+            "store_tags": {str(idx): str(1000 + idx) for idx in range(20)},
+            "genres": {"0": "1", "1": "25"},
+            "category": {"category_1": "1", "category_2": "1", "category_22": "1"},
+            "associations": {
+                "0": {"type": "developer", "name": "A Developer"},
+                "1": {"type": "publisher", "name": "A Publisher"},
+            },
+        },
+        "extended": {
+            "developer": "A Developer",
+            "homepage": "https://example.com",
+            "listofdlc": ",".join(str(app_id + 100 + idx) for idx in range(30)),
+        },
+        "config": {"installdir": "App", "launch": {"0": {"executable": "app.exe", "type": "default"}}},
+        "depots": {
+            **{
+                str(app_id + idx): {
+                    "name": f"Depot {idx}",
+                    "config": {"oslist": "windows"},
+                    "manifests": {"public": {"gid": str(idx * 1000), "size": str(idx * 10), "download": str(idx)}},
+                }
+                for idx in range(depots)
+            },
+            "branches": {
+                "public": {"buildid": "1", "timeupdated": "1600000000"},
+                "beta": {"buildid": "2", "description": "beta", "timeupdated": "1600000000"},
+            },
+        },
+    }
+    return vdf.dumps({"appinfo": app_info}, pretty=True).encode() + b"\x00"
+
+
+def length_prefixed(frames: list[bytes]) -> bytes:
+    return b"".join(WRITE_U32(len(frame)) + frame for frame in frames)
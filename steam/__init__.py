@@ -14,13 +14,17 @@ from .achievement import *
 from .app import *
 from .badge import *
 from .bundle import *
+from .cache import *
+from .catalogue import *
 from .channel import *
 from .clan import *
 from .client import *
 from .comment import *
+from .dispatcher import *
 from .enums import *
 from .errors import *
 from .event import *
+from .fleet import *
 from .friend import *
 from .game_server import *
 from .group import *
@@ -30,8 +34,10 @@ from .leaderboard import *
 from .manifest import *
 from .media import *
 from .message import *
+from .metrics import *
 from .models import *
 from .package import *
+from .pool import *
 from .post import *
 from .profile import *
 from .published_file import *
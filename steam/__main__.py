@@ -1,6 +1,9 @@
 """Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE"""
 
+import argparse
 import platform
+import subprocess
+import sys
 
 import aiohttp
 import betterproto
@@ -8,7 +11,7 @@ import betterproto
 import steam
 
 
-def main() -> None:
+def show_version() -> None:
     print("python version:", platform.python_version())
     print("steam.py version:", steam.__version__)
     print("aiohttp version:", aiohttp.__version__)
@@ -16,5 +19,42 @@ def main() -> None:
     print("operating system info:", platform.platform())
 
 
+def show_import_time(limit: int) -> None:
+    # this has to be done in a fresh interpreter as we've already imported everything
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import steam"], capture_output=True, text=True, check=True
+    )
+    timings: list[tuple[int, int, str]] = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        timings.append((int(cumulative_us), int(self_us), name.strip()))
+
+    total = next(cumulative for cumulative, _, name in timings if name == "steam")
+    print(f"import steam took {total / 1000:.1f}ms")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative, self_, name in sorted(timings, reverse=True)[:limit]:
+        print(f"{cumulative / 1000:>10.1f}ms {self_ / 1000:>8.1f}ms  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m steam", description="Show information about steam.py.")
+    parser.add_argument(
+        "--import-time",
+        metavar="N",
+        nargs="?",
+        type=int,
+        const=25,
+        help="show the N modules that take the longest to import when importing steam (defaults to 25)",
+    )
+    args = parser.parse_args()
+
+    if args.import_time is not None:
+        show_import_time(args.import_time)
+    else:
+        show_version()
+
+
 if __name__ == "__main__":
     main()
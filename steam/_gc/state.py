@@ -13,7 +13,7 @@ from .._const import CLEAR_PROTO_BIT, IS_PROTO
 from ..app import App
 from ..protobufs import GCMessage, GCProtobufMessage, friends
 from ..protobufs.emsg import EMsg
-from ..state import ConnectionState, ParserCallback
+from ..state import ConnectionState, ParserCallback, parser_message_type
 from ..trade import Inventory, Item
 from ..types.id import AppID, AssetID, ContextID
 
@@ -24,7 +24,6 @@ if TYPE_CHECKING:
 
     from ..gateway import GCMsgs
     from ..protobufs.client_server_2 import CMsgGcClientFromGC
-    from ..utils import cached_property
     from .client import Client, ClientUser
 
 log = logging.getLogger(__name__)
@@ -63,7 +62,7 @@ class GCState(ConnectionState, Generic[Inv]):
     _APP: Final[App]  # type: ignore
     if TYPE_CHECKING:
 
-        @cached_property
+        @property
         def user(self) -> ClientUser: ...
 
     def __init__(self, client: Client, **kwargs: Any):
@@ -86,12 +85,10 @@ class GCState(ConnectionState, Generic[Inv]):
     def __init_subclass__(cls) -> None:
         cls.gc_parsers = {}
         for _, func in inspect.getmembers(cls, lambda x: inspect.isfunction(x) and hasattr(x, "__parser__")):
-            try:
-                params = list(inspect.get_annotations(func, eval_str=True).values())
-            except NameError:
+            if (msg_type := parser_message_type(func)) is None:
                 continue
             msg = (
-                args[0] if (args := get_args(params[0])) else params[0]
+                args[0] if (args := get_args(msg_type)) else msg_type
             )  # if it's a union only use the first type (Message | None or Message | Any)
             cls.gc_parsers[msg] = func
 
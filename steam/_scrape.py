@@ -0,0 +1,191 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE
+
+Fast extraction of the few values needed from scraped community pages.
+
+Each page only needs a handful of attributes pulled out of it, so rather than building a whole BeautifulSoup tree (which
+without lxml installed means a pure Python parser) they are found with targeted regexes. If the markup changes so the
+regexes stop matching, the BeautifulSoup version of each extractor is used instead.
+"""
+
+from __future__ import annotations
+
+import codecs
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Final
+
+from bs4 import BeautifulSoup
+
+from ._const import HTML_PARSER, JSON_LOADS
+from .id import CLAN_ID64_FROM_URL_REGEX, parse_id64
+from .types.id import ID32, ID64
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from .types import user
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE: Final = 64 * 1024
+
+ATTRIBUTE_RE: Final = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+MEMBER_LIST_RE: Final = re.compile(r"""<div[^>]*\bid=["']memberList["']""")
+MEMBER_BLOCK_RE: Final = re.compile(
+    r"""<div(?=[^>]*\bclass=["'][^"']*\bmember_block\b)[^>]*\bdata-miniprofile=["'](\d+)["']"""
+)
+GROUP_PAGING_RE: Final = re.compile(r"""<div[^>]*\bclass=["']group_paging["'][^>]*>""")
+PAGE_COUNT_RE: Final = re.compile(r"\d* - (\d+)")
+TAG_RE: Final = re.compile(r"<[^>]+>")
+LINK_STANDARD_RE: Final = re.compile(r"""<a\b(?=[^>]*\bclass=["'][^"']*\blinkStandard\b)([^>]*)>""")
+ANNOUNCEMENT_GUID_RE: Final = re.compile(r"<guid\b[^>]*>[^<]*?announcements/detail/(\d+)")
+EVENT_TITLE_RE: Final = re.compile(
+    r"""<div[^>]*\bclass=["'][^"']*\beventBlockTitle\b[^"']*["'][^>]*>\s*<a\b[^>]*\bhref=["']([^"']*)["']"""
+)
+INVENTORY_INFO_RE: Final = re.compile(r"var\s+g_rgAppContextData\s*=\s*(?P<json>{.*?});\s*")
+
+
+def _attributes(tag: str) -> dict[str, str]:
+    return {name: double or single for name, double, single in ATTRIBUTE_RE.findall(tag)}
+
+
+async def read_text(r: aiohttp.ClientResponse) -> str:
+    """Decode a response's body using the charset it was sent with.
+
+    :meth:`aiohttp.ClientResponse.text` guesses the encoding of responses that don't give a charset, which is slow for
+    large pages, Steam always uses UTF-8.
+    """
+    body = await r.read()
+    try:
+        return body.decode(r.charset or "utf-8")
+    except (UnicodeDecodeError, LookupError):
+        return await r.text()
+
+
+async def search(r: aiohttp.ClientResponse, pattern: re.Pattern[str]) -> tuple[re.Match[str] | None, str]:
+    """Read a response until ``pattern`` matches, returning the match and the text read so far.
+
+    The rest of the body isn't read once the match is found. ``pattern`` must not be able to match differently once
+    more text is read, e.g. a lazy pattern ending in a terminator.
+    """
+    decoder = codecs.getincrementaldecoder(r.charset or "utf-8")(errors="replace")
+    text = ""
+    async for chunk in r.content.iter_chunked(CHUNK_SIZE):
+        text += decoder.decode(chunk)
+        if (match := pattern.search(text)) is not None:
+            return match, text
+    text += decoder.decode(b"", final=True)
+    return pattern.search(text), text
+
+
+def clan_members_page(html: str) -> tuple[int, list[ID32]]:
+    """Get the number of pages and the members on a page of a clan's member list."""
+    paging = GROUP_PAGING_RE.search(html)
+    member_list = MEMBER_LIST_RE.search(html)
+    ids = [ID32(int(id)) for id in MEMBER_BLOCK_RE.findall(html, member_list.end())] if member_list else []
+    if paging is None or (not ids and "member_block" in html):
+        return _clan_members_page_soup(html)
+    # the paging controls come before the member list, only their text is needed
+    end = member_list.start() if member_list and member_list.start() > paging.end() else paging.end() + 4096
+    if not (page_count := PAGE_COUNT_RE.search(TAG_RE.sub("", html[paging.end() : end]))):
+        return _clan_members_page_soup(html)
+    return int(page_count[1]), ids
+
+
+def _clan_members_page_soup(html: str) -> tuple[int, list[ID32]]:
+    log.debug("Falling back to BeautifulSoup to parse a clan's members")
+    soup = BeautifulSoup(html, "html.parser")
+    page_select = soup.find("div", class_="group_paging")
+    assert page_select is not None
+    return int(PAGE_COUNT_RE.findall(page_select.text)[0]), [
+        ID32(int(user["data-miniprofile"]))  # type: ignore
+        for s in soup.find_all("div", id="memberList")
+        for user in s.find_all("div", class_="member_block")
+    ]
+
+
+def clan_invitees(html: str) -> dict[ID64, ID64]:
+    """Get the clans the client user has been invited to and who invited them from their pending invites."""
+    elements = [_attributes(match[1]) for match in LINK_STANDARD_RE.finditer(html)]
+    if not elements and "linkStandard" in html:
+        return _clan_invitees_soup(html)
+    try:
+        return _pair_clan_invitees(elements)
+    except (KeyError, TypeError, ValueError):
+        return _clan_invitees_soup(html)
+
+
+def _clan_invitees_soup(html: str) -> dict[ID64, ID64]:
+    log.debug("Falling back to BeautifulSoup to parse clan invites")
+    soup = BeautifulSoup(html, HTML_PARSER)
+    elements: list[Any] = [element.attrs for element in soup.find_all("a", class_="linkStandard")]
+    for element in elements:
+        if isinstance(element.get("class"), list):
+            element["class"] = " ".join(element["class"])
+    return _pair_clan_invitees(elements)
+
+
+def _pair_clan_invitees(elements: list[dict[str, str]]) -> dict[ID64, ID64]:
+    # N.B. can only be invited by one person at a time
+    return {
+        ID64(int(CLAN_ID64_FROM_URL_REGEX.search(clan_element["href"])["steamid"])): parse_id64(  # type: ignore
+            invitee_element["data-miniprofile"]
+        )
+        for (clan_element, invitee_element) in zip(
+            (element for element in elements if "steamLink" in element.get("class", "").split()),
+            (element for element in elements if "data-miniprofile" in element),
+        )
+    }
+
+
+def clan_announcement_ids(rss: str) -> list[int]:
+    """Get the IDs of the announcements in a clan's RSS feed."""
+    ids = [int(id) for id in ANNOUNCEMENT_GUID_RE.findall(rss)]
+    if not ids and "announcements/detail/" in rss:
+        return _clan_announcement_ids_soup(rss)
+    return ids
+
+
+def _clan_announcement_ids_soup(rss: str) -> list[int]:
+    log.debug("Falling back to BeautifulSoup to parse a clan's announcements")
+    soup = BeautifulSoup(rss, HTML_PARSER)
+    return [
+        int(match[0])
+        for url in soup.find_all("guid")
+        if (match := re.findall(r"announcements/detail/(\d+)", url.text))
+    ]
+
+
+def clan_event_ids(xml: str) -> list[int]:
+    """Get the IDs of the events in a month of a clan's event feed."""
+    urls = EVENT_TITLE_RE.findall(xml)
+    if not urls and "eventBlockTitle" in xml:
+        return _clan_event_ids_soup(xml)
+    return [int(url.rpartition("/")[2]) for url in urls if url]
+
+
+def _clan_event_ids_soup(xml: str) -> list[int]:
+    log.debug("Falling back to BeautifulSoup to parse a clan's events")
+    soup = BeautifulSoup(xml, HTML_PARSER)
+    return [
+        int(url.rpartition("/")[2])
+        for event_title in soup.find_all("div", class_="eventBlockTitle")
+        if event_title.a is not None and (url := event_title.a.get("href"))
+    ]
+
+
+def inventory_info(match: re.Match[str] | None, html: str) -> dict[str, user.InventoryInfo]:
+    """Get the info about a user's inventories from the result of searching their inventory page for
+    :data:`INVENTORY_INFO_RE`."""
+    if match is None:
+        match = _inventory_info_soup(html)
+    return JSON_LOADS(match["json"])
+
+
+def _inventory_info_soup(html: str) -> re.Match[str]:
+    log.debug("Falling back to BeautifulSoup to parse inventory info")
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup.find_all("script", type="text/javascript"):
+        if match := INVENTORY_INFO_RE.search(script.text):
+            return match
+    raise ValueError("Could not find inventory info")
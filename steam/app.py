@@ -50,7 +50,7 @@ if TYPE_CHECKING:
     from .state import ConnectionState
     from .store import AppStoreItem
     from .types import app
-    from .types.user import Author
+    from .types.user import AuthenticateUserTicketParams, Author
 
 __all__ = (
     "App",
@@ -82,6 +82,8 @@ __all__ = (
 
 T = TypeVar("T")
 APP_ID_MAX: Final = AppID((1 << 32) - 1)
+MAX_CONCURRENT_VERIFICATIONS: Final = 8
+"""The most tickets :meth:`AuthenticationTicket.verify_many` verifies at once."""
 NameT = TypeVar("NameT", bound=str | None, default=str | None, covariant=True)
 
 
@@ -292,6 +294,7 @@ class AuthenticationTicket(OwnershipTicket):
 
     __slots__ = (
         "auth_ticket",
+        "crc",
         "gc_token",
         "gc_token_created_at",
         "client_ip",
@@ -303,6 +306,8 @@ class AuthenticationTicket(OwnershipTicket):
         self.auth_ticket = bytes(ticket.getbuffer()[ticket.position - 4 : ticket.position - 4 + 52])
         """The authentication ticket for the app. The first 52 bytes of the ticket."""
         # this is the part that's passed back to Steam for validation
+        self.crc = crc32(self.auth_ticket)
+        """The CRC32 of :attr:`auth_ticket`, which Steam uses to refer to the ticket."""
 
         self.gc_token = ticket.read_u64()
         """The Game Connect token for the app."""
@@ -337,13 +342,51 @@ class AuthenticationTicket(OwnershipTicket):
         publisher_api_key
             The publisher API key to use for verification. If not provided, will use the standard (rate limited) API.
         """
-        data = await self._state.http.verify_app_ticket(self.app.id, self._ticket.buffer.hex(), publisher_api_key)
-        return AuthenticationTicketVerificationResult(
-            Result[data["result"]],
-            *await self._state._maybe_users((ID64(int(data["steamid"])), ID64(int(data["ownersteamid"])))),
-            vac_banned=data["vacbanned"],
-            publisher_banned=data["publisherbanned"],
+        (result,) = await self.verify_many((self,), publisher_api_key=publisher_api_key)
+        return result
+
+    @staticmethod
+    async def verify_many(
+        tickets: Sequence[AuthenticationTicket], *, publisher_api_key: str | None = None
+    ) -> list[AuthenticationTicketVerificationResult]:
+        """Verify many tickets with the web API at once.
+
+        The tickets are verified concurrently, a few at a time, and the users for every result are fetched together.
+
+        Parameters
+        ----------
+        tickets
+            The tickets to verify.
+        publisher_api_key
+            The publisher API key to use for verification. If not provided, will use the standard (rate limited) API.
+
+        Returns
+        -------
+        The results in the same order as ``tickets``.
+        """
+        if not tickets:
+            return []
+        state = tickets[0]._state
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_VERIFICATIONS)
+
+        async def verify(ticket: AuthenticationTicket) -> AuthenticateUserTicketParams:
+            async with semaphore:
+                return await state.http.verify_app_ticket(ticket.app.id, ticket._ticket.buffer.hex(), publisher_api_key)
+
+        datas = await asyncio.gather(*map(verify, tickets))
+        users = await state._maybe_users(
+            ID64(int(id64)) for data in datas for id64 in (data["steamid"], data["ownersteamid"])
         )
+        return [
+            AuthenticationTicketVerificationResult(
+                Result[data["result"]],
+                users[idx * 2],
+                users[idx * 2 + 1],
+                vac_banned=data["vacbanned"],
+                publisher_banned=data["publisherbanned"],
+            )
+            for idx, data in enumerate(datas)
+        ]
 
     async def activate(self) -> None:
         """Activate the ticket."""
@@ -0,0 +1,316 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Final, TypeAlias
+
+from .enums import Currency
+from .models import PriceOverview
+from .types.id import AppID
+from .utils import DateTime
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+    from datetime import datetime
+
+    from .models import PriceOverviewDict
+    from .state import ConnectionState
+    from .types.id import ID32
+    from .user import User
+
+__all__ = (
+    "UserCache",
+    "PriceCache",
+)
+
+log = logging.getLogger(__name__)
+
+PriceKey: TypeAlias = tuple[AppID, str, Currency]
+FOREGROUND: Final = 0
+"""The priority of prices fetched by :meth:`Client.fetch_price` and :meth:`Item.price`."""
+BACKGROUND: Final = 1
+"""The priority of prices fetched to warm the cache."""
+
+
+def _check_owner(cache: UserCache | PriceCache, state: ConnectionState) -> None:
+    owner = cache._owner() if cache._owner is not None else None
+    if owner is not None and owner is not state:
+        raise ValueError(f"{cache.__class__.__name__} instances can't be shared between clients")
+
+
+class UserCache:
+    """How a :class:`Client` caches the users it has fetched.
+
+    Every user is kept in a weak map, so a user is available from :meth:`Client.get_user` for as long as something
+    references it. On top of that up to ``max_size`` of the most recently used users are kept alive, so users that
+    come up again in trades, comments or chat history aren't fetched again. Users kept alive for longer than ``ttl``
+    seconds without their persona being updated are fetched again the next time they are needed.
+
+    Persona updates the CM pushes for cached users count as refreshing them.
+
+    An instance can't be shared between clients, passing it to a second client raises :exc:`ValueError`.
+
+    Parameters
+    ----------
+    max_size
+        The maximum number of users to keep alive. ``0`` only keeps users in the weak map.
+    ttl
+        The time in seconds a user is fresh for after it was last fetched or updated. ``None`` never expires users.
+    """
+
+    __slots__ = ("max_size", "ttl", "hits", "misses", "evictions", "_weak", "_strong", "_owner")
+
+    def __init__(self, *, max_size: int = 1000, ttl: float | None = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        """The number of users found fresh in the cache instead of being fetched."""
+        self.misses = 0
+        """The number of users that had to be fetched as they weren't cached or were stale."""
+        self.evictions = 0
+        """The number of users dropped from the most recently used users to make space."""
+        self._weak: weakref.WeakValueDictionary[ID32, User] = weakref.WeakValueDictionary()
+        self._strong: OrderedDict[ID32, tuple[User, float]] = OrderedDict()  # the user and when it was last refreshed
+        self._owner: weakref.ref[ConnectionState] | None = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} max_size={self.max_size} ttl={self.ttl} users={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._weak)
+
+    def __contains__(self, id: ID32) -> bool:
+        return id in self._weak
+
+    def __getitem__(self, id: ID32) -> User:
+        return self._weak[id]
+
+    def _bind(self, state: ConnectionState) -> None:
+        _check_owner(self, state)
+        self._owner = weakref.ref(state)
+
+    def get(self, id: ID32) -> User | None:
+        """Get a user from the cache regardless of how fresh it is."""
+        return self._weak.get(id)
+
+    def lookup(self, id: ID32) -> User | None:
+        """Get a fresh user from the cache, returning ``None`` if it needs fetching. Counts towards :attr:`hits` and
+        :attr:`misses`."""
+        try:
+            user, refreshed = self._strong[id]
+        except KeyError:
+            user = self._weak.get(id)  # kept alive elsewhere, as fresh as it always was
+        else:
+            if self.ttl is not None and time.monotonic() - refreshed >= self.ttl:
+                self.misses += 1
+                return None
+            self._strong.move_to_end(id)
+
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+
+    def store(self, user: User) -> None:
+        """Add a user to the cache or mark it as refreshed."""
+        self._weak[user.id] = user
+        if not self.max_size:
+            return
+        self._strong[user.id] = (user, time.monotonic())
+        self._strong.move_to_end(user.id)
+        if len(self._strong) > self.max_size:
+            self._strong.popitem(last=False)
+            self.evictions += 1
+
+    def values(self) -> list[User]:
+        """Every cached user."""
+        return list(self._weak.values())
+
+    def clear(self) -> None:
+        """Remove every user from the cache."""
+        self._weak.clear()
+        self._strong.clear()
+
+
+class PriceCache:
+    """How a :class:`Client` caches the prices it fetches from the Steam Community Market.
+
+    ``market/priceoverview`` only allows around 20 requests a minute, so prices are fetched one at a time from a queue,
+    spaced ``interval`` seconds apart. Prices for :meth:`Client.fetch_price` and :meth:`Item.price` skip ahead of the
+    ones fetched by :meth:`Inventory.fetch_prices`, and requests for a price that is already queued share its request.
+
+    Prices are kept for ``ttl`` seconds, after which they are fetched again the next time they are needed. If fetching
+    the new price fails the old one is returned instead, with :attr:`PriceOverview.stale` set.
+
+    An instance can't be shared between clients, passing it to a second client raises :exc:`ValueError`.
+
+    Parameters
+    ----------
+    ttl
+        The time in seconds a price is fresh for after it was fetched.
+    interval
+        The time in seconds to wait between fetching prices.
+    max_size
+        The maximum number of prices to keep, the least recently used are evicted first.
+    """
+
+    __slots__ = (
+        "ttl",
+        "interval",
+        "max_size",
+        "hits",
+        "misses",
+        "evictions",
+        "_prices",
+        "_pending",
+        "_queue",
+        "_counter",
+        "_worker",
+        "_next_request",
+        "_fetch",
+        "_owner",
+    )
+
+    def __init__(self, *, ttl: float = 600.0, interval: float = 3.0, max_size: int = 10_000):
+        self.ttl = ttl
+        self.interval = interval
+        self.max_size = max_size
+        self.hits = 0
+        """The number of prices found fresh in the cache instead of being fetched."""
+        self.misses = 0
+        """The number of prices that had to be fetched as they weren't cached or were stale."""
+        self.evictions = 0
+        """The number of prices dropped to make space."""
+        self._prices: OrderedDict[PriceKey, tuple[PriceOverviewDict, float, datetime]] = OrderedDict()
+        self._pending: dict[PriceKey, asyncio.Future[PriceOverview]] = {}
+        self._queue: list[tuple[int, int, PriceKey]] = []  # a heap of (priority, order queued, key)
+        self._counter = itertools.count()
+        self._worker: asyncio.Task[None] | None = None
+        self._next_request = 0.0
+        self._fetch: Callable[[AppID, str, Currency], Coroutine[Any, Any, PriceOverviewDict]] | None = None
+        self._owner: weakref.ref[ConnectionState] | None = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} ttl={self.ttl} interval={self.interval} prices={len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def _bind(self, state: ConnectionState) -> None:
+        _check_owner(self, state)
+        self._owner = weakref.ref(state)
+        self._fetch = state.http.get_price
+
+    @property
+    def queued(self) -> int:
+        """The number of prices waiting to be fetched."""
+        return len(self._pending)
+
+    def get(self, app_id: int, name: str, currency: Currency | None = None) -> PriceOverview | None:
+        """Get a price from the cache regardless of how fresh it is, without fetching it.
+
+        Parameters
+        ----------
+        app_id
+            The ID of the app the item is from.
+        name
+            The market hash name of the item.
+        currency
+            The currency of the price, defaults to :attr:`Currency.USD`.
+        """
+        key = (AppID(app_id), name, currency or Currency.USD)
+        try:
+            data, refreshed, fetched_at = self._prices[key]
+        except KeyError:
+            return None
+        stale = time.monotonic() - refreshed >= self.ttl
+        return PriceOverview(data, key[2], fetched_at=fetched_at, stale=stale)
+
+    async def fetch(
+        self, app_id: int, name: str, currency: Currency | None = None, *, priority: int = FOREGROUND
+    ) -> PriceOverview:
+        """Get a fresh price from the cache, fetching it if it needs to be. Counts towards :attr:`hits` and
+        :attr:`misses`."""
+        key = (AppID(app_id), name, currency or Currency.USD)
+        cached = self._prices.get(key)
+        if cached is not None:
+            data, refreshed, fetched_at = cached
+            if time.monotonic() - refreshed < self.ttl:
+                self.hits += 1
+                self._prices.move_to_end(key)
+                return PriceOverview(data, key[2], fetched_at=fetched_at)
+
+        self.misses += 1
+        try:
+            return await asyncio.shield(self._enqueue(key, priority))
+        except Exception:
+            if cached is None:
+                raise
+            log.debug("Failed to refresh the price of %s, returning the stale price", key, exc_info=True)
+            data, _, fetched_at = cached
+            return PriceOverview(data, key[2], fetched_at=fetched_at, stale=True)
+
+    def _enqueue(self, key: PriceKey, priority: int) -> asyncio.Future[PriceOverview]:
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+            future.add_done_callback(lambda future: future.cancelled() or future.exception())  # don't warn if unused
+        # re-queueing a key with a higher priority moves it forward, the worker skips the entry it leaves behind
+        heapq.heappush(self._queue, (priority, next(self._counter), key))
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        return future
+
+    async def _run(self) -> None:
+        assert self._fetch is not None
+        try:
+            while self._queue:
+                if (delay := self._next_request - time.monotonic()) > 0:
+                    await asyncio.sleep(delay)  # anything queued meanwhile with a higher priority goes next
+                _, _, key = heapq.heappop(self._queue)
+                future = self._pending.get(key)
+                if future is None or future.done():
+                    continue
+
+                self._next_request = time.monotonic() + self.interval
+                try:
+                    data = await self._fetch(*key)
+                except Exception as exc:
+                    future.set_exception(exc)
+                    continue
+                else:
+                    fetched_at = DateTime.now()
+                    self._store(key, data, fetched_at)
+                    future.set_result(PriceOverview(data, key[2], fetched_at=fetched_at))
+                finally:
+                    self._pending.pop(key, None)  # kept until now so requests made while it's being fetched share it
+        finally:
+            self._worker = None
+
+    def _store(self, key: PriceKey, data: PriceOverviewDict, fetched_at: datetime) -> None:
+        self._prices[key] = (data, time.monotonic(), fetched_at)
+        self._prices.move_to_end(key)
+        if len(self._prices) > self.max_size:
+            self._prices.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every price from the cache."""
+        self._prices.clear()
+
+    def close(self) -> None:
+        """Stop fetching queued prices, anything waiting for them is cancelled."""
+        if self._worker is not None:
+            self._worker.cancel()
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._queue.clear()
@@ -0,0 +1,285 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE"""
+
+from __future__ import annotations
+
+import difflib
+import logging
+import re
+import sqlite3
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Final
+
+from . import utils
+from .enums import AppType
+from .types.id import AppID
+from .utils import DateTime
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+    from .client import Client
+
+__all__ = (
+    "AppCatalogue",
+    "CatalogueApp",
+)
+
+log = logging.getLogger(__name__)
+
+SYNC_TYPES: Final = {
+    AppType.Game: "include_games",
+    AppType.DLC: "include_dlc",
+    AppType.Application: "include_software",
+    AppType.Video: "include_videos",
+    AppType.Hardware: "include_hardware",
+}
+"""The types of apps GetAppList can be filtered to and the parameter for each."""
+SYNC_BATCH_SIZE: Final = 10_000
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS apps (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalised_name TEXT NOT NULL,
+    type INTEGER NOT NULL,
+    last_modified INTEGER NOT NULL,
+    price_change_number INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS apps_normalised_name ON apps (normalised_name);
+CREATE TABLE IF NOT EXISTS syncs (
+    type INTEGER PRIMARY KEY,
+    last_modified INTEGER NOT NULL
+);
+"""
+NON_WORD_RE: Final = re.compile(r"[\W_]+")
+
+
+def normalise_name(name: str) -> str:
+    """Normalise an app's name for searching, ignoring case, accents and punctuation.
+
+    ``"Counter-Strike: Global Offensive™"`` becomes ``"counter strike global offensive"``.
+    """
+    name = "".join(char for char in name if not unicodedata.category(char).startswith("S"))  # drop ™, ® etc.
+    decomposed = unicodedata.normalize("NFKD", name).casefold()
+    return NON_WORD_RE.sub(" ", "".join(char for char in decomposed if not unicodedata.combining(char))).strip()
+
+
+@dataclass(slots=True)
+class CatalogueApp:
+    """An app stored in an :class:`AppCatalogue`."""
+
+    id: AppID
+    """The app's ID."""
+    name: str
+    """The app's name."""
+    type: AppType
+    """The app's type."""
+    last_modified: datetime
+    """The time the app was last modified at."""
+    price_change_number: int
+    """The price change number of the app."""
+
+
+class AppCatalogue:
+    """A local mirror of every app on Steam, for looking apps up by ID and name without any requests.
+
+    The apps are stored in an SQLite database which is filled by :meth:`sync`. After the first sync only apps modified
+    since the last one are fetched, so it is cheap to keep current.
+
+    Examples
+    --------
+    .. code:: python
+
+        catalogue = steam.AppCatalogue("apps.db")
+        await catalogue.sync(client)
+        for app in catalogue.search("counter strike", type=steam.AppType.Game):
+            print(app.id, app.name)
+
+    Parameters
+    ----------
+    path
+        Where to store the database, by default it is kept in memory.
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self._names: dict[str, list[AppID]] | None = None  # lazily loaded for fuzzy_search
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={str(self.path)!r} apps={len(self)}>"
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        ((count,),) = self._db.execute("SELECT COUNT(*) FROM apps")
+        return count
+
+    def __contains__(self, id: object) -> bool:
+        return self._db.execute("SELECT 1 FROM apps WHERE id = ?", (id,)).fetchone() is not None
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    @property
+    def last_synced(self) -> datetime | None:
+        """The last modified time of the most recently modified app from the last full :meth:`sync`, or ``None`` if
+        the catalogue has never been synced."""
+        ((last_modified,),) = self._db.execute("SELECT MIN(last_modified) FROM syncs")
+        return DateTime.from_timestamp(last_modified) if last_modified is not None else None
+
+    async def sync(self, client: Client, *, types: AppType | None = None) -> int:
+        """Fetch the apps that have been added or modified since the last sync. The first sync fetches every app.
+
+        Each type is committed once it has been completely fetched, so an interrupted sync only needs to fetch the
+        types it didn't get to again.
+
+        Note
+        ----
+        GetAppList doesn't include apps that have been removed from Steam, so they are never removed from the
+        catalogue.
+
+        Parameters
+        ----------
+        client
+            The client to fetch the apps with.
+        types
+            The types of apps to sync, defaults to every type GetAppList can be filtered to.
+
+        Returns
+        -------
+        The number of apps added or updated.
+        """
+        updated = 0
+        for type, param in SYNC_TYPES.items():
+            if types is not None and not types.value & type.value:
+                continue
+            row = self._db.execute("SELECT last_modified FROM syncs WHERE type = ?", (type.value,)).fetchone()
+            since = row[0] if row is not None else None
+            last_modified = since or 0
+            batch: list[tuple[int, str, str, int, int, int]] = []
+            include = {name: name == param for name in SYNC_TYPES.values()}
+            try:
+                async for app in client.http.get_all_apps(
+                    **include,  # type: ignore
+                    chunk_size=50_000,
+                    limit=None,
+                    modified_after=datetime.fromtimestamp(since, timezone.utc) if since is not None else None,
+                ):
+                    batch.append(
+                        (
+                            app["appid"],
+                            app["name"],
+                            normalise_name(app["name"]),
+                            type.value,
+                            app["last_modified"],
+                            app["price_change_number"],
+                        )
+                    )
+                    last_modified = max(last_modified, app["last_modified"])
+                    if len(batch) >= SYNC_BATCH_SIZE:
+                        updated += self._upsert(batch)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO syncs (type, last_modified) VALUES (?, ?)", (type.value, last_modified)
+                )
+                updated += self._upsert(batch)
+            except BaseException:
+                self._db.rollback()
+                raise
+            self._db.commit()
+            self._names = None
+            log.debug("Synced %s apps, now at %d", type.name, len(self))
+
+        return updated
+
+    def _upsert(self, batch: list[tuple[int, str, str, int, int, int]]) -> int:
+        self._db.executemany("INSERT OR REPLACE INTO apps VALUES (?, ?, ?, ?, ?, ?)", batch)
+        updated = len(batch)
+        batch.clear()
+        return updated
+
+    def _fetch(
+        self, where: str, params: tuple[object, ...], type: AppType | None, limit: int | None
+    ) -> list[CatalogueApp]:
+        if type is not None:
+            where = f"({where}) AND type & ?"
+            params = (*params, type.value)
+        rows = self._db.execute(
+            f"SELECT * FROM apps WHERE {where} ORDER BY normalised_name, id LIMIT ?",
+            (*params, limit if limit is not None else -1),
+        )
+        return [
+            CatalogueApp(AppID(id), name, AppType.try_value(type_), DateTime.from_timestamp(last_modified), price)
+            for id, name, _, type_, last_modified, price in rows
+        ]
+
+    def get(self, id: int, /) -> CatalogueApp | None:
+        """Get an app from the catalogue by its ID.
+
+        Parameters
+        ----------
+        id
+            The ID of the app.
+        """
+        apps = self._fetch("id = ?", (id,), None, 1)
+        return apps[0] if apps else None
+
+    def search(self, prefix: str, /, *, type: AppType | None = None, limit: int | None = 25) -> list[CatalogueApp]:
+        """Find the apps whose names start with ``prefix``, ignoring case, accents and punctuation. The apps are
+        ordered by name.
+
+        Parameters
+        ----------
+        prefix
+            The start of the names to find.
+        type
+            The type(s) of apps to find.
+        limit
+            The maximum number of apps to return, ``None`` returns every matching app.
+        """
+        prefix = normalise_name(prefix)
+        return self._fetch(
+            "normalised_name >= ? AND normalised_name < ?", (prefix, f"{prefix}\U0010ffff"), type, limit
+        )
+
+    def fuzzy_search(
+        self, name: str, /, *, type: AppType | None = None, limit: int = 10, cutoff: float = 0.6
+    ) -> list[CatalogueApp]:
+        """Find the apps with names similar to ``name``, e.g. with typos in them. The apps are ordered by how similar
+        their names are.
+
+        The first call loads every name into memory, which takes a moment for the whole catalogue.
+
+        Parameters
+        ----------
+        name
+            The name to find apps similar to.
+        type
+            The type(s) of apps to find.
+        limit
+            The maximum number of apps to return.
+        cutoff
+            How similar names need to be to be returned, between 0 and 1.
+        """
+        if self._names is None:
+            self._names = {}
+            for id, normalised_name in self._db.execute("SELECT id, normalised_name FROM apps"):
+                self._names.setdefault(normalised_name, []).append(AppID(id))
+
+        names = difflib.get_close_matches(normalise_name(name), self._names, n=len(self._names), cutoff=cutoff)
+        apps: list[CatalogueApp] = []
+        for ids in utils.as_chunks((id for name in names for id in self._names[name]), 500):
+            found = {app.id: app for app in self._fetch(f"id IN ({', '.join('?' * len(ids))})", ids, type, None)}
+            apps += (found[id] for id in ids if id in found)
+            if len(apps) >= limit:
+                break
+        return apps[:limit]
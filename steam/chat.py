@@ -9,8 +9,20 @@ from __future__ import annotations
 import abc
 import asyncio
 import logging
+from collections.abc import MutableMapping
 from operator import attrgetter
-from typing import TYPE_CHECKING, Any, Generic, Literal, Protocol, TypeAlias, cast, overload, runtime_checkable
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ClassVar,
+    Generic,
+    Literal,
+    Protocol,
+    TypeAlias,
+    cast,
+    overload,
+    runtime_checkable,
+)
 
 from typing_extensions import Self, TypeVar, get_original_bases
 
@@ -31,7 +43,7 @@ from .user import ClientUser, User, WrapsUser
 from .utils import DateTime, cached_slot_property
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator, Callable, Coroutine, Iterable, Sequence
+    from collections.abc import AsyncGenerator, Callable, Coroutine, Iterable, Iterator, Sequence
     from datetime import datetime
 
     from .clan import Clan
@@ -475,6 +487,58 @@ class Chat(Channel[ChatMessageT, ClanT, GroupT], _HasChatGroupMixin):
             return message
 
 
+_RankAndState: TypeAlias = tuple[chat.EChatRoomGroupRank, chat.EChatRoomJoinState]
+
+
+class _MemberStore(MutableMapping[ID32, chat.Member]):
+    """The members of a chat group that haven't been made into :class:`Member` objects yet.
+
+    Clans can have hundreds of thousands of members, so only each member's rank and join state are stored, which are
+    shared between members, and protobufs are made as they are needed. The few members with roles or a pending kick
+    are stored as they are.
+    """
+
+    __slots__ = ("_states", "_others")
+
+    _SHARED: ClassVar[dict[_RankAndState, _RankAndState]] = {}
+
+    def __init__(self, members: Iterable[chat.Member] = ()):
+        self._states: dict[ID32, _RankAndState] = {}
+        self._others: dict[ID32, chat.Member] = {}
+        for member in members:
+            self[ID32(member.accountid)] = member
+
+    def __getitem__(self, id: ID32) -> chat.Member:
+        try:
+            return self._others[id]
+        except KeyError:
+            rank, state = self._states[id]
+            return chat.Member(id, state=state, rank=rank)
+
+    def __setitem__(self, id: ID32, member: chat.Member) -> None:
+        if member.role_ids or member.time_kick_expire:
+            self._states.pop(id, None)
+            self._others[id] = member
+        else:
+            self._others.pop(id, None)
+            key = (member.rank, member.state)
+            self._states[id] = self._SHARED.setdefault(key, key)
+
+    def __delitem__(self, id: ID32) -> None:
+        if self._states.pop(id, None) is None:
+            del self._others[id]
+
+    def __contains__(self, id: object) -> bool:
+        return id in self._states or id in self._others
+
+    def __iter__(self) -> Iterator[ID32]:
+        yield from self._states
+        yield from self._others
+
+    def __len__(self) -> int:
+        return len(self._states) + len(self._others)
+
+
 ChatGroupTypeT = TypeVar(
     "ChatGroupTypeT", bound=Literal[Type.Clan, Type.Chat], default=Literal[Type.Clan, Type.Chat], covariant=True
 )
@@ -533,7 +597,7 @@ class ChatGroup(ID[ChatGroupTypeT], Generic[MemberT, ChatT, ChatGroupTypeT]):
         self.chunked = False
         self.app: PartialApp | None = None
         self._members: dict[ID32, MemberT] = {}
-        self._partial_members: dict[ID32, chat.Member] = {}  # deleted after _members is populated (if chunked)
+        self._partial_members = _MemberStore()  # deleted after _members is populated (if chunked)
         self._channels: dict[ChatID, ChatT] = {}
         self._roles: dict[RoleID, Role] = {}
         self._officers: list[ID32] = []
@@ -631,9 +695,7 @@ class ChatGroup(ID[ChatGroupTypeT], Generic[MemberT, ChatT, ChatGroupTypeT]):
                     self._roles[role.role_id] = Role(self._state, self, role, role_action)  # type: ignore
 
     def _update_group_state(self, group_state: chat.GroupState):
-        self._partial_members = cast(
-            dict[ID32, chat.Member], {member.accountid: member for member in group_state.members}
-        )
+        self._partial_members = _MemberStore(group_state.members)
         self._roles = {
             RoleID(role.role_id): Role(self._state, self, role, permissions)
             for role in group_state.header_state.roles
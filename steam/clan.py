@@ -7,7 +7,7 @@ import itertools
 import re
 from datetime import date, datetime, timezone
 from ipaddress import IPv4Address
-from typing import TYPE_CHECKING, Literal, TypeVar, cast, overload
+from typing import TYPE_CHECKING, Final, Literal, TypeVar, cast, overload
 
 from bs4 import BeautifulSoup, Tag
 from typing_extensions import Self
@@ -54,6 +54,10 @@ CreateableEvents = BoringEvents | Literal[EventType.Game]
 
 BoringEventT = TypeVar("BoringEventT", bound=BoringEvents)
 
+MAX_CONCURRENT_VIEW_PAGES: Final = 4
+"""The most pages of the clan's chat member view :meth:`Clan.chunk` and :meth:`Clan.stream_members` fetch at once.
+Not to be confused with :data:`steam.http.MAX_CONCURRENT_MEMBER_PAGES`, for the community member list."""
+
 
 class ClanMember(Member["Clan", None]):
     def __init__(self, state: ConnectionState, clan: Clan, user: User, proto: chat.Member):
@@ -474,33 +478,68 @@ class Clan(ChatGroup[ClanMember, ClanChannel, Literal[Type.Clan]], PartialClan):
             return await super().chunk()
 
         # these actually need fetching
+        members = {member.id: member async for member in self._fetch_members(MAX_CONCURRENT_VIEW_PAGES)}
+        self._members = {id: members[id] for id in self._partial_members if id in members}  # type: ignore
+        return await super().chunk()
+
+    async def stream_members(
+        self, *, max_concurrency: int = MAX_CONCURRENT_VIEW_PAGES
+    ) -> AsyncGenerator[ClanMember, None]:
+        """An :term:`asynchronous iterator` over the clan's members, fetched 100 at a time.
+
+        Unlike :meth:`chunk`, the members aren't kept by the clan, so this can go through clans with too many members
+        to keep in memory. Members are yielded as each page of them arrives, so they aren't in any particular order.
+
+        Parameters
+        ----------
+        max_concurrency
+            The most pages of members to fetch at once.
+        """
+        if self.chunked:
+            for member in self.members:
+                yield member
+            return
+
+        async for member in self._fetch_members(max_concurrency):
+            yield member
+
+    async def _fetch_members(self, max_concurrency: int) -> AsyncGenerator[ClanMember, None]:
         view_id = self._state.chat_group_to_view_id[self._id]
-        users = {
-            user.id: user
-            for users in await asyncio.gather(
-                *(
-                    self._state.fetch_chat_group_members(
-                        self._id,
-                        view_id,
-                        client_change_number
-                        + 1,  # steam doesn't send responses if they're 0 (TODO this might be a betterproto bug)
-                        start + 1,
-                        stop,
-                    )
-                    for client_change_number, (start, stop) in enumerate(
-                        utils._int_chunks(len(self._partial_members), 100)
-                    )
+        semaphore = asyncio.Semaphore(max_concurrency)  # acquired in order, so change numbers are still sent in order
+
+        async def fetch_page(client_change_number: int, start: int, stop: int) -> list[User]:
+            async with semaphore:
+                return await self._state.fetch_chat_group_members(
+                    self._id,
+                    view_id,
+                    client_change_number
+                    + 1,  # steam doesn't send responses if they're 0 (TODO this might be a betterproto bug)
+                    start + 1,
+                    stop,
                 )
-            )
-            for user in users
-        }
-        for id, member in self._partial_members.items():
-            try:
-                user = users[id]
-            except KeyError:
-                user = await self._state._maybe_user(parse_id64(id))
-            self._members[user.id] = ClanMember(self._state, self, user, member)
-        return await super().chunk()
+
+        partial_members = self._partial_members
+        tasks = [
+            asyncio.create_task(fetch_page(client_change_number, start, stop))
+            for client_change_number, (start, stop) in enumerate(utils._int_chunks(len(partial_members), 100))
+        ]
+        seen: set[ID32] = set()
+        try:
+            for task in asyncio.as_completed(tasks):
+                for user in await task:
+                    if user.id in partial_members and user.id not in seen:
+                        seen.add(user.id)
+                        yield ClanMember(self._state, self, user, partial_members[user.id])
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # members missing from the view are looked up in batches
+        missing = [id for id in partial_members if id not in seen]
+        for ids in utils.as_chunks(missing, 100):
+            for id, user in zip(ids, await self._state._maybe_users(parse_id64(id) for id in ids)):
+                if user is not None:
+                    yield ClanMember(self._state, self, user, partial_members[id])
 
     def _get_partial_member(self, id: ID32, /) -> PartialMember:
         try:
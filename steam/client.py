@@ -16,7 +16,7 @@ import random
 import sys
 import time
 import traceback
-from collections.abc import AsyncGenerator, Callable, Collection, Coroutine, Iterable, Sequence
+from collections.abc import AsyncGenerator, Callable, Collection, Coroutine, Iterable, MutableMapping, Sequence
 from contextlib import nullcontext
 from ipaddress import IPv4Address
 from typing import (
@@ -48,7 +48,7 @@ from .gateway import *
 from .guard import get_authentication_code
 from .http import HTTPClient
 from .id import _ID64_TO_ID32
-from .models import CDNAsset, PriceOverview, Wallet, return_true
+from .models import CDNAsset, EnrichedUser, PriceOverview, Wallet, return_true
 from .package import FetchedPackage, License, Package, PartialPackage
 from .protobufs import store
 from .state import ConnectionState
@@ -68,8 +68,10 @@ if TYPE_CHECKING:
     from steam.ext import commands
 
     from .abc import Message
+    from .cache import PriceCache, UserCache
     from .clan import Clan
     from .comment import Comment
+    from .dispatcher import EventDispatcher
     from .event import Announcement, Event
     from .ext.commands.bot import Bot
     from .friend import Friend
@@ -77,9 +79,13 @@ if TYPE_CHECKING:
     from .invite import AppInvite, ClanInvite, GroupInvite, UserInvite
     from .manifest import AppInfo, PackageInfo
     from .media import Media
+    from .metrics import LoopLagMonitor, Metrics
+    from .pool import ClientPool
     from .post import Post
+    from .protobufs.msg import UnifiedMessage
     from .published_file import PublishedFile
     from .reaction import ClientEffect, ClientEmoticon, ClientSticker, MessageReaction
+    from .replay import CMRecorder
     from .trade import Asset, Item, MovedItem, TradeOffer
     from .types.http import IPAdress
     from .types.user import IndividualID
@@ -93,6 +99,7 @@ log = logging.getLogger(__name__)
 CoroFunc: TypeAlias = Callable[..., Coroutine[Any, Any, Any]]
 F = TypeVar("F", bound=CoroFunc)
 P = ParamSpec("P")
+UMT = TypeVar("UMT", bound="UnifiedMessage")
 
 
 class ClientKwargs(TypedDict, total=False):
@@ -111,6 +118,18 @@ class ClientKwargs(TypedDict, total=False):
     language: Language
     auto_chunk_chat_groups: bool
     ssl: SSLContext | Literal[False] | aiohttp.Fingerprint
+    dispatcher: EventDispatcher | None
+    user_update_window: float | None
+    cms: Sequence[str] | None
+    cm_list_cache: CMListCache | None
+    resume: bool
+    recorder: CMRecorder | None
+    metrics: Metrics | None
+    heartbeat: Literal["thread", "task"]
+    loop_monitor: LoopLagMonitor | None
+    pool: ClientPool | None
+    user_cache: UserCache | None
+    price_cache: PriceCache | None
 
 
 class Client:
@@ -163,6 +182,42 @@ class Client:
         Any ``ssl`` parameters to pass to the underlying :class:`~aiohttp.ClientSession`.
 
         .. versionadded:: 1.0.1
+    dispatcher
+        An :class:`EventDispatcher` to run event handlers on instead of creating a new task for every handler.
+    user_update_window
+        How long in seconds to wait for more persona updates for a user before dispatching :meth:`on_user_update`,
+        merging them into one event. Defaults to ``None``, dispatching them as soon as they're received.
+    cms
+        The CMs to connect to instead of fetching them from the Web API. Either a ``host:port`` to connect to over
+        ``wss`` or the full URL of a ``cmsocket`` endpoint such as :attr:`steam.replay.FakeCMServer.url`.
+    cm_list_cache
+        A :class:`steam.gateway.CMListCache` to store the CM list fetched from the Web API in, so that restarts can
+        skip fetching it. It can be shared between clients.
+    resume
+        Whether to keep the friends, chat groups and other caches when reconnecting to a new CM and reconcile them with
+        what changed while disconnected, only fetching new friends and chat groups. :meth:`on_friend_add`,
+        :meth:`on_friend_remove`, :meth:`on_clan_leave` and :meth:`on_group_leave` are dispatched for the differences.
+        Defaults to ``False``, fetching everything again after every reconnect.
+    recorder
+        A :class:`steam.replay.CMRecorder` to record every frame sent to and received from the CM with.
+    metrics
+        A :class:`Metrics` to report message, RPC, HTTP and event handler metrics to, such as a
+        :class:`PrometheusMetrics`. Defaults to ``None``, not recording any metrics.
+    heartbeat
+        How to send heartbeats to the CM. ``"thread"`` sends them from a separate thread, which can also warn when the
+        event loop is blocked. ``"task"`` sends them from a task on the event loop, avoiding a thread per client when
+        running many clients in one process. Defaults to ``"thread"``.
+    loop_monitor
+        A :class:`LoopLagMonitor` to measure the event loop's lag with while logged in. It can be shared between
+        clients.
+    pool
+        The :class:`ClientPool` this client is part of, set by :meth:`ClientPool.add`.
+    user_cache
+        The :class:`UserCache` to cache users in. Defaults to one keeping the 1000 most recently used users alive for up
+        to an hour.
+    price_cache
+        The :class:`PriceCache` to cache market prices in and pace fetching them with. Defaults to one keeping prices
+        for 10 minutes and fetching at most one price every 3 seconds.
     """
 
     def __init__(self, **options: Unpack[ClientKwargs]):
@@ -176,6 +231,14 @@ class Client:
         self.identity_secret: str | None = None
 
         self._closed = True
+        self._dispatcher = options.get("dispatcher")
+        self._recorder = options.get("recorder")
+        self._metrics = options.get("metrics")
+        if self._metrics is not None:
+            self._metrics.bind(self)
+        self._heartbeat = options.get("heartbeat", "thread")
+        self._loop_monitor = options.get("loop_monitor")
+        self._pool = options.get("pool")
         self._listeners: dict[str, list[tuple[asyncio.Future[Any], Callable[..., bool]]]] = {}
         self._ready = asyncio.Event()
         self._aentered = False
@@ -294,18 +357,64 @@ class Client:
         log.debug("%s has been registered as an event", coro.__name__)
         return coro
 
+    def add_um_listener(self, um: type[UMT], listener: Callable[[UMT], Any]) -> None:
+        """Register a listener that is called with every unified message of type ``um`` that is received.
+
+        This allows extensions to handle unified messages the library doesn't without subclassing. Synchronous
+        listeners are called inline while the message is being processed, coroutine functions are ran in a new task.
+
+        Parameters
+        ----------
+        um
+            The unified message's class.
+        listener
+            The function to call with the message.
+        """
+        self._state.um_listeners.setdefault(um, []).append(listener)
+
+    def remove_um_listener(self, um: type[UMT], listener: Callable[[UMT], Any]) -> None:
+        """Remove a listener registered with :meth:`add_um_listener`.
+
+        Parameters
+        ----------
+        um
+            The unified message's class.
+        listener
+            The listener to remove.
+        """
+        try:
+            listeners = self._state.um_listeners[um]
+            listeners.remove(listener)
+        except (KeyError, ValueError):
+            return
+        if not listeners:
+            del self._state.um_listeners[um]
+
     async def _run_event(self, coro: CoroFunc, event_name: str, *args: Any, **kwargs: Any) -> None:
+        start = time.perf_counter()
+        failed = False
         try:
             await coro(*args, **kwargs)
         except asyncio.CancelledError:
             pass
         except Exception as exc:
+            failed = True
             try:
                 await self.on_error(event_name, exc, *args, **kwargs)
             except asyncio.CancelledError:
                 pass
-
-    def _schedule_event(self, coro: CoroFunc, event_name: str, *args: Any, **kwargs: Any) -> asyncio.Task[None]:
+        finally:
+            if self._metrics is not None:
+                self._metrics.event_handled(event_name.removeprefix("on_"), time.perf_counter() - start, failed)
+
+    def _schedule_event(
+        self, coro: CoroFunc, event_name: str, *args: Any, **kwargs: Any
+    ) -> asyncio.Task[None] | None:
+        dispatcher = self._dispatcher
+        if dispatcher is not None and not self.is_closed():
+            dispatcher.start(self._tg)
+            dispatcher.submit(self._run_event, coro, event_name, *args, **kwargs)
+            return None
         return self._tg.create_task(
             self._run_event(coro, event_name, *args, **kwargs), name=f"steam.py task: {event_name}"
         )
@@ -424,6 +533,10 @@ class Client:
 
     async def close(self) -> None:
         """Close the connection to Steam."""
+        if self._loop_monitor is not None:
+            self._loop_monitor.detach(self)
+        if self._metrics is not None:
+            self._metrics.unbind(self)
         if self.is_closed():
             return
 
@@ -433,14 +546,18 @@ class Client:
             try:
                 if self._state._active_auth_tickets:
                     self._state._active_auth_tickets.clear()
-                    await self._state.deactivate_auth_session_tickets()
+                    self._state._active_auth_tickets_by_crc.clear()
+                    await self._state.send_auth_list()
                 await self.change_presence(apps=[])  # disconnect from games
                 await self._state.handle_close()
             except ConnectionClosed:
                 pass
 
         await self.http.close()
+        self._state._prices.close()
         self._ready.clear()
+        if self._dispatcher is not None:
+            self._dispatcher.stop()
 
     def clear(self) -> None:
         """Clears the internal state of the bot. After this, the bot can be considered "re-opened", i.e.
@@ -464,6 +581,10 @@ class Client:
             state = self._state
             STATE.set(state)
             cm_list = None
+            if self._metrics is not None:
+                self._metrics.bind(self)  # unbound if it was closed before
+            if self._loop_monitor is not None:
+                self._loop_monitor.attach(self)
 
             async def throttle() -> None:
                 now = time.monotonic()
@@ -472,8 +593,12 @@ class Client:
                 log.info("Attempting to connect to another CM in %ds", sleep)
                 await asyncio.sleep(sleep)
 
+            connected = False
+
             while not self.is_closed():
                 last_connect = time.monotonic()
+                if connected and self._metrics is not None:
+                    self._metrics.reconnected()
 
                 try:
                     async with timeout(60):
@@ -492,6 +617,7 @@ class Client:
                     await throttle()
                     continue
 
+                connected = True
                 try:
                     async with self.ws:
                         while True:
@@ -604,6 +730,54 @@ class Client:
         """
         return await self._state.fetch_users(cast("tuple[ID64, ...]", ids))
 
+    async def fetch_users_enriched(
+        self,
+        ids: Iterable[int],
+        *,
+        fields: Collection[Literal["user", "ban", "level", "badges"]] = ("user", "ban", "level"),
+        max_concurrency: int = 4,
+        cache: MutableMapping[int, EnrichedUser] | None = None,
+    ) -> AsyncGenerator[EnrichedUser, None]:
+        """An :term:`asynchronous iterator` for fetching information about many users at once, such as when screening
+        trade partners.
+
+        Users are fetched in batches of 100, the most the Web API takes, using one request per batch for each field
+        rather than one per user. Badges are the exception, needing a request per user. Each batch's users are yielded
+        as soon as it finishes, so they aren't in the order of ``ids``.
+
+        Examples
+        --------
+        .. code:: python
+
+            async for info in client.fetch_users_enriched(partner_ids, fields=("ban", "level")):
+                if info.ban is not None and info.ban.is_banned() or (info.level or 0) < 5:
+                    print("Not trading with", info.id64)
+
+        Parameters
+        ----------
+        ids
+            The ID64s of the users to fetch.
+        fields
+            The information to fetch for each user, ``"user"`` for their summary as a :class:`User`, ``"ban"`` for
+            their :class:`Ban`, ``"level"`` for their level and ``"badges"`` for their :class:`UserBadges`.
+        max_concurrency
+            The most batches to fetch at once.
+        cache
+            A mapping to reuse previously fetched users from and store newly fetched ones in, only fields missing from
+            cached users are fetched. Use a mapping that evicts entries to bound how stale they can get.
+
+        Yields
+        ------
+        :class:`EnrichedUser`
+        """
+        async for record in self._state.fetch_users_enriched(
+            cast("Iterable[ID64]", ids),
+            fields,
+            max_concurrency,
+            cast("MutableMapping[ID64, EnrichedUser] | None", cache),
+        ):
+            yield record
+
     def get_trade(self, id: int, /) -> TradeOffer | None:
         """Get a trade from cache with a matching ID or ``None`` if the trade was not found.
 
@@ -1319,6 +1493,11 @@ class Client:
     ) -> AsyncGenerator[AppListApp, None]:
         """An :term:`asynchronous iterator` over all the apps on Steam.
 
+        Note
+        ----
+        To look up apps by name or type many times, mirror them in an :class:`AppCatalogue` instead, which only needs
+        to fetch the apps modified since it was last synced.
+
         Parameters
         ----------
         limit
@@ -1436,9 +1615,13 @@ class Client:
             The app the item is from.
         currency
             The currency to fetch the price in.
+
+        Note
+        ----
+        Prices are cached and fetched through the client's :class:`PriceCache`, so this may wait for other prices to
+        be fetched first.
         """
-        price = await self.http.get_price(app.id, name, currency)
-        return PriceOverview(price, currency or Currency.USD)
+        return await self._state._prices.fetch(app.id, name, currency)
 
     # events to be subclassed
 
@@ -1605,6 +1788,9 @@ class Client:
                 - :attr:`~steam.User.last_logoff`
                 - :attr:`~steam.User.last_seen_online`
                 - :attr:`~steam.User.app`
+                - :attr:`~steam.User.rich_presence`
+                - :attr:`~steam.User.game_server_ip`
+                - :attr:`~steam.User.game_server_port`
 
             Parameters
             ----------
@@ -0,0 +1,282 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Coroutine, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias
+
+if TYPE_CHECKING:
+    from ._const import TaskGroup
+
+__all__ = (
+    "EventDispatcher",
+    "HandlerStats",
+)
+
+log = logging.getLogger(__name__)
+
+OverloadPolicy: TypeAlias = Literal["drop_oldest", "coalesce", "block"]
+EventRunner: TypeAlias = Callable[..., Coroutine[Any, Any, None]]
+
+DEFAULT_PRIORITIES: Mapping[str, int] = {
+    "trade": 0,
+    "message": 0,
+    "user_update": 2,
+    "typing": 2,
+}
+DEFAULT_PRIORITY = 1
+
+
+@dataclass(slots=True)
+class HandlerStats:
+    """Latency statistics for an event's handlers."""
+
+    count: int = 0
+    """The number of handlers that have finished running."""
+    total: float = 0.0
+    """The total time in seconds spent running the handlers."""
+    max: float = 0.0
+    """The longest time in seconds a handler took to run."""
+    wait: float = 0.0
+    """The total time in seconds handlers spent queued before they started running."""
+
+    @property
+    def mean(self) -> float:
+        """The mean time in seconds a handler took to run."""
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass(slots=True)
+class _QueuedEvent:
+    runner: EventRunner
+    coro: Callable[..., Coroutine[Any, Any, Any]]
+    event_name: str
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    priority: int
+    key: tuple[Any, ...] | None
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+class EventDispatcher:
+    """An opt-in, bounded and prioritised worker pool to run event handlers on.
+
+    By default every handler for every event runs in a new task, meaning that a flood of events can result in an
+    unbounded number of tasks. Passing an instance of this to :class:`~steam.Client` instead runs handlers on a fixed
+    number of workers that pull from a bounded queue.
+
+    Parameters
+    ----------
+    max_size
+        The maximum number of handlers that can be queued.
+    workers
+        The number of workers that run handlers.
+    priorities
+        A mapping of event names (without the ``on_`` prefix) to priorities, lower values are ran first. A name also
+        matches any events that start with it followed by an underscore so ``"trade"`` matches ``"trade_receive"``.
+        Defaults to running ``trade`` and ``message`` events before everything else and ``user_update`` and ``typing``
+        events after everything else.
+    policy
+        What to do when the queue is full.
+
+        - ``"drop_oldest"`` drops the oldest queued handler of the lowest priority.
+        - ``"coalesce"`` merges a ``*_update`` event into one still queued for the same object, keeping the original
+          ``before`` argument, whether or not the queue is full. Anything else falls back to ``"drop_oldest"``.
+        - ``"block"`` holds new handlers back until there is space in the queue, without dropping any. The websocket
+          is still read meanwhile, so replies that running handlers are waiting for still arrive.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 1000,
+        workers: int = 8,
+        priorities: Mapping[str, int] = DEFAULT_PRIORITIES,
+        policy: OverloadPolicy = "drop_oldest",
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if policy not in ("drop_oldest", "coalesce", "block"):
+            raise ValueError(f"unknown overload policy {policy!r}")
+        self.max_size = max_size
+        self.workers = workers
+        self.priorities = dict(priorities)
+        self.policy: OverloadPolicy = policy
+
+        self.dropped = 0
+        """The number of handlers that were dropped because the queue was full."""
+        self.coalesced = 0
+        """The number of handlers that were merged into an already queued handler."""
+        self.max_depth = 0
+        """The largest the queue has been."""
+        self.stats: dict[str, HandlerStats] = {}
+        """Latency statistics for each event."""
+
+        self._queues: dict[int, deque[_QueuedEvent]] = {}
+        self._pending: dict[tuple[Any, ...], _QueuedEvent] = {}
+        self._depth = 0
+        self._held: deque[_QueuedEvent] = deque()  # waiting for space in the queue with the "block" policy
+        self._not_empty = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} workers={self.workers} policy={self.policy!r} "
+            f"depth={self._depth}/{self.max_size}>"
+        )
+
+    @property
+    def depth(self) -> int:
+        """The number of handlers currently waiting to be ran."""
+        return self._depth
+
+    @property
+    def held(self) -> int:
+        """The number of handlers held back until there is space in the queue by the ``"block"`` policy."""
+        return len(self._held)
+
+    def is_running(self) -> bool:
+        """Whether the dispatcher's workers have been started."""
+        return bool(self._tasks)
+
+    def priority_for(self, event_name: str) -> int:
+        """Get the priority for an event.
+
+        Parameters
+        ----------
+        event_name
+            The name of the event with or without the ``on_`` prefix.
+        """
+        event_name = event_name.removeprefix("on_")
+        try:
+            return self.priorities[event_name]
+        except KeyError:
+            pass
+        prefix, _, _ = event_name.partition("_")
+        return self.priorities.get(prefix, DEFAULT_PRIORITY)
+
+    def start(self, tg: TaskGroup) -> None:
+        """Start the workers in the passed task group."""
+        if self._tasks:
+            return
+        self._tasks = [
+            tg.create_task(self._worker(), name=f"steam.py: event dispatcher worker {idx}")
+            for idx in range(self.workers)
+        ]
+
+    def stop(self) -> None:
+        """Stop the workers and drop any queued handlers."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        self._queues.clear()
+        self._pending.clear()
+        self._held.clear()
+        self._depth = 0
+        self._not_empty.clear()
+
+    def submit(
+        self,
+        runner: EventRunner,
+        coro: Callable[..., Coroutine[Any, Any, Any]],
+        event_name: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        """Queue a handler to be ran by a worker as ``runner(coro, event_name, *args, **kwargs)``."""
+        key = None
+        if self.policy == "coalesce" and event_name.endswith("_update") and args:
+            key = (event_name, coro, getattr(args[0], "id", id(args[0])))
+            queued = self._pending.get(key)
+            if queued is not None:
+                queued.args = (queued.args[0], *args[1:])  # keep the original before
+                queued.kwargs = kwargs
+                self.coalesced += 1
+                return
+
+        priority = self.priority_for(event_name)
+        event = _QueuedEvent(runner, coro, event_name, args, kwargs, priority, key)
+        if self._depth >= self.max_size:
+            if self.policy == "block":
+                self._held.append(event)
+                return
+            if not self._drop_oldest(priority):
+                self.dropped += 1  # everything queued is more important than this
+                log.debug("Event queue is full, dropped a handler for %s", event_name)
+                return
+        self._enqueue(event)
+
+    def _enqueue(self, event: _QueuedEvent) -> None:
+        priority = event.priority
+        try:
+            queue = self._queues[priority]
+        except KeyError:
+            queue = self._queues[priority] = deque()
+            self._queues = dict(sorted(self._queues.items()))
+        queue.append(event)
+        if event.key is not None:
+            self._pending[event.key] = event
+        self._depth += 1
+        self.max_depth = max(self.max_depth, self._depth)
+        self._not_empty.set()
+
+    def _drop_oldest(self, priority: int) -> bool:
+        for queue_priority, queue in reversed(self._queues.items()):
+            if queue_priority < priority:
+                return False
+            if queue:
+                break
+        else:
+            return False
+        dropped = queue.popleft()
+        if dropped.key is not None:
+            self._pending.pop(dropped.key, None)
+        self._depth -= 1
+        self.dropped += 1
+        log.debug("Event queue is full, dropped a handler for %s", dropped.event_name)
+        return True
+
+    def _pop(self) -> _QueuedEvent:
+        for queue in self._queues.values():
+            if queue:
+                event = queue.popleft()
+                break
+        else:
+            raise LookupError("no events queued")
+        if event.key is not None:
+            self._pending.pop(event.key, None)
+        self._depth -= 1
+        if self._held:
+            self._enqueue(self._held.popleft())
+        elif not self._depth:
+            self._not_empty.clear()
+        return event
+
+    async def _worker(self) -> None:
+        while True:
+            await self._not_empty.wait()
+            try:
+                event = self._pop()
+            except LookupError:  # another worker beat us to it
+                continue
+            started = time.perf_counter()
+            try:
+                await event.runner(event.coro, event.event_name, *event.args, **event.kwargs)
+            finally:
+                finished = time.perf_counter()
+                try:
+                    stats = self.stats[event.event_name]
+                except KeyError:
+                    stats = self.stats[event.event_name] = HandlerStats()
+                elapsed = finished - started
+                stats.count += 1
+                stats.total += elapsed
+                stats.max = max(stats.max, elapsed)
+                stats.wait += started - event.queued_at
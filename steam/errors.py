@@ -30,6 +30,7 @@ __all__ = (
     "WSForbidden",
     "WSNotFound",
     "InvalidID",
+    "WorkerError",
 )
 
 CODE_FINDER = re.compile(r"\S(\d+)\S")
@@ -192,3 +193,15 @@ class InvalidID(SteamException):
         self.universe = universe
         self.instance = instance
         super().__init__(f"{id!r} cannot be converted to any valid Steam ID{f' as {msg}' if msg is not None else ''}")
+
+
+class WorkerError(SteamException):
+    """Exception that's thrown when a call to a client running in a :class:`~steam.Fleet` worker fails.
+
+    Subclass of :exc:`SteamException`.
+    """
+
+    def __init__(self, message: str, type: str | None = None):
+        self.type = type
+        """The name of the exception's type that was raised in the worker, ``None`` if the worker isn't running."""
+        super().__init__(f"{type}: {message}" if type is not None else message)
@@ -9,6 +9,7 @@ The appropriate license is in LICENSE
 from __future__ import annotations
 
 import copy
+import functools
 import importlib.machinery
 import importlib.util
 import inspect
@@ -29,7 +30,7 @@ from .context import Context
 from .converters import CONVERTERS, Converters
 from .errors import CommandNotFound
 from .help import DefaultHelpCommand, HelpCommand
-from .utils import Coro, Shlex
+from .utils import Coro, PrefixTrie, Shlex
 
 if TYPE_CHECKING:
     from typing_extensions import Required, Self, Unpack
@@ -52,6 +53,14 @@ CheckT = TypeVar("CheckT", bound="Callable[[CheckType], Check]")
 BotInvokeT = TypeVar("BotInvokeT", bound=CoroFunc[["Context"], None])
 
 
+_PREFIX_TRIE_THRESHOLD = 4  # below this a linear scan with str.startswith is cheaper than walking a trie
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_prefixes(prefixes: tuple[str, ...]) -> PrefixTrie:
+    return PrefixTrie(prefixes)
+
+
 def when_mentioned(bot: Bot, message: Message) -> list[str]:
     """A callable that implements a command prefix equivalent to being mentioned.
     This is meant to be passed into the :attr:`.Bot.command_prefix` attribute.
@@ -563,7 +572,10 @@ class Bot(GroupMixin, Client):
         if callable(prefixes):
             prefixes = await utils.maybe_coroutine(prefixes, self, message)
         if isinstance(prefixes, str):
-            prefixes = (prefixes,)
+            return prefixes if message.content.startswith(prefixes) else None
+        prefixes = tuple(prefixes)
+        if len(prefixes) > _PREFIX_TRIE_THRESHOLD:
+            return _compile_prefixes(prefixes).match(message.content)
         for prefix in prefixes:
             if message.content.startswith(prefix):
                 return prefix
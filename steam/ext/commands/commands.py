@@ -204,6 +204,9 @@ class Command(Generic[CogT, P, R]):
 
         self._before_hook = None
         self._after_hook = None
+        self._plan: dict[str, tuple[converters.Converters, bool]] = {}
+        self._compound_plans: dict[Any, tuple[Any, tuple[Any, ...], tuple[converters.Converters, ...]]] = {}
+        self._plan_generation = -1
 
     def __str__(self) -> str:
         return self.qualified_name
@@ -406,10 +409,46 @@ class Command(Generic[CogT, P, R]):
         if ctx.bot._after_hook is not None:
             await ctx.bot._after_hook(ctx)
 
+    def _compile(self) -> None:
+        """Resolve the converter for each of the command's parameters ahead of time so invocations don't have to."""
+        self._compound_plans = {}
+        self._plan = {
+            name: (self._get_converter(self._prepare_param(param)), get_origin(param.annotation) is converters.Greedy)
+            for name, param in self.clean_params.items()
+        }
+        self._plan_generation = converters._generation
+
+    def _get_plan(self, param: inspect.Parameter) -> tuple[converters.Converters, bool]:
+        if self._plan_generation != converters._generation:  # a converter was registered since we last compiled
+            self._compile()
+        try:
+            return self._plan[param.name]
+        except KeyError:  # not one of our clean_params
+            return self._get_converter(self._prepare_param(param)), get_origin(param.annotation) is converters.Greedy
+
+    def _get_compound_plan(self, converter: Any) -> tuple[Any, tuple[Any, ...], tuple[converters.Converters, ...]]:
+        if self._plan_generation != converters._generation:
+            self._compile()
+        try:
+            return self._compound_plans[converter]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable, don't bother caching it
+            return self._build_compound_plan(converter)
+        plan = self._compound_plans[converter] = self._build_compound_plan(converter)
+        return plan
+
+    def _build_compound_plan(self, converter: Any) -> tuple[Any, tuple[Any, ...], tuple[converters.Converters, ...]]:
+        origin = get_origin(converter)
+        if origin is None:
+            return None, (), ()
+        args = get_args(converter)
+        return origin, args, tuple(self._get_converter(arg) for arg in args)
+
     async def _parse_positional_or_keyword_argument(
         self, ctx: Context, param: inspect.Parameter, args: list[Any]
     ) -> None:
-        is_greedy = get_origin(param.annotation) is converters.Greedy
+        _, is_greedy = self._get_plan(param)
         greedy_args: list[Any] = []
         if ctx.lex.position == ctx.lex.end:
             args.append(await self._get_default(ctx, param))
@@ -481,8 +520,7 @@ class Command(Generic[CogT, P, R]):
         ctx.kwargs = kwargs
 
     def _transform(self, ctx: Context, param: inspect.Parameter, argument: str) -> Coroutine[None, None, Any]:
-        parm_type = self._prepare_param(param)
-        converter = self._get_converter(parm_type)
+        converter, _ = self._get_plan(param)
         return self._convert(ctx, converter, param, argument)
 
     def _prepare_param(self, param: inspect.Parameter) -> type:
@@ -523,11 +561,9 @@ class Command(Generic[CogT, P, R]):
                 return await converter.convert(ctx, argument)
             except Exception as exc:
                 raise BadArgument(f"{argument!r} failed to convert to {converter.__class__.__name__}") from exc
-        origin = get_origin(converter)
+        origin, args, arg_converters = self._get_compound_plan(converter)
         if origin is not None:
-            args = get_args(converter)
-            for arg in args:
-                converter = self._get_converter(arg)
+            for arg, converter in zip(args, arg_converters):
                 try:
                     ret = await self._convert(ctx, converter, param, argument)
                 except BadArgument:
@@ -627,6 +663,7 @@ class GroupMixin(Generic[CogT]):
         for param in command.clean_params.values():
             if isinstance(param.annotation, str):
                 raise TypeError(f"Please rename the parameter {param.name} or make its annotation defined at runtime")
+        command._compile()
 
         self.__commands__[command.name] = command
         for alias in command.aliases:
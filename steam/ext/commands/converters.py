@@ -75,6 +75,13 @@ class BasicConverter(Protocol[T]):
 
 
 CONVERTERS = defaultdict[type, list[Converters]](list)
+_generation = 0  # bumped on every registration so commands know to recompile their converter plans
+
+
+def _register_converter(converter_for: type, converter: Converters) -> None:
+    global _generation
+    CONVERTERS[converter_for].append(converter)
+    _generation += 1
 
 
 def converter(func: Callable[[str], T], /) -> BasicConverter[T]:
@@ -110,7 +117,7 @@ def converter(func: Callable[[str], T], /) -> BasicConverter[T]:
     converter_for = annotations["return"]
     func = cast(BasicConverter[T], func)
     func.converter_for = converter_for
-    CONVERTERS[converter_for].append(func)
+    _register_converter(converter_for, func)
     return func
 
 
@@ -238,7 +245,7 @@ class Converter(ConverterBase[T_co], ABC):
                 raise NameError(f"name {converter_for.__forward_arg__!r} is not defined") from None
             cls.converter_for = converter_for
             """The class that the converter can be type-hinted to to."""
-            CONVERTERS[converter_for].append(cls)
+            _register_converter(converter_for, cls)
 
 
 class PartialUserConverter(Converter[PartialUser]):
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-import asyncio
 import time
+from collections import deque
 from typing import TYPE_CHECKING, cast
 
 from typing_extensions import Self
@@ -80,7 +80,11 @@ class BucketType(IntEnum):
 
 
 class Cooldown:
-    """The class that holds a command's cooldown."""
+    """The class that holds a command's cooldown.
+
+    Each bucket keeps a sliding window of at most ``rate`` invocation timestamps, expired entries are dropped lazily
+    when the bucket is next checked and idle buckets are periodically compacted away.
+    """
 
     bucket: BucketType
     """The bucket that should be used to determine this command's cooldown."""
@@ -91,17 +95,40 @@ class Cooldown:
         self.bucket = bucket
         self.reset()
 
-    def reset(self) -> None:
-        """Reset the command's cooldown."""
-        self._queue: dict[float, BucketTypeType] = {}
+    def reset(self, bucket: BucketTypeType | None = None) -> None:
+        """Reset the command's cooldown.
 
-    def _calls(self, bucket: BucketTypeType) -> list[tuple[float, BucketTypeType]]:
-        return [(t, b) for t, b in self._queue.items() if b == bucket]
-
-    async def expire_cache(self, bucket: BucketTypeType, now: float) -> None:
-        self._queue[now] = bucket
-        await asyncio.sleep(self._per)
-        self._queue.pop(now, None)
+        Parameters
+        ----------
+        bucket
+            The bucket to reset, if ``None`` every bucket is reset.
+        """
+        if bucket is not None:
+            self._buckets.pop(bucket, None)
+            return
+        self._buckets: dict[BucketTypeType, deque[float]] = {}
+        self._last_compaction = time.time()
+
+    @property
+    def buckets(self) -> list[BucketTypeType]:
+        """The buckets that currently have invocations being tracked."""
+        now = time.time()
+        return [bucket for bucket in self._buckets if self._calls(bucket, now)]
+
+    def _calls(self, bucket: BucketTypeType, now: float) -> deque[float] | None:
+        calls = self._buckets.get(bucket)
+        if calls is not None:
+            expired = now - self._per
+            while calls and calls[0] <= expired:
+                calls.popleft()
+        return calls
+
+    def _compact(self, now: float) -> None:
+        if now - self._last_compaction < max(self._per, 1):
+            return
+        self._last_compaction = now
+        expired = now - self._per
+        self._buckets = {bucket: calls for bucket, calls in self._buckets.items() if calls and calls[-1] > expired}
 
     def get_retry_after(self, bucket: BucketTypeType, now: float) -> float:
         """Get the retry after for a command.
@@ -113,13 +140,23 @@ class Cooldown:
         now
             The UNIX timestamp to find times after.
         """
-        calls = self._calls(bucket)
-        if not calls:
+        calls = self._calls(bucket, now)
+        if not calls or len(calls) < self._rate:
             return 0.0
-        last_call = calls[0][0]
-        if last_call + self._per >= now and len(calls) >= self._rate:
-            return last_call + self._per - now
-        return 0.0
+        return max(calls[0] + self._per - now, 0.0)
+
+    def get_tokens(self, bucket: BucketTypeType, now: float | None = None) -> int:
+        """Get the number of invocations left for a bucket before it is put on cooldown.
+
+        Parameters
+        ----------
+        bucket
+            The bucket to find in the cache.
+        now
+            The UNIX timestamp to check at, defaults to the current time.
+        """
+        calls = self._calls(bucket, time.time() if now is None else now)
+        return self._rate - len(calls) if calls is not None else self._rate
 
     def __call__(self, ctx: Context) -> None:
         """Invoke the command's cooldown properly and raise if the command is on cooldown.
@@ -131,6 +168,11 @@ class Cooldown:
         """
         bucket = self.bucket.get_bucket(ctx)
         now = time.time()
-        ctx._state._tg.create_task(self.expire_cache(bucket, now))
+        self._compact(now)
         if retry_after := self.get_retry_after(bucket, now):
             raise CommandOnCooldown(retry_after)
+        try:
+            calls = self._buckets[bucket]
+        except KeyError:
+            calls = self._buckets[bucket] = deque(maxlen=self._rate)
+        calls.append(now)
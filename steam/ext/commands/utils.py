@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from collections import deque
-from collections.abc import Coroutine
+from collections.abc import Coroutine, Iterable
 from typing import TYPE_CHECKING, Any, TypeAlias, TypeVar, overload
 
 from .errors import MissingClosingQuotation
@@ -59,6 +59,41 @@ class CaseInsensitiveDict(dict[str, _VT]):
         return super().pop(k.lower())
 
 
+class PrefixTrie:
+    """A trie of command prefixes.
+
+    Matching walks the message once no matter how many prefixes there are and returns the prefix that appears first in
+    the iterable it was built from, mirroring a linear scan using :meth:`str.startswith`.
+    """
+
+    __slots__ = ("prefixes", "_root")
+
+    def __init__(self, prefixes: Iterable[str]):
+        self.prefixes = tuple(prefixes)
+        self._root: dict[str, Any] = {}  # char -> child node, with the special key "" holding the prefix's index
+        for idx, prefix in enumerate(self.prefixes):
+            node = self._root
+            for character in prefix:
+                node = node.setdefault(character, {})
+            node.setdefault("", idx)
+
+    def match(self, string: str) -> str | None:
+        node = self._root
+        best = node.get("")
+        for character in string:
+            try:
+                node = node[character]
+            except KeyError:
+                break
+            idx = node.get("")
+            if idx is not None and (best is None or idx < best):
+                best = idx
+        return self.prefixes[best] if best is not None else None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.prefixes!r})"
+
+
 def _end_of_quote_finder(in_stream: str, location: int) -> int:
     end_of_quote_index = in_stream.find('"', location)
     if end_of_quote_index == -1:
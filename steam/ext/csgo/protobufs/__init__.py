@@ -1,10 +1,7 @@
 from typing import Final
 
-import betterproto
-
 APP_ID: Final = 730
 
-from ....protobufs.msg import GCProtobufMessage
 from . import (
     base as base,
     cstrike as cstrike,
@@ -14,5 +11,3 @@ from . import (
     struct_messages as struct_messages,
     system_messages as system_messages,
 )
-
-[setattr(cls, "_betterproto", betterproto.ProtoClassMetadata(cls)) for cls in GCProtobufMessage.__subclasses__()]
@@ -23,8 +23,8 @@ from .protobufs import base, cstrike, sdk
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable, Sequence
-    from weakref import WeakValueDictionary
 
+    from ...cache import UserCache
     from ...protobufs import friends
     from .client import Client
 
@@ -40,7 +40,7 @@ def READ_F32(
 
 class GCState(GCState_[Backpack]):
     client: Client  # type: ignore  # PEP 705
-    _users: WeakValueDictionary[ID32, User]
+    _users: UserCache
     _APP = CSGO  # type: ignore
 
     def __init__(self, client: Client, **kwargs: Any):
@@ -49,13 +49,12 @@ class GCState(GCState_[Backpack]):
         self.waiting_for_casket_items: dict[AssetID, asyncio.Future[CasketItem]] = {}
 
     def _store_user(self, proto: friends.CMsgClientPersonaStateFriend) -> User:
-        try:
-            user = self._users[_ID64_TO_ID32(proto.friendid)]
-        except KeyError:
+        user = self._users.get(_ID64_TO_ID32(proto.friendid))
+        if user is None:
             user = User(state=self, proto=proto)
-            self._users[user.id] = user
         else:
             user._update(proto)
+        self._users.store(user)
         return user
 
     def get_partial_user(self, id: Intable) -> PartialUser:
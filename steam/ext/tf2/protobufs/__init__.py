@@ -1,10 +1,7 @@
 from typing import Final
 
-import betterproto
-
 APP_ID: Final = 440
 
-from ....protobufs.msg import GCProtobufMessage
 from . import (
     base as base,
     econ as econ,
@@ -13,5 +10,3 @@ from . import (
     system_messages as system_messages,
     tf as tf,
 )
-
-[setattr(cls, "_betterproto", betterproto.ProtoClassMetadata(cls)) for cls in GCProtobufMessage.__subclasses__()]
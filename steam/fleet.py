@@ -0,0 +1,584 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE
+
+Running clients across several processes, so a large number of accounts isn't limited to one core.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hmac
+import inspect
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import secrets
+import time
+import zlib
+from collections.abc import Callable, Coroutine, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Final, TypeVar
+
+from ._const import READ_U32, WRITE_U32, TaskGroup
+from .client import Client
+from .enums import Enum
+from .errors import WorkerError
+from .gateway import ConnectionClosed
+from .id import ID
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+    from typing_extensions import Self, Unpack
+
+    from .client import ClientKwargs
+
+__all__ = (
+    "Fleet",
+    "FleetEvent",
+)
+
+log = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Coroutine[Any, Any, Any]])
+
+DEFAULT_EVENTS: Final = ("trade", "message", "item_receive")
+WORKER_POLL_INTERVAL: Final = 0.1
+TOKEN_SIZE: Final = 16
+PLAIN_TYPES: Final = (type(None), bool, int, float, str, bytes, datetime)
+
+
+def _summarise(obj: Any, depth: int = 1) -> Any:
+    """Turn ``obj`` into plain data that's small and can be pickled in a process without the client.
+
+    Models become a ``dict`` of their public attributes, with the models they reference reduced to their ID.
+    """
+    if type(obj) in PLAIN_TYPES or isinstance(obj, Enum):
+        return obj
+    if isinstance(obj, PLAIN_TYPES):  # subclasses like BBCodeStr can't always be pickled
+        return next(cls for cls in PLAIN_TYPES if isinstance(obj, cls))(obj)
+    if isinstance(obj, list | tuple | set | frozenset):
+        return [_summarise(value, depth) for value in obj]
+    if isinstance(obj, dict):
+        return {key: _summarise(value, depth) for key, value in obj.items() if isinstance(key, PLAIN_TYPES)}
+    if depth <= 0:
+        if isinstance(obj, ID):
+            return obj.id64
+        id = getattr(obj, "id", None)
+        return id if isinstance(id, int | str) else None
+
+    names = dict.fromkeys(
+        name
+        for cls in type(obj).__mro__
+        for name in itertools.chain(getattr(cls, "__slots__", ()), getattr(obj, "__dict__", ()))
+        if not name.startswith("_")
+    )
+    summary: dict[str, Any] = {"type": type(obj).__name__}
+    if isinstance(obj, ID):
+        summary["id64"] = obj.id64
+    for name in names:
+        try:
+            value = getattr(obj, name)
+        except AttributeError:  # an unset slot
+            continue
+        if not callable(value):
+            summary[name] = _summarise(value, depth - 1)
+    return summary
+
+
+class _Channel:
+    """Length prefixed pickles over a local socket, the connection between a :class:`Fleet` and a worker."""
+
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, *frame: Any) -> None:
+        data = pickle.dumps(frame, pickle.HIGHEST_PROTOCOL)
+        self.writer.write(WRITE_U32(len(data)) + data)
+
+    async def receive(self) -> tuple[Any, ...]:
+        size = READ_U32(await self.reader.readexactly(4))
+        return pickle.loads(await self.reader.readexactly(size))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+@dataclass(slots=True)
+class _Account:
+    name: str
+    cls: type[Client]
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    options: dict[str, Any]
+
+
+@dataclass(slots=True)
+class _Worker:
+    shard: int
+    accounts: list[_Account] = field(default_factory=list)
+    process: BaseProcess | None = None
+    channel: _Channel | None = None
+    calls: dict[int, asyncio.Future[Any]] = field(default_factory=dict)
+    restarts: int = 0
+
+
+@dataclass(slots=True)
+class FleetEvent:
+    """An event forwarded from a client running in one of a :class:`Fleet`'s workers."""
+
+    account: str
+    """The name of the account the event was dispatched for."""
+    event: str
+    """The name of the event, e.g. ``"message"``."""
+    args: list[Any]
+    """The arguments the event was dispatched with, with models turned into ``dict``\\s of their attributes and the
+    models they reference turned into their ID."""
+    shard: int
+    """The worker the account is running in."""
+
+
+@functools.cache
+def _forwarding(cls: type[Client]) -> type[Client]:
+    """Subclass ``cls`` to send the events the fleet wants to the parent process as well as dispatching them."""
+
+    def dispatch(self: Any, event: str, /, *args: Any, **kwargs: Any) -> None:
+        cls.dispatch(self, event, *args, **kwargs)
+        channel, name, events = self._fleet
+        if event in events and not channel.writer.is_closing():
+            channel.send("event", name, event, _summarise(args))
+
+    return type(cls.__name__, (cls,), {"dispatch": dispatch, "__module__": cls.__module__})
+
+
+async def _call(client: Client, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+    if method.startswith("_"):
+        raise AttributeError(f"{method!r} is private")
+    result = getattr(client, method)(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    elif hasattr(result, "__aiter__"):
+        result = [item async for item in result]
+    return _summarise(result)
+
+
+async def _worker(
+    address: tuple[str, int], token: bytes, shard: int, accounts: list[_Account], events: frozenset[str]
+) -> None:
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(token + WRITE_U32(shard))
+    channel = _Channel(reader, writer)
+    clients: dict[str, Client] = {}
+    for account in accounts:
+        client = clients[account.name] = _forwarding(account.cls)(**account.options)
+        client._fleet = (channel, account.name, events)  # type: ignore
+
+    async def run(client: Client, account: _Account) -> None:
+        try:
+            async with client:
+                try:
+                    await client.login(*account.args, **account.kwargs)
+                except* ConnectionClosed:
+                    if not client.is_closed():
+                        raise
+        except Exception as exc:  # one account failing mustn't take the others in the worker down with it
+            while isinstance(exc, ExceptionGroup) and len(exc.exceptions) == 1:
+                exc = exc.exceptions[0]
+            log.error("Account %s stopped after an error", account.name, exc_info=exc)
+            if not channel.writer.is_closing():
+                channel.send("account_error", account.name, type(exc).__name__, str(exc))
+
+    async def call(call_id: int, name: str, method: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        try:
+            result = await _call(clients[name], method, args, kwargs)
+        except Exception as exc:
+            channel.send("error", call_id, type(exc).__name__, str(exc))
+        else:
+            channel.send("result", call_id, result)
+
+    async with TaskGroup() as tg:
+        for account in accounts:
+            tg.create_task(run(clients[account.name], account), name=f"steam.py fleet client: {account.name}")
+
+        while True:
+            try:
+                frame = await channel.receive()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                frame = ("stop",)  # the fleet has gone away
+            if frame[0] == "stop":
+                break
+            _, call_id, name, method, args, kwargs = frame
+            tg.create_task(call(call_id, name, method, args, kwargs))
+
+        await asyncio.gather(*(client.close() for client in clients.values()))
+    channel.close()
+
+
+def _run_worker(
+    address: tuple[str, int], token: bytes, shard: int, accounts: list[_Account], events: frozenset[str]
+) -> None:
+    try:
+        asyncio.run(_worker(address, token, shard, accounts, events))
+    except KeyboardInterrupt:
+        pass
+
+
+class Fleet:
+    """Runs clients in worker processes, sharded by account, so that many accounts can use more than one core.
+
+    Each worker runs its accounts in one event loop using :meth:`Client.login` as normal and forwards the events
+    listened to back to this process over a local socket, where they're dispatched as :class:`FleetEvent`\\s. Methods
+    on a worker's clients can be called from here with :meth:`call`.
+
+    Workers that crash are restarted, waiting ``restart_delay`` seconds, doubling each time they crash in a row, up to
+    ``max_restart_delay`` seconds.
+
+    The client classes, login arguments and options for the accounts have to be able to be pickled, so the classes
+    need to be importable by the workers.
+
+    .. container:: operations
+
+        .. describe:: async with x
+
+            Starts the workers and stops them when the context is exited.
+
+    The events that can be listened to, using :meth:`event` or by subclassing, are:
+
+    - ``on_<event>(event: FleetEvent)`` for each event in ``events``, along with ``on_ready(event: FleetEvent)``.
+    - ``on_worker_start(shard: int)`` when a worker process is started.
+    - ``on_worker_crash(shard: int, exit_code: int)`` when a worker process exits unexpectedly.
+    - ``on_account_error(account: str, error: WorkerError)`` when an account's client stops because of an error, e.g.
+      its refresh token being invalid. The account isn't logged in again unless its worker is restarted.
+
+    Parameters
+    ----------
+    processes
+        The maximum number of worker processes to run, defaults to the number of CPUs.
+    events
+        The names of the events to forward from the clients.
+    restart_delay
+        The time in seconds to wait before restarting a worker that has crashed.
+    max_restart_delay
+        The longest time in seconds to wait before restarting a worker. A worker that runs for longer than this
+        before crashing is restarted after ``restart_delay`` again.
+    options
+        The options passed to every client, see :class:`Client`.
+
+    Examples
+    --------
+    .. code:: python3
+
+        fleet = steam.Fleet()
+        for account in accounts:
+            fleet.add(account.name, refresh_token=account.refresh_token)
+
+
+        @fleet.event
+        async def on_message(event: steam.FleetEvent) -> None:
+            print(event.account, "received", event.args[0]["content"])
+
+
+        async with fleet:
+            await fleet.wait_until_ready()
+            await asyncio.Future()  # run forever
+    """
+
+    def __init__(
+        self,
+        *,
+        processes: int | None = None,
+        events: Iterable[str] = DEFAULT_EVENTS,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        **options: Unpack[ClientKwargs],
+    ):
+        self.processes = processes or os.cpu_count() or 1
+        self.events = frozenset(events) | {"ready"}
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.options = options
+        self._accounts: dict[str, _Account] = {}
+        self._workers: dict[int, _Worker] = {}
+        self._ready: dict[str, asyncio.Event] = {}
+        self._listeners: dict[str, list[tuple[asyncio.Future[Any], Callable[..., bool]]]] = {}
+        self._call_ids = itertools.count()
+        self._token = secrets.token_bytes(TOKEN_SIZE)
+        self._server: asyncio.Server | None = None
+        self._supervisors: list[asyncio.Task[None]] = []
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._closing = False
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} accounts={len(self._accounts)} workers={len(self._workers)}>"
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def shard_for(self, name: str) -> int:
+        """The worker that the account called ``name`` runs in."""
+        return zlib.crc32(name.encode()) % self.processes
+
+    def add(
+        self,
+        name: str,
+        /,
+        *args: Any,
+        cls: type[Client] = Client,
+        options: ClientKwargs | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Add an account to the fleet. This must be done before the fleet is started.
+
+        Parameters
+        ----------
+        name
+            A unique name for the account, used to shard accounts between the workers and in :class:`FleetEvent`.
+        args, kwargs
+            The arguments to pass to :meth:`Client.login`.
+        cls
+            The :class:`Client` subclass to run the account with.
+        options
+            Options for this account's client, these take precedence over the fleet's.
+        """
+        if self._server is not None:
+            raise RuntimeError("Accounts must be added before the fleet is started")
+        if name in self._accounts:
+            raise ValueError(f"An account called {name!r} has already been added")
+        self._accounts[name] = _Account(name, cls, args, kwargs, dict(self.options | (options or {})))
+
+    def event(self, coro: F) -> F:
+        """A decorator that registers an event to listen to, like :meth:`Client.event`.
+
+        Raises
+        ------
+        :exc:`TypeError`
+            The function passed is not a coroutine.
+        """
+        if not inspect.iscoroutinefunction(coro):
+            raise TypeError(f"Registered events must be coroutine functions, {coro.__name__} is {type(coro).__name__}")
+        setattr(self, coro.__name__, coro)
+        return coro
+
+    def dispatch(self, event: str, /, *args: Any) -> None:
+        log.debug("Dispatching fleet event %s", event)
+        if listeners := self._listeners.get(event):
+            remaining: list[tuple[asyncio.Future[Any], Callable[..., bool]]] = []
+            for future, check in listeners:
+                if future.done():
+                    continue
+                try:
+                    matches = check(*args)
+                except Exception as exc:
+                    future.set_exception(exc)
+                    continue
+                if matches:
+                    future.set_result(args[0] if len(args) == 1 else args)
+                else:
+                    remaining.append((future, check))
+            self._listeners[event] = remaining
+
+        try:
+            coro = getattr(self, f"on_{event}")
+        except AttributeError:
+            return
+        task = asyncio.create_task(self._run_event(coro, event, *args), name=f"steam.py fleet task: {event}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_event(self, coro: Callable[..., Coroutine[Any, Any, Any]], event: str, *args: Any) -> None:
+        try:
+            await coro(*args)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            log.exception("Ignoring exception in fleet event on_%s", event)
+
+    async def wait_for(
+        self, event: str, *, check: Callable[..., bool] = lambda *_: True, timeout: float | None = None
+    ) -> Any:
+        """Wait for a fleet event to be dispatched, like :meth:`Client.wait_for`.
+
+        Parameters
+        ----------
+        event
+            The event name without the ``on_`` prefix.
+        check
+            A callable that takes the event's arguments and returns whether it's the one to wait for.
+        timeout
+            The number of seconds to wait before raising :exc:`asyncio.TimeoutError`.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._listeners.setdefault(event, []).append((future, check))
+        return await asyncio.wait_for(future, timeout)
+
+    async def start(self) -> None:
+        """Start the workers. Each account is logged in by the worker it's sharded to."""
+        if self._server is not None:
+            raise RuntimeError("The fleet has already been started")
+        self._closing = False
+        self._server = await asyncio.start_server(self._accept, "127.0.0.1", 0)
+        for account in self._accounts.values():
+            shard = self.shard_for(account.name)
+            self._workers.setdefault(shard, _Worker(shard)).accounts.append(account)
+            self._ready[account.name] = asyncio.Event()
+        self._supervisors = [
+            asyncio.create_task(self._supervise(worker), name=f"steam.py fleet supervisor: {worker.shard}")
+            for worker in self._workers.values()
+        ]
+
+    async def wait_until_ready(self) -> None:
+        """Wait until every account in the fleet is ready or has stopped because of an error."""
+        await asyncio.gather(*(ready.wait() for ready in self._ready.values()))
+
+    async def call(self, name: str, method: str, /, *args: Any, **kwargs: Any) -> Any:
+        """Call a method on the client for an account and return its result.
+
+        The result is returned as plain data the same way event arguments in :class:`FleetEvent` are, methods that
+        return asynchronous iterators have every item returned in a list.
+
+        Parameters
+        ----------
+        name
+            The name of the account.
+        method
+            The name of the :class:`Client` method to call.
+        args, kwargs
+            The arguments to call it with.
+
+        Raises
+        ------
+        :exc:`ValueError`
+            No account called ``name`` is in the fleet.
+        :exc:`WorkerError`
+            The worker for the account isn't running or the call raised an exception.
+        """
+        worker = self._workers.get(self.shard_for(name))
+        if name not in self._accounts or worker is None:
+            raise ValueError(f"No account called {name!r} is in this fleet")
+        if worker.channel is None:
+            raise WorkerError(f"The worker for {name!r} isn't running")
+        call_id = next(self._call_ids)
+        worker.calls[call_id] = future = asyncio.get_running_loop().create_future()
+        try:
+            worker.channel.send("call", call_id, name, method, args, kwargs)
+            return await future
+        finally:
+            worker.calls.pop(call_id, None)
+
+    async def close(self, *, timeout: float = 10) -> None:
+        """Stop every worker, closing their clients.
+
+        Parameters
+        ----------
+        timeout
+            The time in seconds to give the workers to close before terminating them.
+        """
+        self._closing = True
+        for worker in self._workers.values():
+            if worker.channel is not None:
+                worker.channel.send("stop")
+        if self._supervisors:
+            _, pending = await asyncio.wait(self._supervisors, timeout=timeout)
+            if pending:
+                log.warning("Fleet workers did not stop in time, terminating them")
+                for worker in self._workers.values():
+                    if worker.process is not None:
+                        worker.process.terminate()
+            await asyncio.gather(*self._supervisors)
+
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._supervisors.clear()
+        self._workers.clear()
+
+    async def _supervise(self, worker: _Worker) -> None:
+        assert self._server is not None
+        address = self._server.sockets[0].getsockname()[:2]
+        context = multiprocessing.get_context("spawn")  # forking a running event loop isn't safe
+        failures = 0
+        while True:
+            process = worker.process = context.Process(
+                target=_run_worker,
+                args=(address, self._token, worker.shard, worker.accounts, self.events),
+                name=f"steam.py fleet worker {worker.shard}",
+                daemon=True,
+            )
+            process.start()
+            started = time.monotonic()
+            self.dispatch("worker_start", worker.shard)
+            while process.exitcode is None:
+                await asyncio.sleep(WORKER_POLL_INTERVAL)
+
+            for account in worker.accounts:
+                self._ready[account.name].clear()
+            if self._closing or process.exitcode == 0:
+                return
+
+            if time.monotonic() - started > self.max_restart_delay:
+                failures = 0
+            delay = min(self.restart_delay * 2**failures, self.max_restart_delay)
+            failures += 1
+            worker.restarts += 1
+            log.warning(
+                "Fleet worker %d exited with code %d, restarting it in %.1fs", worker.shard, process.exitcode, delay
+            )
+            self.dispatch("worker_crash", worker.shard, process.exitcode)
+            await asyncio.sleep(delay)
+            if self._closing:
+                return
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            hello = await reader.readexactly(TOKEN_SIZE + 4)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        worker = self._workers.get(READ_U32(hello[TOKEN_SIZE:]))
+        if not hmac.compare_digest(hello[:TOKEN_SIZE], self._token) or worker is None:
+            log.warning("Rejected an unknown connection to the fleet")
+            writer.close()
+            return
+
+        channel = worker.channel = _Channel(reader, writer)
+        if self._closing:
+            channel.send("stop")
+        try:
+            while True:
+                self._handle(worker, await channel.receive())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if worker.channel is channel:
+                worker.channel = None
+            channel.close()
+            for future in worker.calls.values():
+                if not future.done():
+                    future.set_exception(WorkerError(f"Worker {worker.shard} exited during the call"))
+
+    def _handle(self, worker: _Worker, frame: tuple[Any, ...]) -> None:
+        match frame:
+            case ("event", name, event, args):
+                if event == "ready":
+                    self._ready[name].set()
+                self.dispatch(event, FleetEvent(name, event, args, worker.shard))
+            case ("account_error", name, type, message):
+                self._ready[name].set()  # it isn't going to become ready, don't keep wait_until_ready waiting
+                self.dispatch("account_error", name, WorkerError(message, type))
+            case ("result", call_id, result):
+                if (future := worker.calls.get(call_id)) is not None and not future.done():
+                    future.set_result(result)
+            case ("error", call_id, type, message):
+                if (future := worker.calls.get(call_id)) is not None and not future.done():
+                    future.set_exception(WorkerError(message, type))
@@ -12,6 +12,7 @@ import asyncio
 import base64
 import concurrent.futures
 import logging
+import os
 import random
 import sys
 import threading
@@ -21,22 +22,32 @@ from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import partial
-from gzip import FCOMMENT, FEXTRA, FHCRC, FNAME
 from ipaddress import IPv4Address
-from operator import attrgetter
+from operator import attrgetter, itemgetter
+from pathlib import Path
 from types import CoroutineType
 from typing import TYPE_CHECKING, Any, Final, Generic, Self, TypeAlias, overload
-from zlib import MAX_WBITS, decompress
+from zlib import MAX_WBITS, crc32, decompressobj, error as zlib_error
 
 import aiohttp
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from typing_extensions import TypeVar
 
 from . import utils
-from ._const import CLEAR_PROTO_BIT, DEFAULT_CMS, IS_PROTO, READ_U32, SET_PROTO_BIT, timeout
+from ._const import (
+    CLEAR_PROTO_BIT,
+    DEFAULT_CMS,
+    IS_PROTO,
+    JSON_DUMPS,
+    JSON_LOADS,
+    READ_U32,
+    SET_PROTO_BIT,
+    timeout,
+)
 from .enums import *
 from .errors import AuthenticatorError, HTTPException, NoCMsFound, WSException
 from .id import parse_id64
+from .metrics import message_name
 from .models import return_true
 from .protobufs import (
     EMsg,
@@ -51,24 +62,28 @@ from .protobufs import (
     client_server_2,
     friends,
     login,
+    notifications,
 )
 from .types.id import ID64, AppID
 from .user import AnonymousClientUser, ClientUser
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator, Callable, Iterable
+    from collections.abc import AsyncGenerator, Callable, Iterable, Sequence
+
+    from _typeshed import StrPath
 
     from .client import Client
     from .enums import UIMode
     from .protobufs.base import CMsgMulti
     from .state import ConnectionState
-    from .types.http import Coro, IPAdress
+    from .types.http import CM, Coro, IPAdress
 
 
 __all__ = (
     "ConnectionClosed",
     "SteamWebSocket",
     "CMServer",
+    "CMListCache",
     "Msgs",
     "RAISED_EXCEPTIONS",
 )
@@ -90,6 +105,14 @@ GCMsgT = TypeVar("GCMsgT", bound=GCMessage, default=GCMessage)
 GCMsgProtoT = TypeVar("GCMsgProtoT", bound=GCProtobufMessage, default=GCProtobufMessage)
 
 PROTOCOL_VERSION: Final = 65580
+PROBE_COUNT: Final = 10
+"""The number of the least loaded CMs to ping before connecting."""
+PROBE_TIMEOUT: Final = 2.0
+"""How long in seconds to wait for the pings."""
+CONNECT_RACE_SIZE: Final = 4
+"""The number of CMs to race connecting to at once."""
+CONNECT_RACE_DELAY: Final = 0.25
+"""How long in seconds to wait for a connection before also trying the next CM."""
 
 
 @dataclass(slots=True)
@@ -112,73 +135,236 @@ class CMServer:
     _state: ConnectionState
     url: str
     weighted_load: float
+    latency: float = float("inf")
+    """How long the last :meth:`ping` took in seconds."""
 
     def connect(self) -> Coro[aiohttp.ClientWebSocketResponse]:
         return self._state.http.connect_to_cm(self.url)
 
     async def ping(self) -> float:
+        """Ping the CM's ``/cmping/`` endpoint, returning its load and recording how long the request took."""
+        start = time.perf_counter()
         try:
             async with timeout(5), self._state.http._session.get(f"https://{self.url}/cmping/") as resp:
                 if resp.status != 200:
                     raise KeyError
-                return int(resp.headers["X-Steam-CMLoad"])
+                load = int(resp.headers["X-Steam-CMLoad"])
         except (KeyError, asyncio.TimeoutError, aiohttp.ClientError):
+            self.latency = float("inf")
             return float("inf")
+        self.latency = time.perf_counter() - start
+        return load
+
+
+class CMListCache:
+    """Persists the CM list fetched from the Web API to a JSON file, so that restarts can skip fetching it.
+
+    The same file can be shared between clients and processes, CMs that can't be connected to are removed from it.
+
+    Parameters
+    ----------
+    path
+        The file to store the list in. If ``None``, the list is only kept in memory, which is still useful to share
+        between clients in one process.
+    ttl
+        How long in seconds the stored list can be used for before it's fetched again.
+    """
+
+    def __init__(self, path: StrPath | None, *, ttl: float = 6 * 60 * 60):
+        self.path = Path(path) if path is not None else None
+        self.ttl = ttl
+        self._data: dict[str, Any] | None = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} path={str(self.path) if self.path else None!r} ttl={self.ttl}>"
+
+    def _read(self) -> dict[str, Any] | None:
+        if self.path is None:
+            return self._data
+        try:
+            return JSON_LOADS(self.path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, data: dict[str, Any]) -> None:
+        if self.path is None:
+            self._data = data
+            return
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(JSON_DUMPS(data))
+            tmp.replace(self.path)  # atomic so other processes never see half a file
+        except OSError:
+            log.warning("Failed to save the CM list to %s", self.path, exc_info=True)
+
+    def load(self, cell_id: int = 0) -> list[CM] | None:
+        """The stored CMs for ``cell_id`` if they haven't expired."""
+        data = self._read()
+        if data is None or data.get("cell_id") != cell_id or data.get("fetched_at", 0) + self.ttl < time.time():
+            return None
+        return data["servers"] or None
+
+    def save(self, cell_id: int, servers: list[CM]) -> None:
+        """Store the CMs fetched for ``cell_id``."""
+        self._write({"cell_id": cell_id, "fetched_at": time.time(), "servers": servers})
+
+    def discard(self, url: str) -> None:
+        """Remove a CM that couldn't be connected to."""
+        data = self._read()
+        if data is None:
+            return
+        servers = [server for server in data["servers"] if server["endpoint"] != url]
+        if len(servers) != len(data["servers"]):
+            self._write(data | {"servers": servers})
+
+
+async def rank_cms(cms: list[CMServer], *, spread_key: int = 0) -> list[CMServer]:
+    """Put the least loaded CMs with the lowest latency first.
+
+    The first :data:`PROBE_COUNT` CMs are pinged concurrently and ordered by their latency weighted by their load.
+    The :data:`CONNECT_RACE_SIZE` best are then rotated by ``spread_key`` so that accounts starting at the same time
+    are spread over them deterministically instead of all connecting to the same CM.
+    """
+    probed = cms[:PROBE_COUNT]
+    if not probed:
+        return cms
+    tasks = [asyncio.create_task(cm.ping()) for cm in probed]
+    done, pending = await asyncio.wait(tasks, timeout=PROBE_TIMEOUT)
+    for task in pending:
+        task.cancel()
+
+    scores: list[float] = []
+    for cm, task in zip(probed, tasks):
+        try:
+            load = task.result() if task in done else float("inf")
+        except Exception:
+            load = float("inf")
+        scores.append(cm.latency * (1 + load / 100) if load != float("inf") else float("inf"))
+    ranked = [cm for _, cm in sorted(zip(scores, probed), key=itemgetter(0))]
+    log.debug("Ranked CMs %s", [(cm.url, round(cm.latency, 3)) for cm in ranked])
+
+    top = ranked[:CONNECT_RACE_SIZE]
+    shift = spread_key % len(top)
+    return top[shift:] + top[:shift] + ranked[len(top) :] + cms[PROBE_COUNT:]
 
 
-async def fetch_cm_list(state: ConnectionState, cell_id: int = 0) -> AsyncGenerator[CMServer, None]:
+async def fetch_cm_list(
+    state: ConnectionState, cell_id: int = 0, *, spread_key: int = 0
+) -> AsyncGenerator[CMServer, None]:
     if state._connected_cm is not None:
         yield state._connected_cm
-    log.debug("Attempting to fetch servers from the WebAPI")
-    state.cell_id = cell_id
-    try:
-        data = await state.http.get_cm_list(cell_id)
-    except Exception:
-        servers = [CMServer(state, url=cm_url, weighted_load=0) for cm_url in DEFAULT_CMS]
-        random.shuffle(servers)
-        log.debug("Error occurred when fetching CM server list, falling back to internal list", exc_info=True)
-        for cm in servers:
-            yield cm
-        return
-
-    if not data["success"]:
-        servers = [CMServer(state, url=cm_url, weighted_load=0) for cm_url in DEFAULT_CMS]
-        random.shuffle(servers)
-        log.debug("Error occurred when fetching CM server list, falling back to internal list", exc_info=True)
-        for cm in servers:
-            yield cm
+    if state.cms is not None:
+        log.debug("Using the %d servers passed to the client", len(state.cms))
+        for cm_url in state.cms:
+            yield CMServer(state, url=cm_url, weighted_load=0)
         return
-
-    hosts = data["serverlist"]
-    log.debug("Received %d servers from WebAPI", len(hosts))
-    for cm in sorted(
+    state.cell_id = cell_id
+    cache = state.cm_list_cache
+    hosts = cache.load(cell_id) if cache is not None else None
+    if hosts is not None:
+        log.debug("Using %d servers from %s", len(hosts), cache.path)  # type: ignore
+    else:
+        log.debug("Attempting to fetch servers from the WebAPI")
+        try:
+            data = await state.http.get_cm_list(cell_id)
+            if not data["success"]:
+                raise ValueError("Fetching the CM list was unsuccessful")
+        except Exception:
+            servers = [CMServer(state, url=cm_url, weighted_load=0) for cm_url in DEFAULT_CMS]
+            random.shuffle(servers)
+            log.debug("Error occurred when fetching CM server list, falling back to internal list", exc_info=True)
+            for cm in servers:
+                yield cm
+            return
+
+        hosts = data["serverlist"]
+        log.debug("Received %d servers from WebAPI", len(hosts))
+        if cache is not None:
+            cache.save(cell_id, hosts)
+
+    servers = sorted(
         (CMServer(state, url=server["endpoint"], weighted_load=server["wtd_load"]) for server in hosts),
         key=attrgetter("weighted_load"),
-    ):  # they should already be sorted but oh well
+    )  # they should already be sorted but oh well
+    for cm in await rank_cms(servers, spread_key=spread_key):
         yield cm
 
 
+async def connect_to_first(cms: Sequence[CMServer]) -> tuple[CMServer, aiohttp.ClientWebSocketResponse] | None:
+    """Race connecting to ``cms`` happy eyeballs style.
+
+    A connection to the next CM is started every :data:`CONNECT_RACE_DELAY` seconds or as soon as the previous attempt
+    fails, the first to connect wins and the other attempts are cancelled. Returns ``None`` if none could be connected
+    to.
+    """
+    attempts: dict[asyncio.Task[aiohttp.ClientWebSocketResponse], CMServer] = {}
+    pending: set[asyncio.Task[aiohttp.ClientWebSocketResponse]] = set()
+    winner: tuple[CMServer, aiohttp.ClientWebSocketResponse] | None = None
+    remaining = iter(cms)
+    try:
+        while winner is None:
+            cm = next(remaining, None)
+            if cm is not None:
+                log.info("Attempting to create a websocket connection to %s (load: %f)", cm.url, cm.weighted_load)
+                task = asyncio.create_task(cm.connect(), name=f"steam.py: connecting to {cm.url}")
+                attempts[task] = cm
+                pending.add(task)
+            elif not pending:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=CONNECT_RACE_DELAY if cm is not None else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                cm = attempts[task]
+                exc = task.exception()
+                if exc is None:
+                    if winner is None:
+                        winner = cm, task.result()
+                    else:  # lost the race
+                        await task.result().close()
+                elif isinstance(exc, (aiohttp.ClientError, OSError, asyncio.TimeoutError)):
+                    log.info("Failed to connect to %s", cm.url, exc_info=exc)
+                    if (cache := cm._state.cm_list_cache) is not None:
+                        cache.discard(cm.url)
+                else:
+                    raise exc
+    finally:
+        for task in pending:
+            task.cancel()
+        for task in pending:
+            try:
+                socket = await task
+            except BaseException:
+                continue
+            await socket.close()  # connected while being cancelled
+    return winner
+
+
+async def _take(cm_list: AsyncGenerator[CMServer, None], count: int) -> list[CMServer]:
+    cms: list[CMServer] = []
+    async for cm in cm_list:
+        cms.append(cm)
+        if len(cms) == count:
+            break
+    return cms
+
+
+def _spread_key(client: Client, refresh_token: str | None) -> int:
+    account = client.username or (utils.decode_jwt(refresh_token)["sub"] if refresh_token else "")
+    return crc32(account.encode())
+
+
 def unpack_multi(msg: CMsgMulti) -> bytes | None:
     data = msg.message_body
     if data[:2] != b"\037\213":
         return log.info("Received a file that's not GZipped")
 
-    position = 10
-
-    if flag := data[3]:  # this isn't ever hit, might as well save a few nanos
-        if flag & FEXTRA:
-            extra_len = int.from_bytes(data[position : position + 2], "little")
-            position += 2 + extra_len
-        if flag & FNAME:
-            while data[position:]:
-                position += 1
-        if flag & FCOMMENT:
-            while data[position:]:
-                position += 1
-        if flag & FHCRC:
-            position += 2
-
-    decompressed = decompress(data[position:], wbits=-MAX_WBITS)
+    decompressor = decompressobj(wbits=MAX_WBITS | 16)  # zlib handles the gzip header
+    try:
+        # never inflate more than we were told to expect (+1 so that we can tell if there was more)
+        decompressed = decompressor.decompress(data, msg.size_unzipped + 1)
+    except zlib_error:
+        return log.info("Failed to decompress multi payload %r, discarding", msg)
 
     if len(decompressed) != msg.size_unzipped:
         return log.info("Unzipped size mismatch for multi payload %r, discarding", msg)
@@ -205,26 +391,44 @@ RAISED_EXCEPTIONS: Final = (
 )
 
 
-class KeepAliveHandler(threading.Thread):
-    def __init__(self, ws: SteamWebSocket, interval: int, loop: asyncio.AbstractEventLoop):
-        super().__init__()
+class _KeepAliveState:
+    def __init__(self, ws: SteamWebSocket, interval: int):
         self.ws = ws
-        self.loop = loop
         self.interval = interval
-        self._main_thread_id = self.ws.thread_id
         self.heartbeat = login.CMsgClientHeartBeat(send_reply=True)
         self.msg = "Keeping websocket alive with heartbeat %s."
-        self.block_msg = "Heartbeat blocked for more than {total} seconds."
         self.behind_msg = "Can't keep up, websocket is {total:.1f}s behind."
-        self._stop_ev = threading.Event()
-        self._last_recv = float("-inf")
+        self._last_recv = time.perf_counter()  # every logon response may have arrived before this starts
         self._last_ack = time.perf_counter()
         self._last_send = time.perf_counter()
         self.latency = float("inf")
 
+    def is_unresponsive(self) -> bool:
+        return self._last_recv + 60 < time.perf_counter()
+
+    def tick(self) -> None:
+        self._last_recv = time.perf_counter()
+
+    def ack(self) -> None:
+        ack_time = time.perf_counter()
+        self._last_ack = ack_time
+        self.latency = ack_time - self._last_send
+        if self.latency > 10:
+            log.warning(self.behind_msg.format(total=self.latency))
+
+
+class KeepAliveHandler(_KeepAliveState, threading.Thread):
+    def __init__(self, ws: SteamWebSocket, interval: int, loop: asyncio.AbstractEventLoop):
+        threading.Thread.__init__(self)
+        _KeepAliveState.__init__(self, ws, interval)
+        self.loop = loop
+        self._main_thread_id = self.ws.thread_id
+        self.block_msg = "Heartbeat blocked for more than {total} seconds."
+        self._stop_ev = threading.Event()
+
     def run(self) -> None:
         while not self._stop_ev.wait(self.interval):
-            if self._last_recv + 60 < time.perf_counter():
+            if self.is_unresponsive():
                 log.warning("CM %r has stopped responding to the gateway. Closing and restarting.", self.ws.cm)
                 coro = self.ws.close(4000)
                 f = asyncio.run_coroutine_threadsafe(coro, loop=self.loop)
@@ -268,15 +472,42 @@ class KeepAliveHandler(threading.Thread):
     def stop(self) -> None:
         self._stop_ev.set()
 
-    def tick(self) -> None:
-        self._last_recv = time.perf_counter()
 
-    def ack(self) -> None:
-        ack_time = time.perf_counter()
-        self._last_ack = ack_time
-        self.latency = ack_time - self._last_send
-        if self.latency > 10:
-            log.warning(self.behind_msg.format(total=self.latency))
+class AsyncKeepAliveHandler(_KeepAliveState):
+    """Sends heartbeats from a task on the websocket's event loop instead of a thread.
+
+    This can't detect the loop being blocked itself, use a :class:`~steam.LoopLagMonitor` for that.
+    """
+
+    def __init__(self, ws: SteamWebSocket, interval: int):
+        super().__init__(ws, interval)
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run(), name="steam.py: heartbeat")
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.is_unresponsive():
+                log.warning("CM %r has stopped responding to the gateway. Closing and restarting.", self.ws.cm)
+                try:
+                    await self.ws.close(4000)
+                except Exception:
+                    log.exception("An error occurred while stopping the gateway. Ignoring.")
+                return
+
+            log.debug(self.msg, self.heartbeat)
+            try:
+                await self.ws.send_proto(self.heartbeat)
+            except Exception:
+                return
+            self._last_send = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._task = None
 
 
 class SteamWebSocket:
@@ -295,8 +526,10 @@ class SteamWebSocket:
         self.cm = cm
         self.tg = asyncio.TaskGroup()
         # the keep alive
-        self._keep_alive: KeepAliveHandler
+        self._keep_alive: KeepAliveHandler | AsyncKeepAliveHandler
         self._dispatch = state.dispatch
+        self._recorder = state.client._recorder
+        self._metrics = state.client._metrics
         self.thread_id = threading.get_ident()
 
         # ws related stuff
@@ -315,19 +548,35 @@ class SteamWebSocket:
 
         self.public_ip: IPAdress
         self.connect_time: datetime
+        self.logon_timings: dict[str, float] = {}
+        """How long each phase of logging on took in seconds, see :meth:`Metrics.logon_phase` for the phases."""
 
     async def __aenter__(self) -> Self:
         await self.tg.__aenter__()
         return self
 
     async def __aexit__(self, *args: Any) -> None:
-        await self.tg.__aexit__(*args)
+        try:
+            await self.tg.__aexit__(*args)
+        except BaseExceptionGroup as exc:
+            if len(exc.exceptions) != 1:
+                raise
+            # unwrap the error so Client._login can tell that the connection closed and reconnect
+            raise exc.exceptions[0] from None
 
     @property
     def latency(self) -> float:
         """Measures latency between a heartbeat send and the heartbeat interval in seconds."""
         return self._keep_alive.latency
 
+    def _start_heartbeat(self, interval: int) -> None:
+        if self._state.client._heartbeat == "task":
+            self._keep_alive = AsyncKeepAliveHandler(ws=self, interval=interval)
+        else:
+            self._keep_alive = KeepAliveHandler(ws=self, interval=interval, loop=asyncio.get_running_loop())
+        self._keep_alive.start()
+        log.debug("Heartbeat started.")
+
     @overload
     def wait_for(
         self, /, *, emsg: EMsg | None, check: Callable[[ProtoMsgsT], bool] = return_true
@@ -407,18 +656,36 @@ class SteamWebSocket:
             yield
             timeout.reschedule(-1)
 
+    def _logon_phase(self, phase: str, start: float) -> None:
+        self.logon_timings[phase] = duration = time.perf_counter() - start
+        log.debug("Logon phase %s took %.3fs", phase, duration)
+        if self._metrics is not None:
+            self._metrics.logon_phase(phase, duration)
+
     def dispatch_ready(self):
         state = self._state
+        start = time.perf_counter()
+        caches = {
+            "emoticons": state.handled_emoticons,
+            "licenses": state.handled_licenses,
+            "wallet": state.handled_wallet,
+        }
+        if state.intents & Intents.ChatGroups > 0:
+            caches["chat_groups"] = state.handled_chat_groups
+            # due to a steam limitation we can't get these reliably on reconnect?  TODO check?
+            caches["friends"] = state.handled_friends
+        if state._resuming and state.intents & Intents.Users > 0:
+            caches["friends"] = state.handled_friends
+
+        async def wait_for(phase: str, cache: asyncio.Event) -> None:
+            await cache.wait()
+            self._logon_phase(phase, start)
 
         async def inner():
-            if state.intents & Intents.ChatGroups > 0:
-                await state.handled_chat_groups.wait()  # ensure group cache is ready
-            if state.intents & Intents.ChatGroups > 0:
-                # due to a steam limitation we can't get these reliably on reconnect?  TODO check?
-                await state.handled_friends.wait()  # ensure friend cache is ready
-            await state.handled_emoticons.wait()  # ensure emoticon cache is ready
-            await state.handled_licenses.wait()  # ensure licenses are ready
-            await state.handled_wallet.wait()  # ensure wallet is ready
+            # the caches are filled independently of each other, so this only takes as long as the slowest one
+            await asyncio.gather(*(wait_for(phase, cache) for phase, cache in caches.items()))
+            state._resuming = False
+            self._logon_phase("ready", start)
 
             await state.client._handle_ready()
 
@@ -429,30 +696,41 @@ class SteamWebSocket:
         cls, client: Client, /, refresh_token: str | None = None, cm_list: AsyncGenerator[CMServer, None] | None = None
     ) -> SteamWebSocket:
         state = client._state
-        cm_list = cm_list or fetch_cm_list(state)
+        cm_list = cm_list or fetch_cm_list(state, spread_key=_spread_key(client, refresh_token))
 
-        async for cm in cm_list:
-            log.info("Attempting to create a websocket connection to %s (load: %f)", cm.url, cm.weighted_load)
-            try:
-                socket = await cm.connect()
-            except aiohttp.ClientError:
+        while cms := await _take(cm_list, CONNECT_RACE_SIZE):
+            start = time.perf_counter()
+            if (connected := await connect_to_first(cms)) is None:
                 continue
+            cm, socket = connected
 
             log.debug("Connected to %s", cm.url)
 
             self = cls(state, socket, cm_list, cm)
+            self._logon_phase("connect", start)
             old_tg = self.tg
             self.tg = client._tg
             client.ws = self
             self._dispatch("connect")
 
             async with self.poll():
+                start = time.perf_counter()
                 await self.send_proto(login.CMsgClientHello(PROTOCOL_VERSION))
 
                 self.refresh_token = refresh_token or await self.fetch_refresh_token()
                 self.id64 = parse_id64(utils.decode_jwt(self.refresh_token)["sub"])
-
+                self._logon_phase("authenticate", start)
+
+                resuming = state.resume and state.login_complete.is_set() and state.client.user.id64 == self.id64
+                if resuming:
+                    # keep the caches from the last connection and only wait for the ones reconciled on logon
+                    state._resuming = True
+                    if state.intents & Intents.Users > 0:
+                        state.handled_friends.clear()
+                    if state.intents & Intents.ChatGroups > 0:
+                        state.handled_chat_groups.clear()
                 self.dispatch_ready()
+                start = time.perf_counter()
                 msg: login.CMsgClientLogonResponse = await self.send_proto_and_wait(
                     login.CMsgClientLogon(
                         protocol_version=PROTOCOL_VERSION,
@@ -469,31 +747,36 @@ class SteamWebSocket:
                     log.debug("Failed to login with result: %r", msg.result)
                     await self._state.handle_close()
 
+                self._logon_phase("logon", start)
                 self.public_ip = IPv4Address(msg.public_ip.v4)
                 self.connect_time = utils.DateTime.now()
                 self.session_id = msg.header.session_id
 
+                # none of these depend on each other, so send them all before waiting for the client user, anything
+                # handling their responses that needs the client user waits for login_complete
+                start = time.perf_counter()
+                await self.send_um(chat.GetMyChatRoomGroupsRequest())
+                await self.send_proto(friends.CMsgClientGetEmoticonList())
+                # the response is handled by ConnectionState.handle_notifications, so there's no need to wait for it
+                await self.send_um(notifications.GetSteamNotificationsRequest(include_hidden=True))
+                await self.send_proto(
+                    login.CMsgClientServerTimestampRequest(client_request_timestamp=int(time.time() * 1000))
+                )
                 us = await anext(self.fetch_users((self.id64,)))
-                client.http.user = ClientUser(state, us)
+                self._logon_phase("client_user", start)
+                if resuming:
+                    client.user._update(us)
+                else:
+                    client.http.user = ClientUser(state, us)
                 if hasattr(self._state, "_original_client_user_msg"):
                     self._state._original_client_user_msg = us  # type: ignore
-                state._users[client.user.id] = client.user  # type: ignore
+                state._users.store(client.user)  # type: ignore
                 self._state.cell_id = msg.cell_id
 
-                self._keep_alive = KeepAliveHandler(
-                    ws=self, interval=msg.heartbeat_seconds, loop=asyncio.get_running_loop()
-                )
-                self._keep_alive.start()
-                log.debug("Heartbeat started.")
+                self._start_heartbeat(msg.heartbeat_seconds)
 
                 state.login_complete.set()
 
-                await self.send_um(chat.GetMyChatRoomGroupsRequest())
-                await self.send_proto(friends.CMsgClientGetEmoticonList())
-                await self._state.fetch_notifications()
-                await self.send_proto(
-                    login.CMsgClientServerTimestampRequest(client_request_timestamp=int(time.time() * 1000))
-                )
                 await self.change_presence(
                     apps=self._state._apps,
                     state=self._state._state,
@@ -655,9 +938,10 @@ class SteamWebSocket:
     ) -> SteamWebSocket:
         state = client._state
         cm_list = cm_list or fetch_cm_list(state)
-        async for cm in cm_list:
-            log.info("Attempting to create a websocket connection to %s (load: %f)", cm.url, cm.weighted_load)
-            socket = await cm.connect()
+        while cms := await _take(cm_list, CONNECT_RACE_SIZE):
+            if (connected := await connect_to_first(cms)) is None:
+                continue
+            cm, socket = connected
             log.debug("Connected to %s", cm.url)
 
             self = cls(state, socket, cm_list, cm)
@@ -683,11 +967,7 @@ class SteamWebSocket:
                 self.id64 = msg.header.steam_id
                 self._state.cell_id = msg.cell_id
 
-                self._keep_alive = KeepAliveHandler(
-                    ws=self, interval=msg.heartbeat_seconds, loop=asyncio.get_running_loop()
-                )
-                self._keep_alive.start()
-                log.debug("Heartbeat started.")
+                self._start_heartbeat(msg.heartbeat_seconds)
 
                 state.login_complete.set()
                 state.http.user = AnonymousClientUser(state, self.id64)  # type: ignore
@@ -707,6 +987,8 @@ class SteamWebSocket:
         try:
             message = await self.socket.receive()
             if message.type is aiohttp.WSMsgType.BINARY:
+                if self._recorder is not None:
+                    self._recorder.record(False, message.data)
                 return self.receive(message.data)
             if message.type is aiohttp.WSMsgType.ERROR:
                 log.debug("Received %r", message)
@@ -718,13 +1000,15 @@ class SteamWebSocket:
         except WebSocketClosure:
             await self._state.handle_close()
 
-    def receive(self, message: bytes, /) -> None:
+    def receive(self, message: bytes | memoryview, /) -> None:
         emsg_value = READ_U32(message)
+        # sub-messages of a CMsgMulti are views, only copy the body out once here so bytes fields end up as bytes
+        body = message[4:] if isinstance(message, bytes) else message[4:].tobytes()
         try:
             msg = (
-                ProtobufMessage().parse(message[4:], CLEAR_PROTO_BIT(emsg_value))
+                ProtobufMessage().parse(body, CLEAR_PROTO_BIT(emsg_value))
                 if IS_PROTO(emsg_value)
-                else Message().parse(message[4:], emsg_value)
+                else Message().parse(body, emsg_value)
             )
         except Exception as exc:
             return log.error(
@@ -732,6 +1016,8 @@ class SteamWebSocket:
             )
 
         log.debug("Socket has received %r from the websocket.", msg)
+        if self._metrics is not None:
+            self._metrics.message_received(message_name(msg), len(message))
 
         if hasattr(self, "_keep_alive"):
             self._keep_alive.tick()
@@ -773,6 +1059,8 @@ class SteamWebSocket:
             del self.listeners[idx]
 
     async def send(self, data: bytes, /) -> None:
+        if self._recorder is not None:
+            self._recorder.record(True, data)
         try:
             await self.socket.send_bytes(data)
         except ConnectionResetError:
@@ -782,7 +1070,10 @@ class SteamWebSocket:
         message.header.steam_id = self.id64
         message.header.session_id = self.session_id
 
-        await self.send(bytes(message))
+        data = bytes(message)
+        if self._metrics is not None:
+            self._metrics.message_sent(message_name(message), len(data))
+        await self.send(data)
 
     async def send_gc_message(self, msg: GCMsgs, /) -> int:  # for ext's to send GC messages
         app_id = msg.APP_ID
@@ -828,8 +1119,14 @@ class SteamWebSocket:
         um.header.job_id_source = job_id = self.next_job_id
         check = check if check is not None else (lambda um: um.header.job_id_target == job_id)
         future = self.wait_for(emsg=EMsg.ServiceMethodSendToClient, check=check)
+        start = time.perf_counter()
         await self.send_proto(um)
-        return await future
+        if self._metrics is None:
+            return await future
+        try:
+            return await future
+        finally:
+            self._metrics.rpc_completed(um.UM_NAME, time.perf_counter() - start)
 
     async def send_proto_and_wait(
         self, msg: ProtoMsgs, /, check: Callable[[ProtoMsgsT], bool] | None = None
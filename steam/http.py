@@ -3,33 +3,38 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
 import re
 import urllib.parse
+from collections import deque
 from datetime import date, datetime
+from functools import partial
 from http.cookies import SimpleCookie
 from random import randbytes
 from sys import version_info
-from time import time
-from typing import TYPE_CHECKING, Any, Literal, TypeVar, Unpack, cast
+from time import perf_counter, time
+from typing import TYPE_CHECKING, Any, Final, Literal, TypeVar, Unpack, cast
 
 import aiohttp
 from bs4 import BeautifulSoup
 from yarl import URL as URL_
 
-from . import errors, utils
+from . import _scrape, errors, utils
 from .__metadata__ import __version__
 from ._const import HTML_PARSER, JSON_DUMPS, JSON_LOADS, URL
 from .enums import Currency, Language, Result, Type
-from .id import CLAN_ID64_FROM_URL_REGEX, ID, parse_id64
+from .id import ID, parse_id64
+from .metrics import route
 from .models import PriceOverviewDict, api_route
 from .types.id import ID32, ID64, AppID, AssetID, BundleID, ChatGroupID, ChatID, PackageID, PostID, TradeOfferID
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator, Callable, Iterable, Mapping, Sequence, ValuesView
+    from collections.abc import AsyncGenerator, Callable, Coroutine, Iterable, Mapping, Sequence, ValuesView
 
     from .client import Client, ClientKwargs
     from .media import Media
+    from .metrics import Metrics
     from .types import achievement, app, bundle, clan, guard, trade, user
     from .types.http import AddWalletCode, CMList, Coro, EResultSuccess, ResponseDict, StrOrURL
     from .types.user import IndividualID
@@ -39,9 +44,14 @@ if TYPE_CHECKING:
 T = TypeVar("T")
 log = logging.getLogger(__name__)
 
+MAX_CONCURRENT_CHUNKS: Final = 4
+"""The most requests for chunks of users to make at once."""
+MAX_CONCURRENT_MEMBER_PAGES: Final = 4
+"""The most pages of a clan's community member list to scrape at once."""
+
 
 async def json_or_text(r: aiohttp.ClientResponse, *, loads: Callable[[str], Any] = JSON_LOADS) -> Any:
-    text = await r.text()
+    text = await _scrape.read_text(r)
     try:
         if "application/json" in r.headers["Content-Type"]:
             return loads(text)
@@ -71,10 +81,14 @@ class HTTPClient:
         self.proxy_auth: aiohttp.BasicAuth | None = options.get("proxy_auth")
         self.connector: aiohttp.BaseConnector | None = options.get("connector")
         self.ssl = options.get("ssl")
+        self._metrics: Metrics | None = options.get("metrics")
+        self._pool = options.get("pool")
+        self._rate_limiter = self._pool.rate_limiter if self._pool is not None else None
 
     def clear(self) -> None:
         self._session = aiohttp.ClientSession(
-            connector=self.connector,
+            connector=self._pool.connector if self._pool is not None else self.connector,
+            connector_owner=self._pool is None,  # the pool closes its connector once every client is closed
             json_serialize=JSON_DUMPS,
         )
 
@@ -85,6 +99,7 @@ class HTTPClient:
         /,
         api_needs_auth: bool = True,
         supports_access_token: bool = True,
+        read: Callable[[aiohttp.ClientResponse], Coroutine[Any, Any, Any]] = json_or_text,
         **kwargs: Any,
     ) -> Any:  # adapted from d.py
         kwargs["headers"] = {"User-Agent": self.user_agent, **kwargs.get("headers", {})}
@@ -104,59 +119,72 @@ class HTTPClient:
             await self.ensure_logged_in()
 
         r = data = None
-        for tries in range(5):
-            async with self._session.request(
-                method, url, **kwargs, proxy=self.proxy, proxy_auth=self.proxy_auth, ssl=self.ssl
-            ) as r:  # noqa: F811
-                log.debug("%s %s with PAYLOAD: %s has returned %d", method, r.url, payload, r.status)
-
-                # even errors have text involved in them so this is safe to call
-                data = await json_or_text(r)
-
-                # the request was successful so just return the text/json
-                if 200 <= r.status < 300:
-                    log.debug("%s %s has received %s", method, r.url, data)
-                    return data
-
-                # we are being rate limited
-                elif r.status == 429:
-                    try:
-                        # I haven't been able to get any X-Retry-After headers from the API, but we should probably still
-                        # handle it
-                        delay = float(r.headers["X-Retry-After"])
-                    except KeyError:  # steam being un-helpful as usual
-                        delay = 2**tries
-                    log.warning("We are being rate limited sleeping for %s seconds", delay)
-                    await asyncio.sleep(delay)
-                    continue
-
-                # we've received a 500 or 502, an unconditional retry
-                elif r.status in {500, 502}:
-                    await asyncio.sleep(1 + tries * 3)
-                    continue
-
-                elif r.status == 401:
-                    if "key" in kwargs.get("params", ()) and (
-                        isinstance(data, str)
-                        and "Access is denied. Retrying will not help. Please verify your <pre>key=</pre>" in data
-                    ):  # api key either got revoked or it was never valid, time to fetch a new key
-                        key = await self.get_api_key()
-                        assert key is not None
-                        kwargs["params"]["key"] = key
-                        continue  # retry with our new key
-                    raise errors.HTTPException(r, data)
-
-                # the usual error cases
-                elif r.status == 403:
-                    raise errors.Forbidden(r, data)
-                elif r.status == 404:
-                    raise errors.NotFound(r, data)
-                else:
-                    raise errors.HTTPException(r, data)
-
-        assert r is not None
-        # we've run out of retries, raise
-        raise errors.HTTPException(r, data)
+        tries = 0
+        start = perf_counter()
+        try:
+            for tries in range(5):
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire(url.raw_host or "")
+                async with self._session.request(
+                    method, url, **kwargs, proxy=self.proxy, proxy_auth=self.proxy_auth, ssl=self.ssl
+                ) as r:
+                    log.debug("%s %s with PAYLOAD: %s has returned %d", method, r.url, payload, r.status)
+
+                    # even errors have text involved in them so this is safe to call
+                    data = await (read if 200 <= r.status < 300 else json_or_text)(r)
+
+                    # the request was successful so just return the text/json
+                    if 200 <= r.status < 300:
+                        log.debug("%s %s has received %s", method, r.url, data)
+                        return data
+
+                    # we are being rate limited
+                    elif r.status == 429:
+                        try:
+                            # I haven't been able to get any X-Retry-After headers from the API, but we should probably
+                            # still handle it
+                            delay = float(r.headers["X-Retry-After"])
+                        except KeyError:  # steam being un-helpful as usual
+                            delay = 2**tries
+                        log.warning("We are being rate limited sleeping for %s seconds", delay)
+                        if self._metrics is not None:
+                            self._metrics.rate_limited(route(url), delay)
+                        if self._rate_limiter is not None:
+                            self._rate_limiter.back_off(url.raw_host or "", delay)  # the next acquire waits for it
+                        else:
+                            await asyncio.sleep(delay)
+                        continue
+
+                    # we've received a 500 or 502, an unconditional retry
+                    elif r.status in {500, 502}:
+                        await asyncio.sleep(1 + tries * 3)
+                        continue
+
+                    elif r.status == 401:
+                        if "key" in kwargs.get("params", ()) and (
+                            isinstance(data, str)
+                            and "Access is denied. Retrying will not help. Please verify your <pre>key=</pre>" in data
+                        ):  # api key either got revoked or it was never valid, time to fetch a new key
+                            key = await self.get_api_key()
+                            assert key is not None
+                            kwargs["params"]["key"] = key
+                            continue  # retry with our new key
+                        raise errors.HTTPException(r, data)
+
+                    # the usual error cases
+                    elif r.status == 403:
+                        raise errors.Forbidden(r, data)
+                    elif r.status == 404:
+                        raise errors.NotFound(r, data)
+                    else:
+                        raise errors.HTTPException(r, data)
+
+            assert r is not None
+            # we've run out of retries, raise
+            raise errors.HTTPException(r, data)
+        finally:
+            if self._metrics is not None and r is not None:
+                self._metrics.http_request(method, route(url), r.status, perf_counter() - start, tries)
 
     def get(self, url: StrOrURL, **kwargs: Any) -> Coro[Any]:
         return self.request("GET", url, **kwargs)
@@ -177,7 +205,10 @@ class HTTPClient:
     def connect_to_cm(self, cm: str) -> Coro[aiohttp.ClientWebSocketResponse]:
         headers = {"User-Agent": self.user_agent}
         return self._session.ws_connect(  # type: ignore  # aiohttp types issue, fixed upstream
-            f"wss://{cm}/cmsocket/", headers=headers, proxy=self.proxy, proxy_auth=self.proxy_auth
+            cm if "://" in cm else f"wss://{cm}/cmsocket/",
+            headers=headers,
+            proxy=self.proxy,
+            proxy_auth=self.proxy_auth,
         )
 
     @utils.call_once(wait=True)
@@ -235,18 +266,28 @@ class HTTPClient:
     async def get_user(self, user_id64: ID64) -> user.User | None:
         return await anext(self.get_users((user_id64,)), None)
 
+    async def _get_chunked(
+        self, url: URL_, user_id64s: Iterable[ID64], **kwargs: Any
+    ) -> AsyncGenerator[Any, None]:  # requests for up to 100 users, a few at a time, in the order they finish
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+        async def get(chunk: tuple[ID64, ...]) -> Any:
+            async with semaphore:
+                return await self.get(url, params={"steamids": ",".join(map(str, chunk))}, **kwargs)
+
+        tasks = [asyncio.create_task(get(chunk)) for chunk in utils.as_chunks(user_id64s, 100)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def get_users(self, user_id64s: Iterable[ID64]) -> AsyncGenerator[user.User, None]:
-        for data in await asyncio.gather(  # gather all the requests concurrently
-            *(
-                self.get(
-                    api_route("ISteamUser/GetPlayerSummaries", version=2),
-                    params={"steamids": ",".join(map(str, sublist))},
-                    supports_access_token=False,
-                )
-                for sublist in utils.as_chunks(user_id64s, 100)
-            )
+        data: ResponseDict[dict[Literal["players"], list[user.User]]]
+        async for data in self._get_chunked(
+            api_route("ISteamUser/GetPlayerSummaries", version=2), user_id64s, supports_access_token=False
         ):
-            data: ResponseDict[dict[Literal["players"], list[user.User]]]
             for user in data["response"]["players"]:
                 yield user
 
@@ -274,8 +315,6 @@ class HTTPClient:
         return [parse_id64(group["gid"], type=Type.Clan) for group in data["response"]["groups"]]
 
     async def get_user_bans(self, *user_id64s: ID64) -> list[user.UserBan]:
-        params = {"steamids": ",".join(str(id64) for id64 in user_id64s)}
-        data: user.GetPlayerBans = await self.get(api_route("ISteamUser/GetPlayerBans"), params=params)
         return [
             {
                 "steamid": ID64(int(ban["SteamId"])),
@@ -286,7 +325,8 @@ class HTTPClient:
                 "number_of_game_bans": ban["NumberOfGameBans"],
                 "economy_ban": ban["EconomyBan"],
             }
-            for ban in data["players"]
+            async for data in self._get_chunked(api_route("ISteamUser/GetPlayerBans"), user_id64s)
+            for ban in cast("user.GetPlayerBans", data)["players"]
         ]
 
     async def get_user_level(self, user_id64: ID64) -> int:
@@ -351,15 +391,11 @@ class HTTPClient:
         return ret
 
     async def get_user_inventory_info(self, user_id64: ID64) -> ValuesView[user.InventoryInfo]:
-        resp = await self.get(URL.COMMUNITY / f"profiles/{user_id64}/inventory")
-        soup = BeautifulSoup(resp, "html.parser")
-        for script in soup.find_all("script", type="text/javascript"):
-            if match := re.search(r"var\s+g_rgAppContextData\s*=\s*(?P<json>{.*?});\s*", script.text):
-                break
-        else:
-            raise ValueError("Could not find inventory info")
-
-        return JSON_LOADS(match["json"]).values()
+        match, html = await self.get(
+            URL.COMMUNITY / f"profiles/{user_id64}/inventory",
+            read=partial(_scrape.search, pattern=_scrape.INVENTORY_INFO_RE),
+        )
+        return _scrape.inventory_info(match, html).values()
 
     async def send_user_gift(
         self, user_id: ID32, asset_id: AssetID, name: str, message: str, closing_note: str, signature: str
@@ -627,61 +663,46 @@ class HTTPClient:
 
     async def get_clan_members(self, clan_id64: ID64) -> AsyncGenerator[ID32, None]:
         url = f"{ID(clan_id64).community_url}/members"
-        page = 1
-        number_of_pages = None
-
-        while number_of_pages is None or page <= number_of_pages:
-            resp = await self.get(url, params={"p": page, "content_only": "true"})
-            soup = BeautifulSoup(resp, "html.parser")
-            if not number_of_pages:
-                page_select = soup.find("div", class_="group_paging")
-                assert page_select is not None
-                number_of_pages = int(re.findall(r"\d* - (\d*)", page_select.text)[0])
-
-            for s in soup.find_all("div", id="memberList"):
-                for user in s.find_all("div", class_="member_block"):
-                    yield int(user["data-miniprofile"])  # type: ignore
-            page += 1
+
+        async def get_page(page: int) -> list[ID32]:
+            _, ids = _scrape.clan_members_page(await self.get(url, params={"p": page, "content_only": "true"}))
+            return ids
+
+        number_of_pages, ids = _scrape.clan_members_page(await self.get(url, params={"p": 1, "content_only": "true"}))
+        for id in ids:
+            yield id
+
+        # keep a few pages loading ahead of the one being yielded, so members still come out in order without every
+        # page being held in memory if the consumer is slow
+        pages = iter(range(2, number_of_pages + 1))
+        tasks = deque(
+            asyncio.create_task(get_page(page)) for page in itertools.islice(pages, MAX_CONCURRENT_MEMBER_PAGES)
+        )
+        try:
+            while tasks:
+                ids = await tasks.popleft()
+                if (page := next(pages, None)) is not None:
+                    tasks.append(asyncio.create_task(get_page(page)))
+                for id in ids:
+                    yield id
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def get_clan_invitees(self) -> dict[ID64, ID64]:
-        # N.B. can only be invited by one person at a time
         resp = await self.get(URL.COMMUNITY / "my/groups/pending", params={"ajax": "1"})
-        soup = BeautifulSoup(resp, HTML_PARSER)
-        elements = soup.find_all("a", class_="linkStandard")
-
-        return {
-            ID64(
-                int(
-                    CLAN_ID64_FROM_URL_REGEX.search(clan_element["href"])["steamid"],
-                )
-            ): parse_id64(invitee_element["data-miniprofile"])
-            for (clan_element, invitee_element) in zip(
-                (element for element in elements if "steamLink" in element["class"]),
-                (element for element in elements if "data-miniprofile" in element.attrs),
-            )
-        }
+        return _scrape.clan_invitees(resp)
 
     async def get_clan_announcement_ids(self, clan_id64: ID64) -> list[int]:
         rss = await self.get(URL.COMMUNITY / f"gid/{clan_id64}/rss")
-        soup = BeautifulSoup(rss, HTML_PARSER)
-        return [
-            int(match[0])
-            for url in soup.find_all("guid")
-            if (match := re.findall(r"announcements/detail/(\d+)", url.text))
-        ]
+        return _scrape.clan_announcement_ids(rss)
 
     async def get_clan_events_for(self, clan_id64: ID64, date: date) -> list[int]:
         xml = await self.post(
             URL.COMMUNITY / f"gid/{clan_id64}/events",
             data={"xml": 1, "action": "eventFeed", "month": date.month, "year": date.year},
         )
-        soup = BeautifulSoup(xml, HTML_PARSER)
-        return [
-            int(url.rpartition("/")[2])
-            for event_title in soup.find_all("div", class_="eventBlockTitle")
-            for url in event_title.a.get("href")
-            if url
-        ]
+        return _scrape.clan_event_ids(xml)
 
     def _edit_clan_event(
         self,
@@ -471,7 +471,7 @@ class ManifestPath(PurePosixPath):
             else:
                 paths.append((path, dirnames, filenames))
 
-            paths += [path._make_child_relpath(d) for d in reversed(dirnames)]  # type: ignore
+            paths += [path / d for d in reversed(dirnames)]
 
     def glob(self, pattern: str, /) -> Generator[ManifestPath, None, None]:
         """Perform a glob operation on this path. Similar to :meth:`pathlib.Path.glob`."""
@@ -0,0 +1,553 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from aiohttp import web
+    from yarl import URL as URL_
+
+    from .client import Client
+    from .gateway import Msgs
+
+__all__ = (
+    "Metrics",
+    "PrometheusMetrics",
+    "LoopLagMonitor",
+)
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Final = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_ID_SEGMENT_RE: Final = re.compile(r"/\d+(?=/|$)")
+CACHE_FAMILIES: Final = (  # in the order of Metrics.cache_stats
+    ("cache_hits_total", "counter", "Lookups answered from a cache."),
+    ("cache_misses_total", "counter", "Lookups that had to be fetched as they weren't cached or were stale."),
+    ("cache_evictions_total", "counter", "Entries evicted from a cache to make space."),
+    ("cache_entries", "gauge", "Entries currently in a cache."),
+)
+
+
+def message_name(msg: Msgs) -> str:
+    """The name to record a message under, its unified message name if it has one otherwise its EMsg's name."""
+    try:
+        return msg.UM_NAME  # type: ignore
+    except AttributeError:
+        return getattr(msg.MSG, "name", str(msg.MSG))
+
+
+def route(url: URL_) -> str:
+    """The route to record a request to ``url`` under, with any numeric IDs in the path replaced to bound the number
+    of routes."""
+    return f"{url.host}{_ID_SEGMENT_RE.sub('/{id}', url.path)}"
+
+
+class Metrics:
+    """The interface the library reports metrics to. Every method does nothing, subclass this and override the
+    methods for the metrics you are interested in then pass an instance to :class:`~steam.Client`.
+
+    The methods are called inline on hot paths, so they should be cheap and must not block.
+    """
+
+    client: Client | None = None
+    """The first client this is attached to, set by :class:`~steam.Client`."""
+    clients: tuple[Client, ...] = ()
+    """Every client this is attached to. One instance can be shared between clients, such as those in a
+    :class:`ClientPool`, to aggregate their metrics."""
+
+    def bind(self, client: Client) -> None:
+        """Attach this to a client. Called by :class:`~steam.Client` when it is constructed and when it logs in."""
+        if client in self.clients:
+            return
+        if self.client is None:
+            self.client = client
+        self.clients = (*self.clients, client)
+
+    def unbind(self, client: Client) -> None:
+        """Detach this from a client, so a closed client isn't kept alive. Called by :class:`~steam.Client` when it is
+        closed."""
+        self.clients = tuple(c for c in self.clients if c is not client)
+        if self.client is client:
+            self.client = self.clients[0] if self.clients else None
+
+    def message_received(self, name: str, size: int) -> None:
+        """Called for every message received from the CM, including those unpacked from a ``CMsgMulti``.
+
+        Parameters
+        ----------
+        name
+            The message's unified message name if it has one (e.g. ``"Player.GetGameBadgeLevels#1"``) otherwise its
+            EMsg's name.
+        size
+            The size of the message in bytes.
+        """
+
+    def message_sent(self, name: str, size: int) -> None:
+        """Called for every message sent to the CM, with the same parameters as :meth:`message_received`."""
+
+    def rpc_completed(self, name: str, duration: float) -> None:
+        """Called when a unified message sent with ``send_um_and_wait`` gets a response or fails to.
+
+        Parameters
+        ----------
+        name
+            The unified message's name.
+        duration
+            The time in seconds between sending the request and receiving the response.
+        """
+
+    def http_request(self, method: str, route: str, status: int, duration: float, retries: int) -> None:
+        """Called when a request made by the HTTP client finishes.
+
+        Parameters
+        ----------
+        method
+            The HTTP method used.
+        route
+            The host and path requested with any numeric IDs replaced with ``{id}``.
+        status
+            The status code of the last response.
+        duration
+            The time in seconds taken including any retries.
+        retries
+            The number of times the request was retried.
+        """
+
+    def rate_limited(self, route: str, delay: float) -> None:
+        """Called when the HTTP client is rate limited and is about to back-off for ``delay`` seconds."""
+
+    def event_handled(self, event: str, duration: float, failed: bool) -> None:
+        """Called when an event handler finishes.
+
+        Parameters
+        ----------
+        event
+            The event's name without the ``on_`` prefix.
+        duration
+            The time in seconds the handler took to run.
+        failed
+            Whether the handler raised an exception.
+        """
+
+    def reconnected(self) -> None:
+        """Called when the client starts reconnecting to a CM after losing its connection."""
+
+    def logon_phase(self, phase: str, duration: float) -> None:
+        """Called when a phase of logging on to a CM finishes.
+
+        Parameters
+        ----------
+        phase
+            The phase's name. ``connect``, ``authenticate``, ``logon`` and ``client_user`` run one after another.
+            ``friends``, ``chat_groups``, ``emoticons``, ``licenses`` and ``wallet`` are the caches filled in
+            parallel before :meth:`Client.on_ready`, they and ``ready`` are timed from just before the logon is sent.
+        duration
+            The time in seconds the phase took.
+        """
+
+    def loop_lag(self, lag: float) -> None:
+        """Called by a :class:`LoopLagMonitor` with every sample of how late, in seconds, the event loop was running
+        callbacks."""
+
+    def listener_sizes(self) -> dict[str, int]:
+        """The number of listeners currently waiting in each of the clients' listener tables.
+
+        This is sampled rather than reported, call it when collecting metrics.
+        """
+        sizes = Counter[str]()
+        for client in self.clients:
+            state = client._state
+            ws = client.ws
+            sizes["events"] += sum(map(len, client._listeners.values()))
+            sizes["unified_messages"] += sum(map(len, state.um_listeners.values()))
+            sizes["messages"] += len(ws.listeners) if ws is not None else 0
+            sizes["gc_messages"] += len(ws.gc_listeners) if ws is not None else 0
+            if client._dispatcher is not None:
+                sizes["dispatcher_queue"] += client._dispatcher.depth
+                sizes["dispatcher_held"] += client._dispatcher.held
+        return dict(sizes)
+
+    def cache_stats(self) -> dict[str, tuple[int, int, int, int]]:
+        """The number of hits, misses, evictions and entries of each of the clients' caches, their :class:`UserCache`
+        and :class:`PriceCache`.
+
+        This is sampled rather than reported, call it when collecting metrics.
+        """
+        stats: dict[str, tuple[int, int, int, int]] = {}
+        for client in self.clients:
+            for name, cache in (("users", client._state._users), ("prices", client._state._prices)):
+                hits, misses, evictions, size = stats.get(name, (0, 0, 0, 0))
+                stats[name] = (hits + cache.hits, misses + cache.misses, evictions + cache.evictions, size + len(cache))
+        return stats
+
+
+@dataclass(slots=True)
+class _Histogram:
+    buckets: Sequence[float]
+    counts: list[int] = field(init=False)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.counts):
+            self.counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterable[tuple[float, int]]:
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+        yield math.inf, self.count
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusMetrics(Metrics):
+    """Collects metrics in memory and renders them in the Prometheus text exposition format.
+
+    Only uses the standard library to collect and render the metrics, :meth:`serve` can be used to expose them over
+    HTTP for Prometheus to scrape or :meth:`render` can be called from an existing web server.
+
+    Parameters
+    ----------
+    namespace
+        The prefix for every metric's name.
+    buckets
+        The upper bounds of the buckets for the duration histograms in seconds.
+    """
+
+    def __init__(self, *, namespace: str = "steam", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = sorted(map(float, buckets))
+        self.messages_received: dict[str, list[int]] = {}
+        """The number of messages and bytes received for each message name."""
+        self.messages_sent: dict[str, list[int]] = {}
+        """The number of messages and bytes sent for each message name."""
+        self.rpcs: dict[str, _Histogram] = {}
+        self.http_requests: dict[tuple[str, str, int], _Histogram] = {}
+        self.http_retries: dict[tuple[str, str], int] = {}
+        self.rate_limits: dict[str, list[float]] = {}
+        self.events: dict[str, _Histogram] = {}
+        self.event_errors: dict[str, int] = {}
+        self.reconnects = 0
+        self.loop_lags = _Histogram(self.buckets)
+        self.logon_phases: dict[str, _Histogram] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} namespace={self.namespace!r}>"
+
+    def _histogram(self, histograms: dict[Any, _Histogram], key: Any) -> _Histogram:
+        try:
+            return histograms[key]
+        except KeyError:
+            histograms[key] = histogram = _Histogram(self.buckets)
+            return histogram
+
+    def message_received(self, name: str, size: int) -> None:
+        try:
+            counts = self.messages_received[name]
+        except KeyError:
+            counts = self.messages_received[name] = [0, 0]
+        counts[0] += 1
+        counts[1] += size
+
+    def message_sent(self, name: str, size: int) -> None:
+        try:
+            counts = self.messages_sent[name]
+        except KeyError:
+            counts = self.messages_sent[name] = [0, 0]
+        counts[0] += 1
+        counts[1] += size
+
+    def rpc_completed(self, name: str, duration: float) -> None:
+        self._histogram(self.rpcs, name).observe(duration)
+
+    def http_request(self, method: str, route: str, status: int, duration: float, retries: int) -> None:
+        self._histogram(self.http_requests, (method, route, status)).observe(duration)
+        if retries:
+            key = (method, route)
+            self.http_retries[key] = self.http_retries.get(key, 0) + retries
+
+    def rate_limited(self, route: str, delay: float) -> None:
+        try:
+            counts = self.rate_limits[route]
+        except KeyError:
+            counts = self.rate_limits[route] = [0, 0.0]
+        counts[0] += 1
+        counts[1] += delay
+
+    def event_handled(self, event: str, duration: float, failed: bool) -> None:
+        self._histogram(self.events, event).observe(duration)
+        if failed:
+            self.event_errors[event] = self.event_errors.get(event, 0) + 1
+
+    def reconnected(self) -> None:
+        self.reconnects += 1
+
+    def loop_lag(self, lag: float) -> None:
+        self.loop_lags.observe(lag)
+
+    def logon_phase(self, phase: str, duration: float) -> None:
+        self._histogram(self.logon_phases, phase).observe(duration)
+
+    def render(self) -> str:
+        """Render the current value of every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines: list[str] = []
+        ns = self.namespace
+
+        def family(name: str, type: str, help: str) -> str:
+            lines.append(f"# HELP {ns}_{name} {help}")
+            lines.append(f"# TYPE {ns}_{name} {type}")
+            return f"{ns}_{name}"
+
+        def samples(name: str, label_names: Sequence[str], values: Iterable[tuple[Any, float]]) -> None:
+            for label_values, value in values:
+                if not isinstance(label_values, tuple):
+                    label_values = (label_values,)
+                lines.append(f"{name}{_labels(label_names, label_values)} {_format(value)}")
+
+        def histograms(name: str, help: str, label_names: Sequence[str], histograms: dict[Any, _Histogram]) -> None:
+            name = family(name, "histogram", help)
+            for label_values, histogram in histograms.items():
+                if not isinstance(label_values, tuple):
+                    label_values = (label_values,)
+                for bound, count in histogram.cumulative():
+                    labels = _labels((*label_names, "le"), (*label_values, _format(bound)))
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _labels(label_names, label_values)
+                lines.append(f"{name}_sum{labels} {_format(histogram.sum)}")
+                lines.append(f"{name}_count{labels} {histogram.count}")
+
+        for direction, counts in (("received", self.messages_received), ("sent", self.messages_sent)):
+            name = family(f"messages_{direction}_total", "counter", f"Messages {direction} over the websocket.")
+            samples(name, ("msg",), ((msg, count) for msg, (count, _) in counts.items()))
+            name = family(f"message_bytes_{direction}_total", "counter", f"Bytes {direction} over the websocket.")
+            samples(name, ("msg",), ((msg, size) for msg, (_, size) in counts.items()))
+
+        histograms("rpc_duration_seconds", "Time taken for unified messages to get a response.", ("method",), self.rpcs)
+        histograms(
+            "http_request_duration_seconds",
+            "Time taken for HTTP requests including retries.",
+            ("method", "route", "status"),
+            self.http_requests,
+        )
+        name = family("http_retries_total", "counter", "HTTP requests retried.")
+        samples(name, ("method", "route"), self.http_retries.items())
+        name = family("http_rate_limited_total", "counter", "HTTP requests that were rate limited.")
+        samples(name, ("route",), ((route, count) for route, (count, _) in self.rate_limits.items()))
+        name = family("http_rate_limit_delay_seconds_total", "counter", "Time spent backing off from rate limits.")
+        samples(name, ("route",), ((route, delay) for route, (_, delay) in self.rate_limits.items()))
+
+        histograms("event_handler_duration_seconds", "Time taken to run event handlers.", ("event",), self.events)
+        name = family("event_handler_errors_total", "counter", "Event handlers that raised an exception.")
+        samples(name, ("event",), self.event_errors.items())
+
+        if self.loop_lags.count:
+            histograms("event_loop_lag_seconds", "How late the loop was running callbacks.", (), {(): self.loop_lags})
+        histograms(
+            "logon_phase_duration_seconds", "Time taken by each phase of logging on.", ("phase",), self.logon_phases
+        )
+        name = family("reconnects_total", "counter", "Reconnections to a CM.")
+        samples(name, (), (((), self.reconnects),))
+        name = family("listeners", "gauge", "Listeners currently waiting in each listener table.")
+        samples(name, ("table",), self.listener_sizes().items())
+        cache_stats = self.cache_stats()
+        for idx, (metric, type, help) in enumerate(CACHE_FAMILIES):
+            name = family(metric, type, help)
+            samples(name, ("cache",), ((cache, values[idx]) for cache, values in cache_stats.items()))
+        latencies: list[float] = []
+        for client in self.clients:
+            try:
+                latency = client.latency  # raises before the first heartbeat
+            except AttributeError:
+                continue
+            if math.isfinite(latency):
+                latencies.append(latency)
+        if latencies:
+            name = family(
+                "latency_seconds", "gauge", "The mean latency between a heartbeat being sent and acknowledged."
+            )
+            samples(name, (), (((), sum(latencies) / len(latencies)),))
+        if len(self.clients) > 1:
+            name = family("clients", "gauge", "Clients reporting to these metrics.")
+            samples(name, (), (((), len(self.clients)),))
+
+        lines.append("")
+        return "\n".join(lines)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9090, path: str = "/metrics") -> web.AppRunner:
+        """Serve :meth:`render` over HTTP for Prometheus to scrape.
+
+        Parameters
+        ----------
+        host
+            The host to listen on.
+        port
+            The port to listen on.
+        path
+            The path to serve the metrics on.
+
+        Returns
+        -------
+        The running app's runner, call :meth:`aiohttp.web.AppRunner.cleanup` on it to stop serving.
+        """
+        from aiohttp import web
+
+        async def handler(_: web.Request) -> web.Response:
+            return web.Response(text=self.render(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get(path, handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+class LoopLagMonitor:
+    """Continuously measures how late the event loop is running callbacks, which is a good indication of something
+    blocking it.
+
+    A single monitor can be shared between every :class:`~steam.Client` running on the same event loop by passing it
+    as their ``loop_monitor``. It runs while any of them are logged in and reports every sample to their
+    :class:`Metrics`.
+
+    Parameters
+    ----------
+    interval
+        How often in seconds to sample the loop.
+    threshold
+        The lag in seconds above which the loop is considered blocked.
+    watchdog
+        Whether to start a thread that captures the loop thread's stack while it is blocked, to find out where it's
+        being blocked from. Otherwise, blocking is only detected after the fact without a call site.
+    """
+
+    def __init__(self, *, interval: float = 0.25, threshold: float = 0.1, watchdog: bool = False):
+        self.interval = interval
+        self.threshold = threshold
+        self.watchdog = watchdog
+        self.lag = 0.0
+        """The lag from the most recent sample in seconds."""
+        self.max_lag = 0.0
+        """The largest lag sampled in seconds."""
+        self.blocked = 0
+        """The number of samples where the lag was over the threshold."""
+        self.call_sites: Counter[str] = Counter()
+        """The number of times the watchdog caught the loop blocked at each call site."""
+
+        self._clients: set[Client] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop_ev = threading.Event()
+        self._last_tick = time.perf_counter()
+        self._loop_thread_id = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} lag={self.lag:.3f} max_lag={self.max_lag:.3f} blocked={self.blocked}>"
+
+    def is_running(self) -> bool:
+        """Whether the monitor is currently sampling the loop."""
+        return self._task is not None
+
+    def top_call_sites(self, n: int = 10) -> list[tuple[str, int]]:
+        """The ``n`` call sites the loop was most often caught blocked at by the watchdog."""
+        return self.call_sites.most_common(n)
+
+    def attach(self, client: Client) -> None:
+        """Start reporting to ``client``'s metrics, starting the monitor if needed. Called by the client on login."""
+        self._clients.add(client)
+        if self._task is not None:
+            return
+        self._last_tick = time.perf_counter()
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.create_task(self._run(), name="steam.py: loop lag monitor")
+        if self.watchdog:
+            self._stop_ev.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="steam.py: loop lag watchdog", daemon=True)
+            self._watchdog.start()
+
+    def detach(self, client: Client) -> None:
+        """Stop reporting to ``client``'s metrics, stopping the monitor if no clients are left. Called by the client
+        on close."""
+        self._clients.discard(client)
+        if self._clients or self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        self._stop_ev.set()
+        if self._watchdog is not None:
+            self._watchdog.join()  # returns as soon as it sees the stop event
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self._last_tick = time.perf_counter()
+            self._record(max(loop.time() - start - self.interval, 0.0))
+
+    def _record(self, lag: float) -> None:
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag >= self.threshold:
+            self.blocked += 1
+            log.warning("The event loop was blocked for %.3fs", lag)
+        # clients in a pool often share one Metrics, which should only see each sample once
+        for metrics in {id(m): m for c in self._clients if (m := c._metrics) is not None}.values():
+            metrics.loop_lag(lag)
+
+    def _watch(self) -> None:
+        caught_at = None
+        while not self._stop_ev.wait(self.threshold):
+            last_tick = self._last_tick
+            if time.perf_counter() - last_tick - self.interval < self.threshold:
+                continue
+            if caught_at == last_tick:  # only record each stall once
+                continue
+            try:
+                frame = sys._current_frames()[self._loop_thread_id]
+            except KeyError:
+                continue
+            caught_at = last_tick
+            code = frame.f_code
+            self.call_sites[f"{code.co_filename}:{frame.f_lineno} in {code.co_name}"] += 1
+            log.warning(
+                "The event loop is blocked, loop thread traceback (most recent call last):\n%s",
+                "".join(traceback.format_stack(frame)),
+            )
@@ -6,7 +6,7 @@ import abc
 import re
 from contextlib import AbstractAsyncContextManager, asynccontextmanager
 from dataclasses import dataclass, field
-from datetime import timedelta
+from datetime import datetime, timedelta
 from io import BytesIO
 from typing import TYPE_CHECKING, Any, Literal, ParamSpec, TypedDict, TypeVar, runtime_checkable
 
@@ -16,6 +16,7 @@ from ._const import DEFAULT_AVATAR, URL, ReadOnly
 from .enums import Currency, PurchaseResult, Realm, Result
 from .media import Media
 from .types.id import AppID, ClassID
+from .utils import DateTime
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator, Callable
@@ -24,15 +25,20 @@ if TYPE_CHECKING:
     from aiohttp.streams import AsyncStreamIterator, ChunkTupleAsyncStreamIterator
     from yarl import URL as _URL
 
+    from .abc import PartialUser
     from .app import PartialApp
+    from .badge import UserBadges
     from .protobufs import econ
     from .state import ConnectionState
     from .types import user
+    from .types.id import ID64
+    from .user import User
 
 
 __all__ = (
     "PriceOverview",
     "Ban",
+    "EnrichedUser",
     "Avatar",
     "Wallet",
 )
@@ -71,14 +77,16 @@ class PriceOverviewDict(TypedDict):
 class PriceOverview:
     """Represents the data received from the Steam Community Market."""
 
-    __slots__ = ("currency", "volume", "lowest_price", "median_price")
+    __slots__ = ("currency", "volume", "lowest_price", "median_price", "fetched_at", "stale")
 
     lowest_price: float | str
     """The lowest price observed by the market."""
     median_price: float | str
     """The median price observed by the market."""
 
-    def __init__(self, data: PriceOverviewDict, currency: Currency) -> None:
+    def __init__(
+        self, data: PriceOverviewDict, currency: Currency, *, fetched_at: datetime | None = None, stale: bool = False
+    ) -> None:
         lowest_price_ = PRICE_RE.search(data["lowest_price"])
         median_price_ = PRICE_RE.search(data["median_price"])
         assert lowest_price_ is not None
@@ -96,6 +104,10 @@ class PriceOverview:
         self.volume: int = int(data["volume"].replace(",", ""))
         """The number of items sold in the last 24 hours."""
         self.currency = currency
+        self.fetched_at = fetched_at or DateTime.now()
+        """When the price was fetched from the market."""
+        self.stale = stale
+        """Whether the price is older than its :class:`PriceCache` keeps prices for, as fetching a new one failed."""
 
     def __repr__(self) -> str:
         resolved = [f"{attr}={getattr(self, attr)!r}" for attr in self.__slots__]
@@ -149,6 +161,27 @@ class Ban:
         return self._market_banned
 
 
+@dataclass(slots=True)
+class EnrichedUser:
+    """A user's information fetched in bulk by :meth:`Client.fetch_users_enriched`.
+
+    Fields that weren't requested, or that Steam didn't return for the user, are ``None``.
+    """
+
+    id64: ID64
+    """The user's 64-bit Steam ID."""
+    user: User | None = None
+    """The user's summary."""
+    ban: Ban | None = None
+    """The user's bans."""
+    level: int | None = None
+    """The user's Steam level."""
+    badges: UserBadges[PartialUser] | None = None
+    """The user's badges."""
+    fields: frozenset[str] = frozenset()
+    """The fields that have been fetched."""
+
+
 class StreamReaderProto(Protocol):
     def __aiter__(self) -> AsyncStreamIterator[bytes]: ...
 
@@ -405,8 +438,7 @@ class DescriptionMixin(AssetMixin, Protocol):
 
             await client.fetch_price(item.market_hash_name, item.app, currency)
         """
-        price = await self._state.http.get_price(self._app_id, self.market_hash_name, currency)
-        return PriceOverview(price, currency or Currency.USD)
+        return await self._state._prices.fetch(self._app_id, self.market_hash_name, currency)
 
     @property
     def market_fee_app(self) -> PartialApp[None]:
@@ -0,0 +1,202 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import aiohttp
+
+from ._const import MISSING
+from .client import Client
+from .gateway import CMListCache, ConnectionClosed
+
+if TYPE_CHECKING:
+    from typing_extensions import Self, Unpack
+
+    from .client import ClientKwargs
+
+__all__ = (
+    "ClientPool",
+    "RateLimiter",
+)
+
+log = logging.getLogger(__name__)
+
+ClientT = TypeVar("ClientT", bound=Client)
+
+
+class RateLimiter:
+    """Spaces out HTTP requests to each host. Pass one to a :class:`ClientPool` to share it between its clients, so
+    accounts running from the same IP address don't trip Steam's per IP rate limits together.
+
+    When any client is rate limited by a host, every client sharing this backs off from that host.
+
+    Parameters
+    ----------
+    per_second
+        The maximum number of requests to make to each host per second.
+    """
+
+    def __init__(self, per_second: float = 10.0):
+        self.per_second = per_second
+        self.waited = 0.0
+        """The total time in seconds requests have spent waiting for their turn."""
+        self._next: dict[str, float] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} per_second={self.per_second}>"
+
+    async def acquire(self, host: str) -> None:
+        """Wait for the next free slot to send a request to ``host``."""
+        now = time.monotonic()
+        slot = max(now, self._next.get(host, 0.0))
+        self._next[host] = slot + 1 / self.per_second
+        if slot > now:
+            self.waited += slot - now
+            await asyncio.sleep(slot - now)
+
+    def back_off(self, host: str, delay: float) -> None:
+        """Stop any requests to ``host`` being sent for the next ``delay`` seconds."""
+        self._next[host] = max(self._next.get(host, 0.0), time.monotonic() + delay)
+
+
+class ClientPool:
+    """Runs many clients in one event loop, sharing what doesn't need to be per account between them.
+
+    The clients share:
+
+    - one :class:`aiohttp.TCPConnector`, so connections and DNS lookups are pooled rather than each client having its
+      own.
+    - a :class:`~steam.gateway.CMListCache`, so the CM list is only fetched from the Web API once.
+    - a :class:`RateLimiter` for their HTTP requests.
+    - any of the options passed to the pool, such as a :class:`Metrics` to aggregate every client's metrics in or a
+      :class:`LoopLagMonitor`.
+
+    Clients default to sending heartbeats from a task (see the ``heartbeat`` option of :class:`Client`) to avoid a
+    thread per account.
+
+    .. container:: operations
+
+        .. describe:: async with x
+
+            Closes every client and the shared connector when the context is exited.
+
+    Parameters
+    ----------
+    login_interval
+        The minimum time in seconds between each client starting to log in, to avoid every account hitting Steam at
+        once.
+    connector_limit
+        The maximum number of connections open at once over every client, ``0`` for no limit. Each client's websocket
+        holds one of these for as long as it's connected, so this should be well above the number of clients.
+    rate_limiter
+        The :class:`RateLimiter` to share between the clients. Defaults to one allowing 10 requests per second to
+        each host, pass ``None`` to not rate limit requests.
+    cm_list_cache
+        The :class:`~steam.gateway.CMListCache` to share between the clients. Defaults to one kept in memory.
+    options
+        The options passed to every client created with :meth:`add`. ``user_cache`` and ``price_cache`` can't be
+        shared between clients, so they have to be passed to :meth:`add` instead.
+
+    Examples
+    --------
+    .. code:: python3
+
+        async with steam.ClientPool(metrics=steam.PrometheusMetrics()) as pool:
+            for account in accounts:
+                client = pool.add(MyClient)
+                await pool.login(client, refresh_token=account.refresh_token)
+            await pool.wait_until_ready()
+            ...
+    """
+
+    def __init__(
+        self,
+        *,
+        login_interval: float = 1.0,
+        connector_limit: int = 0,
+        rate_limiter: RateLimiter | None = MISSING,
+        cm_list_cache: CMListCache | None = None,
+        **options: Unpack[ClientKwargs],
+    ):
+        for name in ("user_cache", "price_cache"):
+            if options.get(name) is not None:
+                raise ValueError(f"{name} can't be shared between clients, pass it to add instead")
+        self.login_interval = login_interval
+        self.connector_limit = connector_limit
+        self.rate_limiter = RateLimiter() if rate_limiter is MISSING else rate_limiter
+        self.cm_list_cache = cm_list_cache or CMListCache(None)
+        self.options = options
+        self.clients: list[Client] = []
+        """The clients in the pool."""
+        self._connector: aiohttp.TCPConnector | None = None
+        self._tasks: dict[Client, asyncio.Task[None]] = {}
+        self._next_login = 0.0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} clients={len(self.clients)} logging_in={len(self._tasks)}>"
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        """The connector shared by every client's HTTP session and websocket."""
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(limit=self.connector_limit, ttl_dns_cache=300)
+        return self._connector
+
+    def add(self, cls: type[ClientT] = Client, /, **options: Unpack[ClientKwargs]) -> ClientT:
+        """Create a client in the pool.
+
+        Parameters
+        ----------
+        cls
+            The :class:`Client` subclass to create.
+        options
+            Options for this client, they take precedence over the pool's.
+        """
+        defaults: ClientKwargs = {"heartbeat": "task", "cm_list_cache": self.cm_list_cache}
+        client = cls(**defaults | self.options | options, pool=self)
+        self.clients.append(client)
+        return client
+
+    async def login(self, client: Client, /, *args: Any, **kwargs: Any) -> asyncio.Task[None]:
+        """Start logging a client in once it's had its turn after the other clients in the pool.
+
+        Takes the same arguments as :meth:`Client.login`. Unlike it, this returns once the login has started, returning
+        the task running it.
+        """
+        if client not in self.clients:
+            raise ValueError(f"{client!r} is not in this pool")
+        now = time.monotonic()
+        slot = max(now, self._next_login)
+        self._next_login = slot + self.login_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        self._tasks[client] = task = asyncio.create_task(client.login(*args, **kwargs))
+        return task
+
+    async def wait_until_ready(self) -> None:
+        """Wait for every client that has started logging in to be ready."""
+        await asyncio.gather(*(client.wait_until_ready() for client in self._tasks))
+
+    async def close(self) -> None:
+        """Close every client in the pool then the shared connector."""
+        await asyncio.gather(*(client.close() for client in self.clients if not client.is_closed()))
+        for client, result in zip(
+            self._tasks, await asyncio.gather(*self._tasks.values(), return_exceptions=True), strict=True
+        ):
+            if isinstance(result, BaseExceptionGroup):
+                _, result = result.split(ConnectionClosed)
+            if isinstance(result, BaseException) and not isinstance(result, ConnectionClosed):
+                log.error("%r failed while logged in", client, exc_info=result)
+        self._tasks.clear()
+        if self._connector is not None:
+            await self._connector.close()
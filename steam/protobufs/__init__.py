@@ -6,11 +6,12 @@ The protobufs for the Steam API.
 Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE
 """
 
+import importlib
+import sys
 from collections.abc import Mapping
+from types import ModuleType
 from typing import TYPE_CHECKING, Final, TypeAlias, cast
 
-import betterproto
-
 PROTOBUFS: Final = cast("Mapping[EMsg, type[ProtobufMessage | Message]]", {})
 RequestType: TypeAlias = "type[UnifiedMessage]"
 ResponseType: TypeAlias = "type[UnifiedMessage]"
@@ -18,11 +19,42 @@ UMS: Final = cast(Mapping[str, tuple[RequestType, ResponseType]], {})
 GC_PROTOBUFS: Final = cast("Mapping[AppID, Mapping[IntEnum, type[GCProtobufMessage | GCMessage]]]", {})
 
 from .emsg import *
+
+# modules the library doesn't use itself. These are imported the first time they're accessed or when one of their
+# messages is received, tests/unit/test_protobufs.py checks these stay in sync with the modules' contents
+LAZY_MODULES: Final = frozenset({"cloud", "parental", "two_factor", "ucm"})
+LAZY_UM_SERVICES: Final[Mapping[str, str]] = {
+    "Cloud": "cloud",
+    "CloudClient": "cloud",
+    "Parental": "parental",
+    "TwoFactor": "two_factor",
+}
+LAZY_EMSGS: Final[Mapping[EMsg, str]] = {
+    EMsg.ClientScreenshotsChanged: "ucm",
+}
+
+
+def import_lazy_module(name: str | None) -> bool:
+    """Import one of the :data:`LAZY_MODULES`, returns whether this registered any new messages."""
+    if name is None or f"{__name__}.{name}" in sys.modules:
+        return False
+    importlib.import_module(f".{name}", __name__)
+    return True
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name in LAZY_MODULES:
+        import_lazy_module(name)
+        return sys.modules[f"{__name__}.{name}"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 from .msg import *
 
 if TYPE_CHECKING:
     from ..enums import IntEnum
     from ..types.id import AppID
+    from . import cloud as cloud, parental as parental, two_factor as two_factor, ucm as ucm
 
 __all__ = (
     "EMsg",
@@ -40,7 +72,7 @@ __all__ = (
     "SERVICE_EMSGS",
 )
 
-# NOTE all modules need to be included here otherwise messages won't be parsed correctly
+# NOTE all modules need to be included here or in LAZY_MODULES otherwise messages won't be parsed correctly
 from . import (
     app_info as app_info,
     auth as auth,
@@ -49,7 +81,6 @@ from . import (
     clan as clan,
     client_server as client_server,
     client_server_2 as client_server_2,
-    cloud as cloud,
     community as community,
     content_manifest as content_manifest,
     content_server as content_server,
@@ -62,17 +93,11 @@ from . import (
     login as login,
     loyalty_rewards as loyalty_rewards,
     notifications as notifications,
-    parental as parental,
     player as player,
     published_file as published_file,
     quest as quest,
     reviews as reviews,
     store as store,
-    two_factor as two_factor,
-    ucm as ucm,
     user_news as user_news,
     user_stats as user_stats,
 )
-
-[setattr(cls, "_betterproto", betterproto.ProtoClassMetadata(cls)) for cls in ProtobufMessage.__subclasses__()]
-[setattr(cls, "_betterproto", betterproto.ProtoClassMetadata(cls)) for cls in UnifiedMessage.__subclasses__()]
@@ -19,7 +19,7 @@ from typing_extensions import Self, dataclass_transform
 from .._const import MISSING, SET_PROTO_BIT, WRITE_U32
 from ..enums import IntEnum, Result
 from ..utils import classproperty
-from . import GC_PROTOBUFS, PROTOBUFS, UMS
+from . import GC_PROTOBUFS, LAZY_EMSGS, LAZY_UM_SERVICES, PROTOBUFS, UMS, import_lazy_module
 from .emsg import *
 from .headers import *
 from .headers import MessageHeader
@@ -57,6 +57,39 @@ class NoMsg(IntEnum):
     NONE = -2
 
 
+def get_protobuf(msg: int) -> type[ProtobufMessage | Message]:
+    try:
+        return PROTOBUFS[msg]  # type: ignore
+    except KeyError:
+        if not import_lazy_module(LAZY_EMSGS.get(msg)):  # type: ignore
+            raise
+        return PROTOBUFS[msg]  # type: ignore
+
+
+def get_um(name: str, is_response: bool) -> type[UnifiedMessage]:
+    try:
+        return UMS[name][is_response]
+    except KeyError:
+        service, _, _ = name.partition(".")
+        if not import_lazy_module(LAZY_UM_SERVICES.get(service)):
+            raise
+        return UMS[name][is_response]
+
+
+class LazyProtoClassMetadata:
+    """Builds a message class's betterproto metadata the first time it's needed instead of at import time."""
+
+    __slots__ = ()
+
+    def __get__(self, instance: object, owner: type[betterproto.Message]) -> betterproto.ProtoClassMetadata:
+        try:
+            return owner.__dict__["_betterproto_meta"]
+        except KeyError:
+            meta = betterproto.ProtoClassMetadata(owner)
+            owner._betterproto_meta = meta  # type: ignore  # not inherited as we only look in the class' __dict__
+            return meta
+
+
 @load_annotations
 class MessageBase:
     __slots__ = ()
@@ -152,7 +185,7 @@ class Message(MessageMessageBase, NotProtobufWrapped):
         /,
     ) -> Self:
         try:
-            new_class: type[Self] = PROTOBUFS[msg]  # type: ignore
+            new_class: type[Self] = get_protobuf(msg)  # type: ignore
         except KeyError:
             log.debug("Received an unknown %r (%s)", EMsg(msg), data)
             return self
@@ -165,6 +198,8 @@ class Message(MessageMessageBase, NotProtobufWrapped):
 class ProtobufWrappedMessage(MessageBase, betterproto.Message):
     __slots__ = ()
     header: ProtobufMessageHeader
+    if not TYPE_CHECKING:
+        _betterproto = LazyProtoClassMetadata()
 
     def __post_init__(self) -> None:
         self.header = ProtobufMessageHeader(job_name_target=getattr(self.__class__, "UM_NAME", ""))
@@ -197,13 +232,13 @@ class ProtobufMessage(MessageMessageBase, ProtobufWrappedMessage):
         self.header.parse(data)
         if msg in SERVICE_EMSGS:
             try:
-                new_class = UMS[self.header.job_name_target][msg in RESPONSE_EMSGS]  # type: ignore
+                new_class = get_um(self.header.job_name_target, msg in RESPONSE_EMSGS)  # type: ignore
             except KeyError:
                 log.debug("Received an unknown UM %r (%s)", self.header.job_name_target, data)
                 return self
         else:
             try:
-                new_class: type[Self] = PROTOBUFS[msg]  # type: ignore  # save the extra lookup when casting to EMsg
+                new_class: type[Self] = get_protobuf(msg)  # type: ignore  # save the extra lookup when casting to EMsg
             except KeyError:
                 log.debug("Received an unknown %r (%s)", EMsg(msg), data)
                 return self
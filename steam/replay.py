@@ -0,0 +1,625 @@
+"""Licensed under The MIT License (MIT) - Copyright (c) 2020-present James H-B. See LICENSE
+
+Tools for recording the traffic between a :class:`~steam.Client` and a CM and serving it back from a local fake CM, so
+that the library can be load tested and benchmarked without a Steam account.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import logging
+import os
+import struct
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any, Final, TypeAlias, TypeVar
+
+from aiohttp import WSMsgType, web
+
+from ._const import CLEAR_PROTO_BIT, IS_PROTO, JSON_DUMPS, READ_U32, SET_PROTO_BIT, WRITE_U32, TaskGroup, timeout
+from .enums import ChatEntryType, FriendRelationship, PersonaState, Result
+from .protobufs import (
+    EMsg,
+    GCMessage,
+    GCProtobufMessage,
+    Message,
+    ProtobufMessage,
+    base,
+    chat,
+    client_server,
+    client_server_2,
+    friend_messages,
+    friends,
+    login,
+    notifications,
+)
+from .protobufs.headers import MessageHeader, ProtobufMessageHeader
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from .gateway import Msgs
+
+__all__ = (
+    "Frame",
+    "Recording",
+    "CMRecorder",
+    "FakeCMServer",
+    "CMSession",
+    "Scenario",
+    "LogonScenario",
+    "ReplayScenario",
+    "make_refresh_token",
+    "chat_flood",
+    "trade_notifications",
+    "gc_message",
+    "multi",
+)
+
+log = logging.getLogger(__name__)
+
+StrPath: TypeAlias = "str | os.PathLike[str]"
+MsgT = TypeVar("MsgT", bound="ProtobufMessage | Message")
+Responder: TypeAlias = Callable[["CMSession", Any], Awaitable[None]]
+
+MAGIC: Final = b"SPCM\x01"
+FRAME: Final = struct.Struct("<?dI")  # sent by the client, seconds since the recording started, length
+DEFAULT_ID64: Final = 76561198000000000
+IGNORED_EMSGS: Final = frozenset({EMsg.ClientHeartBeat, EMsg.ClientLogOff})  # sent whenever the client feels like it
+
+
+def _open(fp: StrPath | IO[bytes], mode: str) -> IO[bytes]:
+    if not isinstance(fp, str | os.PathLike):
+        return fp
+    return (gzip.open if os.fspath(fp).endswith(".gz") else open)(fp, mode)  # type: ignore
+
+
+def read_header(data: bytes | memoryview) -> tuple[int, ProtobufMessageHeader | MessageHeader]:
+    """Read the EMsg and header of a raw CM frame without parsing its body."""
+    emsg_value = READ_U32(data)
+    if IS_PROTO(emsg_value):
+        return CLEAR_PROTO_BIT(emsg_value), ProtobufMessageHeader().parse(bytes(data[4:]))
+    return emsg_value, MessageHeader().parse(bytes(data[4:]))
+
+
+def parse_frame(data: bytes) -> Msgs:
+    """Parse a raw CM frame the same way :class:`~steam.gateway.SteamWebSocket` does."""
+    emsg_value = READ_U32(data)
+    return (
+        ProtobufMessage().parse(data[4:], CLEAR_PROTO_BIT(emsg_value))
+        if IS_PROTO(emsg_value)
+        else Message().parse(data[4:], emsg_value)
+    )
+
+
+def make_refresh_token(id64: int = DEFAULT_ID64) -> str:
+    """Make an unsigned refresh token for ``id64`` that can be passed to :meth:`steam.Client.login` to login to a
+    :class:`FakeCMServer`.
+    """
+
+    def encode(data: dict[str, Any]) -> str:
+        return base64.urlsafe_b64encode(JSON_DUMPS(data).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode({'sub': str(id64), 'aud': ['client']})}."
+
+
+@dataclass(slots=True)
+class Frame:
+    """A websocket frame sent between a client and a CM."""
+
+    sent: bool
+    """Whether the client sent this frame, otherwise it was received from the CM."""
+    timestamp: float
+    """The number of seconds since the recording started that the frame was sent or received."""
+    data: bytes
+    """The raw frame."""
+
+    @property
+    def msg(self) -> EMsg:
+        """The frame's EMsg."""
+        return EMsg.try_value(CLEAR_PROTO_BIT(READ_U32(self.data)))
+
+
+class Recording(Sequence[Frame]):
+    """The frames sent and received by a client. Files ending in ``.gz`` are gzipped.
+
+    .. container:: operations
+
+        .. describe:: len(x)
+
+            Returns the number of frames.
+
+        .. describe:: iter(x)
+
+            Iterates over the frames in the order they were sent or received.
+
+    Warning
+    -------
+    Recordings contain everything sent over the websocket, including access tokens, so be careful who you share them
+    with.
+    """
+
+    __slots__ = ("frames",)
+
+    def __init__(self, frames: Iterable[Frame] = ()):
+        self.frames = list(frames)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} frames={len(self.frames)}>"
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __iter__(self) -> Iterator[Frame]:
+        return iter(self.frames)
+
+    def __getitem__(self, idx: Any) -> Any:
+        return self.frames[idx]
+
+    @classmethod
+    def load(cls, fp: StrPath | IO[bytes]) -> Self:
+        """Load a recording made with :class:`CMRecorder`."""
+        with _open(fp, "rb") as file:
+            data = file.read()
+        if not data.startswith(MAGIC):
+            raise ValueError("not a CM recording")
+
+        frames: list[Frame] = []
+        offset = len(MAGIC)
+        while offset < len(data):
+            sent, timestamp, length = FRAME.unpack_from(data, offset)
+            offset += FRAME.size
+            frames.append(Frame(sent, timestamp, data[offset : offset + length]))
+            offset += length
+        return cls(frames)
+
+    def dump(self, fp: StrPath | IO[bytes]) -> None:
+        """Write the recording in the format :class:`CMRecorder` uses."""
+        with CMRecorder(fp) as recorder:
+            for frame in self.frames:
+                recorder.write(frame)
+
+
+class CMRecorder:
+    """Records every websocket frame a :class:`~steam.Client` sends to and receives from the CM.
+
+    Pass one to :class:`~steam.Client` as ``recorder`` and load the result with :meth:`Recording.load`.
+
+    Parameters
+    ----------
+    fp
+        The path or binary file to write the recording to. Paths ending in ``.gz`` are gzipped.
+    """
+
+    def __init__(self, fp: StrPath | IO[bytes]):
+        self._file = _open(fp, "wb")
+        self._file.write(MAGIC)
+        self._started = time.perf_counter()
+        self.frames = 0
+        """The number of frames recorded."""
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} frames={self.frames}>"
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def record(self, sent: bool, data: bytes | memoryview) -> None:
+        """Record a frame, this is called by the client's websocket."""
+        self._file.write(FRAME.pack(sent, time.perf_counter() - self._started, len(data)))
+        self._file.write(data)
+        self.frames += 1
+
+    def write(self, frame: Frame) -> None:
+        """Write an already recorded frame."""
+        self._file.write(FRAME.pack(frame.sent, frame.timestamp, len(frame.data)))
+        self._file.write(frame.data)
+        self.frames += 1
+
+    def close(self) -> None:
+        """Flush and close the underlying file."""
+        self._file.close()
+
+
+class CMSession:
+    """A client's connection to a :class:`FakeCMServer`."""
+
+    def __init__(self, socket: web.WebSocketResponse, steam_id: int, session_id: int):
+        self.socket = socket
+        self.steam_id = steam_id
+        """The ID64 put in the header of messages sent to the client."""
+        self.session_id = session_id
+        """The session ID put in the header of messages sent to the client."""
+        self.sent = 0
+        """The number of frames sent to the client."""
+        self.received = 0
+        """The number of frames received from the client, excluding heartbeats."""
+        self.heartbeats = 0
+        """The number of heartbeats received from the client."""
+        self._inbox: list[bytes] = []
+        self._new_frame = asyncio.Event()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} steam_id={self.steam_id} sent={self.sent} received={self.received}>"
+
+    def _feed(self, data: bytes) -> None:
+        if CLEAR_PROTO_BIT(READ_U32(data)) == EMsg.ClientHeartBeat:
+            self.heartbeats += 1
+            return
+        self.received += 1
+        self._inbox.append(data)
+        self._new_frame.set()
+
+    async def _next_frame(self, check: Callable[[bytes], bool]) -> bytes:
+        while True:
+            for idx, data in enumerate(self._inbox):
+                if check(data):
+                    del self._inbox[idx]
+                    return data
+            self._new_frame.clear()
+            await self._new_frame.wait()
+
+    async def receive(self) -> Msgs:
+        """Wait for the next message from the client."""
+        return parse_frame(await self._next_frame(lambda _: True))
+
+    async def expect(self, emsg: int, job_name: str | None = None) -> bytes:
+        """Wait for the next raw frame from the client with a matching EMsg and unified message name."""
+
+        def check(data: bytes) -> bool:
+            frame_emsg, header = read_header(data)
+            return frame_emsg == emsg and (not job_name or header.job_name_target == job_name)
+
+        return await self._next_frame(check)
+
+    async def send_raw(self, *frames: bytes) -> None:
+        """Send raw frames to the client."""
+        for data in frames:
+            await self.socket.send_bytes(data)
+        self.sent += len(frames)
+
+    async def send(self, *msgs: Msgs) -> None:
+        """Send messages to the client, filling in their headers."""
+        for msg in msgs:
+            if isinstance(msg.header, ProtobufMessageHeader | MessageHeader):
+                msg.header.steam_id = self.steam_id
+                msg.header.session_id = self.session_id
+        await self.send_raw(*(bytes(msg) for msg in msgs))
+
+    async def reply(self, request: Msgs, response: Msgs) -> None:
+        """Send ``response`` to the client as the response to ``request``."""
+        response.header.job_id_target = request.header.job_id_source
+        if isinstance(response.header, ProtobufMessageHeader) and not response.header.eresult:
+            response.header.eresult = Result.OK
+        await self.send(response)
+
+
+class Scenario:
+    """Scripts what a :class:`FakeCMServer` sends to each client that connects to it.
+
+    Responders registered with :meth:`on` are called with each message of their type the client sends.
+    """
+
+    def __init__(self):
+        self.responders: dict[type[Msgs], Responder] = {}
+
+    def on(self, msg: type[MsgT]) -> Callable[[Callable[[CMSession, MsgT], Awaitable[None]]], Responder]:
+        """A decorator to register a responder for a message type, replacing any existing one."""
+
+        def decorator(responder: Callable[[CMSession, MsgT], Awaitable[None]]) -> Responder:
+            self.responders[msg] = responder
+            return responder
+
+        return decorator
+
+    async def run(self, session: CMSession) -> None:
+        """Handle a connection until it's closed."""
+        while True:
+            msg = await session.receive()
+            try:
+                responder = self.responders[msg.__class__]
+            except KeyError:
+                log.debug("No responder for %r", msg)
+            else:
+                await responder(session, msg)
+
+
+class LogonScenario(Scenario):
+    """A :class:`Scenario` that does just enough for :meth:`steam.Client.login` to finish and dispatch
+    :meth:`~steam.Client.on_ready`.
+
+    Parameters
+    ----------
+    friend_ids
+        The ID64s of the client user's friends, the friends list is sent after logging on.
+    heartbeat_seconds
+        How often the client should send heartbeats.
+    """
+
+    def __init__(self, *, friend_ids: Iterable[int] = (), heartbeat_seconds: int = 9):
+        super().__init__()
+        self.friend_ids = list(friend_ids)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.on(login.CMsgClientLogon)(self.logon)
+        self.on(friends.CMsgClientRequestFriendData)(self.friend_data)
+        self.on(chat.GetMyChatRoomGroupsRequest)(self.chat_groups)
+        self.on(friends.CMsgClientGetEmoticonList)(self.emoticons)
+        self.on(notifications.GetSteamNotificationsRequest)(self.notifications)
+        self.on(login.CMsgClientServerTimestampRequest)(self.server_time)
+
+    async def logon(self, session: CMSession, msg: login.CMsgClientLogon) -> None:
+        await session.reply(
+            msg,
+            login.CMsgClientLogonResponse(
+                eresult=Result.OK,
+                heartbeat_seconds=self.heartbeat_seconds,
+                public_ip=base.CMsgIpAddress(v4=0x7F000001),
+            ),
+        )
+        await session.send(
+            client_server.CMsgClientLicenseList(eresult=Result.OK),
+            client_server.CMsgClientWalletInfoUpdate(has_wallet=True),
+            friends.CMsgClientFriendsList(
+                friends=[
+                    friends.CMsgClientFriendsListFriend(ulfriendid=id64, efriendrelationship=FriendRelationship.Friend)
+                    for id64 in self.friend_ids
+                ]
+            ),
+        )
+
+    async def friend_data(self, session: CMSession, msg: friends.CMsgClientRequestFriendData) -> None:
+        await session.send(
+            friends.CMsgClientPersonaState(
+                friends=[
+                    friends.CMsgClientPersonaStateFriend(
+                        friendid=id64, persona_state=PersonaState.Online, player_name=f"user {id64}"
+                    )
+                    for id64 in msg.friends
+                ]
+            )
+        )
+
+    async def chat_groups(self, session: CMSession, msg: chat.GetMyChatRoomGroupsRequest) -> None:
+        await session.reply(msg, chat.GetMyChatRoomGroupsResponse())
+
+    async def emoticons(self, session: CMSession, msg: friends.CMsgClientGetEmoticonList) -> None:
+        await session.send(friends.CMsgClientEmoticonList())
+
+    async def notifications(self, session: CMSession, msg: notifications.GetSteamNotificationsRequest) -> None:
+        await session.reply(msg, notifications.GetSteamNotificationsResponse())
+
+    async def server_time(self, session: CMSession, msg: login.CMsgClientServerTimestampRequest) -> None:
+        await session.reply(
+            msg,
+            login.CMsgClientServerTimestampResponse(
+                client_request_timestamp=msg.client_request_timestamp, server_timestamp_ms=int(time.time() * 1000)
+            ),
+        )
+
+
+class ReplayScenario(Scenario):
+    """A :class:`Scenario` that plays a :class:`Recording` back to each client that connects.
+
+    Frames the client sent in the recording are waited for before carrying on and job IDs in the frames received in the
+    recording are rewritten to match the ones the client actually used, so a client can log in and make requests
+    against a recording as long as it does so in roughly the same order.
+
+    Parameters
+    ----------
+    recording
+        The recording to replay.
+    speed
+        How fast to replay the recording relative to how it was recorded. ``None`` sends frames as soon as possible.
+    timeout
+        How long to wait for the client to send a frame from the recording before skipping it.
+    """
+
+    def __init__(self, recording: Recording, *, speed: float | None = None, timeout: float = 10):
+        super().__init__()
+        self.recording = recording
+        self.speed = speed
+        self.timeout = timeout
+        self.skipped = 0
+        """The number of frames the client never sent."""
+
+    async def run(self, session: CMSession) -> None:
+        jobs: dict[int, int] = {}  # recorded job ID -> the client's job ID
+        anchor = (0.0, time.perf_counter())
+        for frame in self.recording:
+            if frame.sent:
+                if frame.msg in IGNORED_EMSGS:
+                    continue
+                emsg, header = read_header(frame.data)
+                try:
+                    async with timeout(self.timeout):
+                        data = await session.expect(emsg, header.job_name_target)
+                except TimeoutError:
+                    self.skipped += 1
+                    log.info("Client never sent %r, skipping it", frame.msg)
+                    continue
+                if header.job_id_source:
+                    jobs[header.job_id_source] = read_header(data)[1].job_id_source
+                anchor = (frame.timestamp, time.perf_counter())
+                continue
+
+            if self.speed is not None:
+                recorded_at, replayed_at = anchor
+                delay = (frame.timestamp - recorded_at) / self.speed - (time.perf_counter() - replayed_at)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await session.send_raw(self._rewrite_job_id(frame.data, jobs))
+
+    @staticmethod
+    def _rewrite_job_id(data: bytes, jobs: dict[int, int]) -> bytes:
+        _, header = read_header(data)
+        try:
+            job_id = jobs[header.job_id_target]
+        except KeyError:
+            return data
+        header_length = header.length
+        header.job_id_target = job_id
+        return data[:4] + bytes(header) + data[4 + header_length :]
+
+
+class FakeCMServer:
+    """A local websocket server that pretends to be a CM, serving a :class:`Scenario` on the ``cmsocket`` endpoint.
+
+    Pass :attr:`url` to :class:`~steam.Client` as ``cms`` and login with a token from :func:`make_refresh_token`.
+
+    .. container:: operations
+
+        .. describe:: async with x
+
+            Starts the server and closes it when the context is exited.
+
+    .. code:: python
+
+        async with FakeCMServer(LogonScenario()) as server:
+            client = steam.Client(cms=[server.url])
+            await client.login(refresh_token=make_refresh_token())
+
+    Parameters
+    ----------
+    scenario
+        The scenario to serve. Defaults to a :class:`LogonScenario`.
+    host
+        The host to listen on.
+    port
+        The port to listen on. Defaults to a random free port.
+    steam_id
+        The ID64 put in the headers of messages sent to clients.
+    """
+
+    def __init__(
+        self,
+        scenario: Scenario | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        steam_id: int = DEFAULT_ID64,
+    ):
+        self.scenario = scenario if scenario is not None else LogonScenario()
+        self.host = host
+        self.port = port
+        self.steam_id = steam_id
+        self.sessions: list[CMSession] = []
+        """Every connection that has been made to the server."""
+        self._runner: web.AppRunner | None = None
+        self._connected = asyncio.Event()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} url={self.url!r} sessions={len(self.sessions)}>"
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def url(self) -> str:
+        """The URL of the server's ``cmsocket`` endpoint."""
+        return f"ws://{self.host}:{self.port}/cmsocket/"
+
+    async def start(self) -> None:
+        """Start listening for connections."""
+        app = web.Application()
+        app.router.add_get("/cmsocket/", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        _, self.port = self._runner.addresses[0][:2]
+
+    async def close(self) -> None:
+        """Close every connection and stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def wait_for_session(self) -> CMSession:
+        """Wait for a client to connect, returning the latest connection."""
+        await self._connected.wait()
+        return self.sessions[-1]
+
+    async def _handle(self, request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse(max_msg_size=0)
+        await socket.prepare(request)
+        session = CMSession(socket, self.steam_id, len(self.sessions) + 1)
+        self.sessions.append(session)
+        self._connected.set()
+
+        async def run_scenario() -> None:
+            try:
+                await self.scenario.run(session)
+            except Exception:
+                log.exception("Scenario %r failed", self.scenario)
+
+        async with TaskGroup() as tg:
+            task = tg.create_task(run_scenario())
+            async for message in socket:
+                if message.type is WSMsgType.BINARY:
+                    session._feed(message.data)
+            task.cancel()
+        return socket
+
+
+# builders for scripted floods
+
+
+def chat_flood(
+    author_id64: int, count: int, *, content: str = "hello"
+) -> list[friend_messages.IncomingMessageNotification]:
+    """Build ``count`` chat messages from ``author_id64`` to send to a client."""
+    return [
+        friend_messages.IncomingMessageNotification(
+            steamid_friend=author_id64,
+            chat_entry_type=ChatEntryType.Text,
+            message=content,
+            rtime32_server_timestamp=int(time.time()),
+            ordinal=ordinal,
+        )
+        for ordinal in range(count)
+    ]
+
+
+def trade_notifications(count: int) -> list[client_server_2.CMsgClientUserNotifications]:
+    """Build ``count`` new trade offer notifications to send to a client.
+
+    Note
+    ----
+    A client reacts to these by polling the Web API for trade offers, which the fake server does not serve.
+    """
+    return [
+        client_server_2.CMsgClientUserNotifications(
+            notifications=[client_server_2.CMsgClientUserNotificationsNotification(user_notification_type=1, count=1)]
+        )
+        for _ in range(count)
+    ]
+
+
+def gc_message(msg: GCMessage | GCProtobufMessage) -> client_server_2.CMsgGcClientFromGC:
+    """Wrap a game coordinator message, e.g. a backpack's ``CacheSubscribed``, to send to a client."""
+    return client_server_2.CMsgGcClientFromGC(
+        appid=msg.APP_ID,
+        msgtype=SET_PROTO_BIT(msg.MSG) if isinstance(msg, GCProtobufMessage) else msg.MSG,
+        payload=bytes(msg),
+    )
+
+
+def multi(*msgs: Msgs, steam_id: int = DEFAULT_ID64) -> base.CMsgMulti:
+    """Batch messages into a gzipped :class:`~steam.protobufs.base.CMsgMulti` like Steam does."""
+    frames: list[bytes] = []
+    for msg in msgs:
+        msg.header.steam_id = steam_id
+        data = bytes(msg)
+        frames.append(WRITE_U32(len(data)) + data)
+    body = b"".join(frames)
+    return base.CMsgMulti(size_unzipped=len(body), message_body=gzip.compress(body))
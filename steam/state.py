@@ -4,19 +4,21 @@ from __future__ import annotations
 
 import asyncio
 import collections
+import dataclasses
 import functools
 import inspect
 import logging
 import random
 import weakref
 from collections import defaultdict, deque
-from collections.abc import AsyncGenerator, Callable, Iterable, Sequence
+from collections.abc import AsyncGenerator, Callable, Coroutine, Iterable, MutableMapping, Sequence
 from contextlib import asynccontextmanager
 from copy import copy
 from datetime import datetime, timedelta
 from itertools import count
 from operator import attrgetter
-from typing import TYPE_CHECKING, Any, Final, Generic, Protocol, TypeVar, cast, get_args
+from types import CoroutineType
+from typing import TYPE_CHECKING, Any, Final, Generic, Protocol, TypeAlias, TypeVar, cast, get_args
 from zlib import crc32
 
 from yarl import URL as URL_
@@ -25,13 +27,15 @@ from . import utils
 from ._const import JSON_LOADS, READ_U32, URL, VDF_BINARY_LOADS, VDF_LOADS, TaskGroup, timeout
 from .abc import Awardable, Commentable, PartialUser, _CommentThreadType
 from .app import App, AuthenticationTicket, FetchedApp
+from .badge import UserBadges
 from .bundle import FetchedBundle
+from .cache import PriceCache, UserCache
 from .clan import Clan, ClanMember, PartialClan
 from .comment import Comment
 from .enums import *
 from .errors import *
 from .friend import Friend
-from .gateway import CMServer, ConnectionClosed, Msgs, ProtoMsgs, SteamWebSocket, unpack_multi
+from .gateway import CMListCache, CMServer, ConnectionClosed, Msgs, ProtoMsgs, SteamWebSocket, unpack_multi
 from .group import Group, GroupMember
 from .guard import *
 from .id import _ID64_TO_ID32, ID, parse_id64
@@ -39,7 +43,7 @@ from .invite import ClanInvite, GroupInvite, UserInvite
 from .manifest import AppInfo, ContentServer, Manifest, PackageInfo
 from .message import *
 from .message import ClanMessage
-from .models import Wallet
+from .models import Ban, EnrichedUser, Wallet
 from .package import FetchedPackage, License
 from .protobufs import (
     SERVICE_EMSGS,
@@ -90,8 +94,6 @@ from .user import ClientUser, User
 from .utils import DateTime, cached_property, call_once
 
 if TYPE_CHECKING:
-    from types import CoroutineType
-
     from typing_extensions import Never, Self, Unpack
 
     from .abc import Message
@@ -100,11 +102,25 @@ if TYPE_CHECKING:
     from .media import Media
     from .types import manifest, trade
     from .types.http import Coro
-    from .types.user import Author, AuthorT, IndividualID
+    from .types.user import Author, AuthorT, IndividualID, UserBadges as UserBadgesPayload
 
 
 log = logging.getLogger(__name__)
 
+AUTH_LIST_DELAY: Final = 0.05
+"""How long to wait for more tickets to be (de)activated before sending the auth list."""
+USERS_BATCH_SIZE: Final = 100
+"""The most users CMsgClientRequestFriendData and GetPlayerSummaries are asked for at once."""
+LEVELS_BATCH_SIZE: Final = 100
+ENRICH_FIELDS: Final = frozenset({"user", "ban", "level", "badges"})
+STORE_ITEMS_BATCH_SIZE: Final = 100  # GetItems doesn't document a limit, so this matches the others
+StoreItemKey: TypeAlias = tuple[store.EStoreItemType, int]
+STORE_ITEM_ID_FIELDS: Final = {
+    store.EStoreItemType.App: "appid",
+    store.EStoreItemType.Package: "packageid",
+    store.EStoreItemType.Bundle: "bundleid",
+}
+
 T = TypeVar("T")
 OwnerT = TypeVar("OwnerT", bound=Commentable)
 
@@ -145,6 +161,66 @@ class Queue(Generic[T]):
         return self
 
 
+class NotificationPoller:
+    """Polls the notifications service on behalf of the whole client.
+
+    Steam takes a while to put new comments into our notifications, so after being triggered this re-fetches them with
+    an exponential back off until a new comment notification shows up or :attr:`max_polls` is reached. Triggers that
+    arrive whilst polling is in progress are coalesced into the running poller and restart its back off instead of
+    starting another.
+    """
+
+    def __init__(
+        self, state: ConnectionState, *, initial_delay: float = 5, max_delay: float = 60, max_polls: int = 6
+    ) -> None:
+        self.state = state
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_polls = max_polls
+        self.triggers = 0
+        """The number of times the poller has been triggered."""
+        self.coalesced = 0
+        """The number of triggers that were merged into an already running poller."""
+        self.polls = 0
+        """The number of requests made to the notifications service."""
+        self._task: asyncio.Task[None] | None = None
+        self._retriggered = False
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def trigger(self) -> None:
+        self.triggers += 1
+        if self.is_running():
+            self.coalesced += 1
+            self._retriggered = True
+            return
+        self._task = self.state._tg.create_task(self._run(), name="steam.py: notification poller")
+
+    async def _run(self) -> None:
+        delay = self.initial_delay
+        polls = 0
+        while True:
+            self._retriggered = False
+            seen = self.state._handled_notification_ids.copy()
+            self.polls += 1
+            polls += 1
+            notifications = await self.state.fetch_notifications()
+            if self._retriggered:  # start backing off again, there's probably another comment on its way
+                delay = self.initial_delay
+                polls = 0
+            elif any(
+                notification.notification_type == 3 and notification.notification_id not in seen
+                for notification in notifications
+            ):
+                return
+            if polls >= self.max_polls:
+                return log.debug("Gave up waiting for a comment notification after %d polls", polls)
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_delay)
+
+
 StateT = TypeVar("StateT", bound="ConnectionState", contravariant=True)
 MsgsT = TypeVar("MsgsT", bound="Msgs", contravariant=True)
 
@@ -163,6 +239,17 @@ def parser(func: F) -> F:
     return func
 
 
+@functools.cache
+def parser_message_type(func: Callable[..., Any], /) -> Any:
+    """The annotation of the message a :func:`parser` takes or ``None`` if it can't be evaluated at runtime. Cached as
+    evaluating annotations is slow and every GC state subclass goes through the inherited parsers again."""
+    try:
+        params = list(inspect.get_annotations(func, eval_str=True).values())
+    except NameError:
+        return None
+    return params[0]
+
+
 class noop:
     def __await__(self):
         yield
@@ -181,6 +268,7 @@ def requires_intent(intent: Intents) -> Callable[[F], F]:
 
 class ConnectionState:
     parsers: dict[EMsg, ParserCallback[Self, ProtoMsgs]]
+    um_parsers: dict[str, tuple[type[UnifiedMessage], ParserCallback[Self, UnifiedMessage]]]
 
     def __init__(self, client: Client, **kwargs: Unpack[ClientKwargs]):
         self.client = client
@@ -199,6 +287,9 @@ class ConnectionState:
         self.max_comments: int = kwargs.get("max_comments", 10000)
         self._process_comment_lock: asyncio.Lock = asyncio.Lock()
         self._processed_comment_ids: set[int] = set()
+        self._handled_notification_ids: dict[int, None] = {}  # insertion ordered so the oldest can be evicted
+        self.notification_poller = NotificationPoller(self)
+        self.um_listeners: dict[type[UnifiedMessage], list[Callable[[Any], Any]]] = {}
 
         app = kwargs.get("app")
         apps = kwargs.get("apps")
@@ -211,11 +302,30 @@ class ConnectionState:
         self._flags: PersonaStateFlag = kwargs.get("flags", PersonaStateFlag.NONE)
         self._force_kick: bool = kwargs.get("force_kick", False)
         self.auto_chunk_chat_groups: bool = kwargs.get("auto_chunk_chat_groups", False)
+        self.user_update_window: float | None = kwargs.get("user_update_window")
+        self.cms: Sequence[str] | None = kwargs.get("cms")
+        self.cm_list_cache: CMListCache | None = kwargs.get("cm_list_cache")
+        self.resume: bool = kwargs.get("resume", False)
+        user_cache = kwargs.get("user_cache")
+        self._users = user_cache if user_cache is not None else UserCache()
+        self._users._bind(self)
+        price_cache = kwargs.get("price_cache")
+        self._prices = price_cache if price_cache is not None else PriceCache()
+        self._prices._bind(self)
+        self._pending_user_updates: dict[ID32, tuple[User, User, asyncio.TimerHandle]] = {}
+        # concurrent lookups for the same IDs share a request, lookups made at about the same time are batched
+        self._user_loader = utils.BatchLoader(self._load_users, max_size=USERS_BATCH_SIZE)
+        self._level_loader = utils.BatchLoader(self._load_user_levels, max_size=LEVELS_BATCH_SIZE)
+        self._store_item_loaders: dict[Language, utils.BatchLoader[StoreItemKey, store.StoreItem]] = {}
+        self._player_count_loader = utils.BatchLoader(self._load_app_player_count, max_size=1)
 
         self.clear()
 
     def clear(self) -> None:
-        self._users = weakref.WeakValueDictionary[ID32, User]()
+        self._users.clear()
+        for _, _, handle in self._pending_user_updates.values():
+            handle.cancel()
+        self._pending_user_updates.clear()
 
         self._groups: dict[ChatGroupID, Group] = {}
         self._clans: dict[ID32, Clan] = {}
@@ -254,6 +364,9 @@ class ConnectionState:
         self.connection_count = 0
         self._h_steam_pipe = random.randint(1, 1000001)
         self._active_auth_tickets: dict[tuple[AppID, ID64], AuthenticationTicket] = {}
+        self._active_auth_tickets_by_crc: dict[int, AuthenticationTicket] = {}
+        self._auth_list_lock = asyncio.Lock()
+        self._pending_auth_list: asyncio.Future[None] | None = None
         self._auth_seq_me = 0
         self._auth_seq_them = 0
 
@@ -263,13 +376,14 @@ class ConnectionState:
         self.login_complete.clear()
         self.handled_licenses.clear()
         self.handled_wallet.clear()
+        self._resuming = False
 
-    @utils.cached_property
+    @property  # not cached as both are replaced when reconnecting
     def ws(self) -> SteamWebSocket:
         assert self.client.ws is not None
         return self.client.ws
 
-    @utils.cached_property
+    @property
     def user(self) -> ClientUser:
         assert self.http.user is not None
         return self.http.user
@@ -323,22 +437,25 @@ class ConnectionState:
         return user
 
     async def fetch_users(self, user_id64s: Iterable[ID64]) -> Sequence[User]:
-        user_id64s = list(user_id64s)
+        users = await self._user_loader.load_many(dict.fromkeys(user_id64s))
+        return [user for user in users if user is not None]
+
+    async def _load_users(self, user_id64s: list[ID64]) -> dict[ID64, User]:
         try:
             users = [user async for user in self.ws.fetch_users(user_id64s)]
         except asyncio.TimeoutError:
             users = [User._dict_to_proto(user) async for user in self.http.get_users(user_id64s)]
-        return [self._store_user(user) for user in users]
+        return {user.friendid: self._store_user(user) for user in users}
 
     async def _maybe_user(self, id: Intable) -> User:
         steam_id = ID(id, type=Type.Individual)
-        return self.get_user(steam_id.id) or await self.fetch_user(steam_id.id64)
+        return self._users.lookup(steam_id.id) or await self.fetch_user(steam_id.id64)
 
     async def _maybe_users(self, id64s: Iterable[ID64]) -> Sequence[User]:
         ret: list[User | None] = []
         to_fetch: dict[ID64, list[int]] = {}
         for idx, id64 in enumerate(id64s):
-            user = self.get_user(_ID64_TO_ID32(id64))
+            user = self._users.lookup(_ID64_TO_ID32(id64))
             if user is not None:
                 ret.append(user)
             else:
@@ -350,20 +467,19 @@ class ConnectionState:
                 ret.append(None)
 
         if to_fetch:
-            for idxs, user in zip(to_fetch.values(), await self.fetch_users(to_fetch)):
+            for idxs, user in zip(to_fetch.values(), await self._user_loader.load_many(to_fetch)):
                 for idx in idxs:
                     ret[idx] = user
 
         return cast("list[User]", ret)
 
     def _store_user(self, proto: friends.CMsgClientPersonaStateFriend) -> User:
-        try:
-            user = self._users[_ID64_TO_ID32(proto.friendid)]
-        except KeyError:
+        user = self._users.get(_ID64_TO_ID32(proto.friendid))
+        if user is None:
             user = User(state=self, proto=proto)
-            self._users[user.id] = user
         else:
             user._update(proto)
+        self._users.store(user)
         return user
 
     def get_friend(self, id: ID32) -> Friend:
@@ -384,8 +500,24 @@ class ConnectionState:
             if after is None:
                 continue
 
-            before = copy(after)
+            persona = after._persona()
             after._update(friend)
+            self._users.store(after)  # the push counts as refreshing it
+            if after._persona() == persona:
+                continue  # nothing changed, don't bother dispatching
+
+            if not self.user_update_window:
+                self.dispatch("user_update", after._snapshot(persona), after)
+            elif after.id not in self._pending_user_updates:  # otherwise the original before is kept
+                self._pending_user_updates[after.id] = (
+                    after._snapshot(persona),
+                    after,
+                    asyncio.get_running_loop().call_later(self.user_update_window, self._flush_user_update, after.id),
+                )
+
+    def _flush_user_update(self, id: ID32) -> None:
+        before, after, _ = self._pending_user_updates.pop(id)
+        if before._persona() != after._persona():  # it could have changed back
             self.dispatch("user_update", before, after)
 
     @parser
@@ -472,9 +604,30 @@ class ConnectionState:
                     self.dispatch("invite_decline", invite)
 
         if is_load:
-            self.user._friends = {user.id: Friend(self, user) for user in await self.fetch_users(client_user_friends)}
+            if self._resuming:
+                await self._reconcile_friends(client_user_friends)
+            else:
+                self.user._friends = {
+                    user.id: Friend(self, user) for user in await self.fetch_users(client_user_friends)
+                }
             self.handled_friends.set()
 
+    async def _reconcile_friends(self, friend_ids: list[ID64]) -> None:
+        # only fetch the friends added while we were disconnected, the rest are kept up to date by persona states
+        old = self.user._friends
+        self.user._friends = {}
+        for id64 in friend_ids:
+            friend = old.pop(_ID64_TO_ID32(id64), None)
+            if friend is not None:
+                self.user._friends[friend.id] = friend
+        new = [id64 for id64 in friend_ids if _ID64_TO_ID32(id64) not in self.user._friends]
+        for user in await self.fetch_users(new):
+            friend = self._store_friend(user)
+            self.dispatch("friend_add", friend)
+        for friend in old.values():
+            self.dispatch("friend_remove", friend)
+
+    @parser
     @requires_intent(Intents.Messages | Intents.Users)
     async def handle_user_message(self, msg: friend_messages.IncomingMessageNotification) -> None:
         await self.client.wait_until_ready()
@@ -583,6 +736,7 @@ class ConnectionState:
         if msg.result != Result.OK:
             raise WSException(msg)
 
+    @parser
     @requires_intent(Intents.Messages | Intents.Users)
     async def handle_user_message_reaction(self, msg: friend_messages.MessageReactionNotification) -> None:
         id64 = msg.steamid_friend
@@ -682,8 +836,105 @@ class ConnectionState:
         return msg
 
     async def fetch_user_levels(self, *user_ids: ID32) -> dict[ID32, int]:
+        levels = await self._level_loader.load_many(user_ids)
+        return {user_id: level for user_id, level in zip(user_ids, levels) if level is not None}
+
+    async def fetch_users_enriched(
+        self,
+        user_id64s: Iterable[ID64],
+        fields: Iterable[str],
+        max_concurrency: int,
+        cache: MutableMapping[ID64, EnrichedUser] | None,
+    ) -> AsyncGenerator[EnrichedUser, None]:
+        fields = frozenset(fields)
+        if unknown := fields - ENRICH_FIELDS:
+            raise ValueError(f"Unknown fields {', '.join(sorted(unknown))}")
+
+        # plan the requests: users needing the same fields are fetched together, in batches of the most that
+        # GetPlayerSummaries and GetPlayerBans take
+        cached: list[EnrichedUser] = []
+        plans: dict[frozenset[str], list[EnrichedUser]] = {}
+        for id64 in dict.fromkeys(user_id64s):
+            record = cache.get(id64) if cache is not None else None
+            if record is None:
+                record = EnrichedUser(id64)
+            if missing := fields - record.fields:
+                plans.setdefault(missing, []).append(record)
+            else:
+                cached.append(record)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        badge_semaphore = asyncio.Semaphore(max_concurrency)  # there's no batch endpoint for badges
+
+        async def enrich(records: tuple[EnrichedUser, ...], fields: frozenset[str]) -> list[EnrichedUser]:
+            async with semaphore:
+                return await self._enrich_users(records, fields, badge_semaphore)
+
+        tasks = [
+            asyncio.create_task(enrich(batch, missing))
+            for missing, records in plans.items()
+            for batch in utils.as_chunks(records, USERS_BATCH_SIZE)
+        ]
+        try:
+            for record in cached:
+                yield record
+            for task in asyncio.as_completed(tasks):
+                for record in await task:
+                    if cache is not None:
+                        cache[record.id64] = record
+                    yield record
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _enrich_users(
+        self, records: Sequence[EnrichedUser], fields: frozenset[str], badge_semaphore: asyncio.Semaphore
+    ) -> list[EnrichedUser]:
+        # fill in copies so the (possibly cached) records are untouched if any request fails
+        records = [dataclasses.replace(record) for record in records]
+        id64s = [record.id64 for record in records]
+        badges: dict[ID64, UserBadgesPayload] = {}
+
+        async def fetch_users() -> None:
+            for record, user in zip(records, await self._user_loader.load_many(id64s)):
+                record.user = user
+
+        async def fetch_bans() -> None:
+            bans = {ban["steamid"]: ban for ban in await self.http.get_user_bans(*id64s)}
+            for record in records:
+                if (ban := bans.get(record.id64)) is not None:
+                    record.ban = Ban(ban)
+
+        async def fetch_levels() -> None:
+            levels = await self.fetch_user_levels(*map(_ID64_TO_ID32, id64s))
+            for record in records:
+                record.level = levels.get(_ID64_TO_ID32(record.id64))
+
+        async def fetch_badges(id64: ID64) -> None:
+            async with badge_semaphore:
+                badges[id64] = await self.http.get_user_badges(id64)
+
+        async with TaskGroup() as tg:
+            if "user" in fields:
+                tg.create_task(fetch_users())
+            if "ban" in fields:
+                tg.create_task(fetch_bans())
+            if "level" in fields:
+                tg.create_task(fetch_levels())
+            if "badges" in fields:
+                for id64 in id64s:
+                    tg.create_task(fetch_badges(id64))
+
+        for record in records:
+            if record.id64 in badges:
+                owner = record.user or self.get_partial_user(record.id64)
+                record.badges = UserBadges(self, owner, data=badges[record.id64])
+            record.fields |= fields
+        return records
+
+    async def _load_user_levels(self, user_ids: list[ID32]) -> dict[ID32, int]:
         msg: client_server_2.CMsgClientFsGetFriendsSteamLevelsResponse = await self.ws.send_proto_and_wait(
-            client_server_2.CMsgClientFsGetFriendsSteamLevels(list(user_ids))
+            client_server_2.CMsgClientFsGetFriendsSteamLevels(user_ids)
         )
         if msg.result not in (Result.OK, Result.Invalid):
             raise WSException(msg)
@@ -1065,10 +1316,18 @@ class ConnectionState:
             assert before is not None
             self.dispatch("clan_update", before, clan)
 
+    @parser
     @requires_intent(Intents.ChatGroups)
     async def handle_get_my_chat_groups(self, msg: chat.GetMyChatRoomGroupsResponse) -> None:
+        await self.login_complete.wait()
+        left = dict(self._chat_groups) if self._resuming else {}
         for chat_group in msg.chat_room_groups:
-            if chat_group.group_summary.clanid:  # received a clan
+            if (known := left.pop(ChatGroupID(chat_group.group_summary.chat_group_id), None)) is not None:
+                known._update_channels(
+                    chat_group.user_chat_group_state.user_chat_room_state,
+                    default_channel_id=chat_group.group_summary.default_chat_id,
+                )
+            elif chat_group.group_summary.clanid:  # received a clan
                 clan = await Clan._from_proto(self, chat_group.group_summary)
                 clan._update_channels(
                     chat_group.user_chat_group_state.user_chat_room_state,
@@ -1085,6 +1344,12 @@ class ConnectionState:
                 )
                 self._groups[group.id] = group
 
+        for chat_group_id, chat_group in left.items():  # removed from while we were disconnected
+            self._chat_groups.pop(chat_group_id)
+            if isinstance(chat_group, Clan):
+                self._clans.pop(chat_group.id, None)
+            self.dispatch(f"{chat_group.__class__.__name__.lower()}_leave", chat_group)
+
         self.handled_chat_groups.set()
 
     async def set_chat_group_active(self, chat_group_id: ChatGroupID) -> chat.GroupState:
@@ -1150,6 +1415,7 @@ class ConnectionState:
             if chat_group is not None:
                 chat_group.tagline = tagline
 
+    @parser
     @requires_intent(Intents.ChatGroups)
     def handle_chat_group_update(self, msg: chat.ChatRoomHeaderStateNotification) -> None:
         try:
@@ -1162,6 +1428,7 @@ class ConnectionState:
         chat_group._update_header_state(msg.header_state)
         self.dispatch(f"{chat_group.__class__.__name__.lower()}_update", before, chat_group)
 
+    @parser
     @requires_intent(Intents.ChatGroups)
     async def handle_chat_group_user_action(self, msg: chat.NotifyChatGroupUserStateChangedNotification) -> None:
         if msg.user_action == chat.EChatRoomMemberStateChange.Joined:  # join group
@@ -1189,6 +1456,7 @@ class ConnectionState:
         #     self._groups[group.id] = group
         #     self.dispatch("group_invite", group)
 
+    @parser
     @requires_intent(Intents.ChatGroups | Intents.Users)
     async def handle_chat_member_update(self, msg: chat.MemberStateChangeNotification) -> None:
         try:
@@ -1381,6 +1649,7 @@ class ConnectionState:
             raise WSException(msg)
         return msg.chat_room
 
+    @parser
     @requires_intent(Intents.ChatGroups | Intents.Chat)
     def handle_chat_update(self, msg: chat.ChatRoomGroupRoomsChangeNotification) -> None:
         try:
@@ -1457,6 +1726,7 @@ class ConnectionState:
                 if invite is not None:
                     self.dispatch("invite_accept", invite)
 
+    @parser
     @requires_intent(Intents.ChatGroups | Intents.Chat | Intents.Messages | Intents.Users)
     def handle_chat_message(self, msg: chat.IncomingChatMessageNotification) -> None:
         try:
@@ -1561,6 +1831,7 @@ class ConnectionState:
 
         return msg
 
+    @parser
     @requires_intent(Intents.ChatGroups | Intents.Chat | Intents.Messages | Intents.Users)
     def handle_chat_message_reaction(self, msg: chat.MessageReactionNotification) -> None:
         try:
@@ -1902,12 +2173,27 @@ class ConnectionState:
         bundle_ids: Iterable[BundleID] = (),
         language: Language | None = None,
     ) -> list[store.StoreItem]:
-        ids = (
-            [store.StoreItemId(appid=app_id) for app_id in app_ids]
-            + [store.StoreItemId(packageid=package_id) for package_id in package_ids]
-            + [store.StoreItemId(bundleid=bundle_id) for bundle_id in bundle_ids]
+        language = language or self.language
+        try:
+            loader = self._store_item_loaders[language]
+        except KeyError:
+            loader = self._store_item_loaders[language] = utils.BatchLoader(
+                functools.partial(self._load_store_items, language=language), max_size=STORE_ITEMS_BATCH_SIZE
+            )
+        items = await loader.load_many(
+            [(store.EStoreItemType.App, app_id) for app_id in app_ids]
+            + [(store.EStoreItemType.Package, package_id) for package_id in package_ids]
+            + [(store.EStoreItemType.Bundle, bundle_id) for bundle_id in bundle_ids]
+        )
+        return [item for item in items if item is not None]
+
+    async def _load_store_items(
+        self, ids: list[StoreItemKey], language: Language
+    ) -> dict[StoreItemKey, store.StoreItem]:
+        items = await self._fetch_store_info(
+            [store.StoreItemId(**{STORE_ITEM_ID_FIELDS[type]: id}) for type, id in ids], language
         )
-        return await self._fetch_store_info(ids, language)
+        return {(item.item_type, item.id): item for item in items}
 
     async def fetch_app_tag(self, *tag_ids: int, language: Language | None = None) -> list[store.StoreItem]:
         return await self._fetch_store_info([store.StoreItemId(tagid=tag_id) for tag_id in tag_ids], language)
@@ -1925,12 +2211,16 @@ class ConnectionState:
         raise ValueError("app_id is invalid")
 
     async def fetch_app_player_count(self, app_id: AppID) -> int:
+        return cast(int, await self._player_count_loader.load(app_id))
+
+    async def _load_app_player_count(self, app_ids: list[AppID]) -> dict[AppID, int]:
+        (app_id,) = app_ids  # there's no batch version, so this only shares the request between concurrent callers
         msg: client_server_2.CMsgDpGetNumberOfCurrentPlayersResponse = await self.ws.send_proto_and_wait(
             client_server_2.CMsgDpGetNumberOfCurrentPlayers(appid=app_id)
         )
         if msg.result != Result.OK:
             raise WSException(msg)
-        return msg.player_count
+        return {app_id: msg.player_count}
 
     async def fetch_app_achievements(
         self, app_id: AppID, language: Language | None
@@ -2156,68 +2446,101 @@ class ConnectionState:
             if not ticket.is_valid():
                 raise ValueError(f"Ticket {ticket!r} is not valid")
 
-            if (ticket.app.id, ticket.user.id64) in self._active_auth_tickets:
+            key = (ticket.app.id, ticket.user.id64)
+            if (active := self._active_auth_tickets.get(key)) is not None:
                 log.debug("Ticket %r is already active", ticket)
 
                 if ticket.user != self.user:
                     log.info("Canceling existing ticket %r", ticket)
-            self._active_auth_tickets[ticket.app.id, ticket.user.id64] = ticket
-        await self.send_auth_list()
+                self._active_auth_tickets_by_crc.pop(active.crc, None)
+            self._active_auth_tickets[key] = ticket
+            self._active_auth_tickets_by_crc[ticket.crc] = ticket
+        await self._queue_auth_list()
+
+    def _remove_auth_ticket(self, ticket: AuthenticationTicket) -> bool:
+        try:
+            del self._active_auth_tickets[ticket.app.id, ticket.user.id64]
+        except KeyError:
+            return False
+        self._active_auth_tickets_by_crc.pop(ticket.crc, None)
+        return True
 
     async def deactivate_auth_session_tickets(self, *tickets: AuthenticationTicket) -> None:
-        assert tickets
+        changed = False
         for ticket in tickets:
-            try:
-                del self._active_auth_tickets[ticket.app.id, ticket.user.id64]
-            except KeyError:
+            if not self._remove_auth_ticket(ticket):
                 log.debug("Ticket %r is not active", ticket)
+            elif ticket.user != self.user:  # can't deactivate our own ticket?
+                changed = True
+
+        if changed:
+            await self._queue_auth_list()
 
-        if ticket.user == self.user:  # type: ignore  # ticket cannot be unbound
-            return  # can't deactivate our own ticket?
-        await self.send_auth_list()
+    async def _queue_auth_list(self) -> None:
+        # (de)activations within AUTH_LIST_DELAY of each other are sent as one auth list
+        future = self._pending_auth_list
+        if future is None:
+            self._pending_auth_list = future = asyncio.get_running_loop().create_future()
+            self.ws.tg.create_task(self._flush_auth_list(future))
+        await asyncio.shield(future)
+
+    async def _flush_auth_list(self, future: asyncio.Future[None]) -> None:
+        try:
+            await asyncio.sleep(AUTH_LIST_DELAY)
+            self._pending_auth_list = None  # anything (de)activated from now on goes in the next auth list
+            await self.send_auth_list()
+        except Exception as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(None)
+        finally:
+            if self._pending_auth_list is future:
+                self._pending_auth_list = None
+            if not future.done():
+                future.cancel()
 
     async def send_auth_list(self, force_app_id: AppID | None = None) -> None:
-        unique_app_ids = {app_id for app_id, _ in self._active_auth_tickets}
-        if force_app_id is not None:
-            unique_app_ids.add(force_app_id)
-        log.info("Sending authentication list with %s active tickets", len(self._active_auth_tickets))
-
-        msg: client_server.CMsgClientAuthListAck = await self.ws.send_proto_and_wait(
-            client_server.CMsgClientAuthList(
-                tokens_left=len(self._game_connect_bytes),
-                last_request_seq=self._auth_seq_me,
-                last_request_seq_from_server=self._auth_seq_them,
-                app_ids=list(unique_app_ids),
-                message_sequence=self._auth_seq_me + 1,
-                tickets=[
-                    client_server.CMsgAuthTicket(
-                        estate=int(self.user != ticket.user),
-                        steamid=0 if self.user == ticket.user else ticket.user.id64,
-                        gameid=ticket.app.id,
-                        h_steam_pipe=self._h_steam_pipe,
-                        ticket_crc=crc32(ticket.auth_ticket),
-                        ticket=ticket.auth_ticket,
-                    )
-                    for ticket in self._active_auth_tickets.values()
-                ],
-            ),
-            check=lambda msg: (
-                isinstance(msg, client_server.CMsgClientAuthListAck) and msg.message_sequence == self._auth_seq_me + 1
-            ),
-        )
-        self._auth_seq_me += 1
-        self._auth_seq_them = msg.message_sequence
+        async with self._auth_list_lock:  # the sequence numbers need each list to be acked before the next is sent
+            unique_app_ids = {app_id for app_id, _ in self._active_auth_tickets}
+            if force_app_id is not None:
+                unique_app_ids.add(force_app_id)
+            log.info("Sending authentication list with %s active tickets", len(self._active_auth_tickets))
+
+            msg: client_server.CMsgClientAuthListAck = await self.ws.send_proto_and_wait(
+                client_server.CMsgClientAuthList(
+                    tokens_left=len(self._game_connect_bytes),
+                    last_request_seq=self._auth_seq_me,
+                    last_request_seq_from_server=self._auth_seq_them,
+                    app_ids=list(unique_app_ids),
+                    message_sequence=self._auth_seq_me + 1,
+                    tickets=[
+                        client_server.CMsgAuthTicket(
+                            estate=int(self.user != ticket.user),
+                            steamid=0 if self.user == ticket.user else ticket.user.id64,
+                            gameid=ticket.app.id,
+                            h_steam_pipe=self._h_steam_pipe,
+                            ticket_crc=crc,
+                            ticket=ticket.auth_ticket,
+                        )
+                        for crc, ticket in self._active_auth_tickets_by_crc.items()
+                    ],
+                ),
+                check=lambda msg: (
+                    isinstance(msg, client_server.CMsgClientAuthListAck)
+                    and msg.message_sequence == self._auth_seq_me + 1
+                ),
+            )
+            self._auth_seq_me += 1
+            self._auth_seq_them = msg.message_sequence
 
     @parser
     def handle_ticket_auth_complete(self, msg: client_server.CMsgClientTicketAuthComplete) -> None:
-        ticket = utils.find(
-            lambda ticket: crc32(ticket.auth_ticket) == msg.ticket_crc, self._active_auth_tickets.values()
-        )
+        ticket = self._active_auth_tickets_by_crc.get(msg.ticket_crc)
         if ticket is None:
             return log.info("Got auth complete for unknown ticket %r discarding", msg.ticket_crc)
 
         if msg.eauth_session_response != AuthSessionResponse.OK:
-            del self._active_auth_tickets[ticket.app.id, ticket.user.id64]
+            self._remove_auth_ticket(ticket)
             log.info(
                 "Removed canceled ticket %r with state %s. Now have %s active tickets.",
                 ticket,
@@ -2356,8 +2679,22 @@ class ConnectionState:
 
         return msg.notifications
 
+    @parser
     async def handle_notifications(self, msg: notifications.GetSteamNotificationsResponse) -> None:
+        await self.login_complete.wait()
+        # every fetch returns the recent notifications, so only hand on the ones we haven't already handled
+        new_notifications: list[notifications.SteamNotificationData] = []
         for notification in msg.notifications:
+            if notification.notification_id in self._handled_notification_ids:
+                continue
+            self._handled_notification_ids[notification.notification_id] = None
+            new_notifications.append(notification)
+        while len(self._handled_notification_ids) > self.max_comments:
+            del self._handled_notification_ids[next(iter(self._handled_notification_ids))]
+        if not new_notifications:
+            return
+
+        for notification in new_notifications:
             # https://github.com/SteamDatabase/SteamTracking/blob/4a93bbf121e3a37a7552422d32ae4c4eac40bd9d/Protobufs/steammessages_notifications.steamclient.proto#L40
             match notification.notification_type:
                 case 3:  # comment
@@ -2408,16 +2745,15 @@ class ConnectionState:
             notifications.MarkNotificationsReadNotification(
                 notification_ids=[
                     notification.notification_id
-                    for notification in msg.notifications
+                    for notification in new_notifications
                     if notification.notification_type != 9
                 ]
             )
         )
 
     @parser
-    async def handle_comments(self, msg: client_server_2.CMsgClientCommentNotifications) -> None:
-        while all(notification.notification_type != 3 for notification in await self.fetch_notifications()):
-            await asyncio.sleep(5)  # steam takes a bit to put comments in your notifications
+    def handle_comments(self, msg: client_server_2.CMsgClientCommentNotifications) -> None:
+        self.notification_poller.trigger()
 
     @parser
     async def parse_notification(self, msg: client_server_2.CMsgClientUserNotifications) -> None:
@@ -2997,54 +3333,56 @@ class ConnectionState:
 
     @parser
     def handle_multi(self, msg: base.CMsgMulti) -> None:
-        data: bytearray = unpack_multi(msg) if msg.size_unzipped else msg.message_body  # type: ignore
+        data = unpack_multi(msg) if msg.size_unzipped else msg.message_body
+        if not data:
+            return
 
-        while data:
-            size = READ_U32(data)
-            self.ws.receive(data[4 : 4 + size])
-            data = data[4 + size :]
+        # walk the payload with an offset over a view so we don't copy the rest of the buffer for every sub-message
+        view = memoryview(data)
+        receive = self.ws.receive
+        position = 0
+        end = len(view)
+        while position < end:
+            size = READ_U32(view[position:])
+            position += 4
+            receive(view[position : position + size])
+            position += size
 
     @parser
     async def handle_logoff(self, msg: login.CMsgClientLoggedOff) -> Never:
         await self.handle_close()
 
     @parser
-    async def parse_um(self, msg: UnifiedMessage) -> None:
-        match msg:
-            case chat.IncomingChatMessageNotification():
-                self.handle_chat_message(msg)
-            case chat.MessageReactionNotification():
-                self.handle_chat_message_reaction(msg)
-            case chat.ChatRoomHeaderStateNotification():
-                self.handle_chat_group_update(msg)
-            case chat.NotifyChatGroupUserStateChangedNotification():
-                await self.handle_chat_group_user_action(msg)
-            case chat.MemberStateChangeNotification():
-                await self.handle_chat_member_update(msg)
-            case chat.ChatRoomGroupRoomsChangeNotification():
-                self.handle_chat_update(msg)
-            case friend_messages.IncomingMessageNotification():
-                await self.handle_user_message(msg)
-            case friend_messages.MessageReactionNotification():
-                await self.handle_user_message_reaction(msg)
-            case chat.GetMyChatRoomGroupsResponse():
-                await self.handle_get_my_chat_groups(msg)
-            case notifications.GetSteamNotificationsResponse():
-                await self.handle_notifications(msg)
-            case _:
-                log.debug("No handler for UM: %r %r", msg.UM_NAME, msg)
+    def parse_um(self, msg: UnifiedMessage) -> Coroutine[Any, Any, Any] | None:
+        for listener in self.um_listeners.get(msg.__class__, ()):
+            try:
+                result = listener(msg)
+            except Exception:
+                log.exception("Failed to execute UM listener %r", listener)
+                continue
+            if isinstance(result, CoroutineType):
+                self._tg.create_task(result, name=f"steam.py: UM listener {msg.UM_NAME}")
+
+        try:
+            um_class, um_parser = self.um_parsers[msg.UM_NAME]
+        except KeyError:
+            return log.debug("No handler for UM: %r %r", msg.UM_NAME, msg)
+        if msg.__class__ is not um_class:  # requests and responses share a UM_NAME
+            return log.debug("No handler for UM: %r %r", msg.UM_NAME, msg)
+        return um_parser(self, msg)  # async parsers are scheduled by the caller, sync ones have already ran
 
 
 ConnectionState.parsers = {}
+ConnectionState.um_parsers = {}
 for _, func in inspect.getmembers(ConnectionState, lambda x: inspect.isfunction(x) and getattr(x, "__parser__", False)):
-    try:
-        params = list(inspect.get_annotations(func, eval_str=True).values())
-    except NameError:
+    if (msg_type := parser_message_type(func)) is None:
         continue
-    if args := get_args(params[0]):
+    if args := get_args(msg_type):
         ConnectionState.parsers[args[0].MSG] = func
-    elif params[0].MSG not in SERVICE_EMSGS | {NoMsg.NONE}:
-        ConnectionState.parsers[params[0].MSG] = func
+    elif msg_type.MSG not in SERVICE_EMSGS | {NoMsg.NONE}:
+        ConnectionState.parsers[msg_type.MSG] = func
+    elif msg_type is not UnifiedMessage and issubclass(msg_type, UnifiedMessage):
+        ConnectionState.um_parsers[msg_type.UM_NAME] = (msg_type, func)
 
 for msg in SERVICE_EMSGS:
     ConnectionState.parsers[msg] = ConnectionState.parse_um  # type: ignore
@@ -14,8 +14,9 @@ from typing_extensions import NamedTuple, TypeVar, get_original_bases
 from . import utils
 from ._const import URL
 from .app import App, PartialApp
-from .enums import Language, TradeOfferState
-from .models import AssetMixin, DescriptionMixin
+from .cache import BACKGROUND
+from .enums import Currency, Language, TradeOfferState
+from .models import AssetMixin, DescriptionMixin, PriceOverview
 from .protobufs import econ
 from .types.id import AppID, AssetID, ClassID, ContextID, InstanceID, TradeOfferID
 from .utils import DateTime
@@ -301,6 +302,29 @@ class Inventory(Generic[ItemT, OwnerT], Sequence[ItemT]):
             )
         self._update(proto)
 
+    async def fetch_prices(self, *, currency: Currency | None = None) -> dict[str, PriceOverview]:
+        """Fetch the prices of the inventory's marketable items through the client's :class:`PriceCache`, warming it
+        for later calls to :meth:`Item.price`.
+
+        Each item name is only fetched once, after any prices fetched by :meth:`Client.fetch_price` or
+        :meth:`Item.price` in the meantime. Prices that couldn't be fetched are left out.
+
+        Parameters
+        ----------
+        currency
+            The currency to fetch the prices in.
+
+        Returns
+        -------
+        The prices keyed by the items' :attr:`~Item.market_hash_name`.
+        """
+        names = list(dict.fromkeys(item.market_hash_name for item in self.items if item.is_marketable()))
+        prices = await asyncio.gather(
+            *(self._state._prices.fetch(self.app.id, name, currency, priority=BACKGROUND) for name in names),
+            return_exceptions=True,
+        )
+        return {name: price for name, price in zip(names, prices) if isinstance(price, PriceOverview)}
+
 
 class TradeOfferReceipt(NamedTuple, Generic[OwnerT]):
     sent: list[MovedItem[ClientUser]]
@@ -44,6 +44,23 @@ __all__ = (
 )
 
 
+_PERSONA_ATTRS = (
+    "name",
+    "app",
+    "state",
+    "flags",
+    "last_seen_online",
+    "last_logoff",
+    "last_logon",
+    "rich_presence",
+    "game_server_ip",
+    "game_server_port",
+    "_avatar_sha",
+)
+_persona_getter = attrgetter(*_PERSONA_ATTRS)
+_SNAPSHOT_SLOTS: dict[type[Any], tuple[str, ...]] = {}
+
+
 class _BaseUser(BaseUser):
     __slots__ = (
         "name",
@@ -95,6 +112,32 @@ class _BaseUser(BaseUser):
         self.flags = PersonaStateFlag.try_value(proto.persona_state_flags)
         """The persona state flags of the account."""
 
+    def _persona(self) -> tuple[Any, ...]:
+        """A record of the fields :meth:`_update` sets, used to diff persona state updates."""
+        return _persona_getter(self)
+
+    def _snapshot(self, persona: tuple[Any, ...] | None = None) -> Self:
+        """A cheaper alternative to :func:`copy.copy`, optionally restoring the fields from a :meth:`_persona` record."""
+        cls = self.__class__
+        try:
+            slots = _SNAPSHOT_SLOTS[cls]
+        except KeyError:
+            names: list[str] = []
+            for klass in cls.__mro__:
+                klass_slots = klass.__dict__.get("__slots__", ())
+                names += (klass_slots,) if isinstance(klass_slots, str) else klass_slots
+            slots = _SNAPSHOT_SLOTS[cls] = tuple(name for name in names if not name.startswith("__"))
+        snapshot = object.__new__(cls)
+        for slot in slots:
+            try:
+                setattr(snapshot, slot, getattr(self, slot))
+            except AttributeError:  # unset cached slot
+                pass
+        if persona is not None:
+            for name, value in zip(_PERSONA_ATTRS, persona):
+                setattr(snapshot, name, value)
+        return snapshot
+
 
 class User(_BaseUser, Messageable["UserMessage"]):
     """Represents a Steam user's account.
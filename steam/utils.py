@@ -577,6 +577,71 @@ class ChainMap(collections.ChainMap[_KT, _VT]):
             map.clear()
 
 
+class BatchLoader(Generic[_KT, _VT]):
+    # loads the keys requested within ``window`` seconds of each other in calls to load_batch of up to max_size keys,
+    # sharing the result between every caller waiting on the same key
+    __slots__ = ("load_batch", "max_size", "window", "_pending", "_in_flight", "_handle", "_tasks")
+
+    def __init__(
+        self,
+        load_batch: Callable[[list[_KT]], Awaitable[Mapping[_KT, _VT]]],
+        *,
+        max_size: int,
+        window: float = 0.005,
+    ):
+        self.load_batch = load_batch
+        self.max_size = max_size
+        self.window = window
+        self._pending: dict[_KT, asyncio.Future[_VT | None]] = {}
+        self._in_flight: dict[_KT, asyncio.Future[_VT | None]] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._tasks = set[asyncio.Task[None]]()
+
+    def load(self, key: _KT) -> asyncio.Future[_VT | None]:
+        """Load the value for ``key``, ``None`` if ``load_batch`` didn't return one."""
+        future = self._in_flight.get(key) or self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_size:
+                self._flush()
+            elif self._handle is None:
+                self._handle = loop.call_later(self.window, self._flush)
+        return asyncio.shield(future)  # one caller being cancelled mustn't cancel the others
+
+    async def load_many(self, keys: Iterable[_KT]) -> list[_VT | None]:
+        return await asyncio.gather(*map(self.load, keys))
+
+    def _flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, {}
+        self._in_flight |= batch
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[_KT, asyncio.Future[_VT | None]]) -> None:
+        try:
+            results = await self.load_batch(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in batch.values():
+                future.set_exception(exc)
+                future.add_done_callback(lambda future: future.exception())  # retrieved even if no one is waiting
+        else:
+            for key, future in batch.items():
+                future.set_result(results.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+
+
 class JWTToken(TypedDict):
     iss: Literal["steam"]
     sub: str  # SteamID
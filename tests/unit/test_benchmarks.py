@@ -0,0 +1,14 @@
+import pytest
+
+from benchmarks import BENCHMARKS, Benchmark
+from benchmarks.__main__ import load_benchmarks
+
+load_benchmarks()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bench", BENCHMARKS.values(), ids=BENCHMARKS.keys())
+async def test_benchmark_runs(bench: Benchmark) -> None:
+    result = await bench.run(repeat=2, scale=0.001)
+    assert len(result.times) == 2
+    assert result.to_dict()["per_second"] > 0
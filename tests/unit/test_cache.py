@@ -0,0 +1,211 @@
+import asyncio
+import gc
+import itertools
+import time
+from copy import copy
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import steam
+from steam import User
+from steam.protobufs import econ, friends
+from steam.types.id import AppID
+from tests.unit.mocks import USER_DATA
+from tests.unit.test_state import make_state
+
+
+def make_user(state: Any, id64: int) -> User:
+    data = copy(USER_DATA)
+    data.friendid = id64
+    return User(state, data)
+
+
+def test_user_cache_lru(monkeypatch: pytest.MonkeyPatch) -> None:
+    state, _ = make_state()
+    cache = steam.UserCache(max_size=2, ttl=60)
+    now = time.monotonic()
+    monkeypatch.setattr(steam.cache, "time", SimpleNamespace(monotonic=lambda: now))
+
+    first, second, third = (make_user(state, USER_DATA.friendid + idx) for idx in range(3))
+    cache.store(first)
+    cache.store(second)
+    assert cache.lookup(first.id) is first  # first is now the most recently used
+    cache.store(third)
+    assert cache.evictions == 1
+    ids = first.id, second.id
+    del first, second, third
+    gc.collect()
+    assert ids[0] in cache and ids[1] not in cache  # only kept alive by the LRU
+    assert cache.lookup(ids[1]) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    now += 61
+    assert cache.lookup(ids[0]) is None  # stale
+    assert cache.get(ids[0]) is not None  # but still there for get_user
+    cache.store(cache[ids[0]])
+    assert cache.lookup(ids[0]) is not None
+
+
+@pytest.mark.asyncio
+async def test_maybe_users_uses_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    state, _ = make_state()
+    state._users = steam.UserCache(ttl=60)
+    fetched: list[list[int]] = []
+
+    async def load_users(id64s: list[int]) -> dict[int, User]:
+        fetched.append(id64s)
+        return {id64: state._store_user(friends.CMsgClientPersonaStateFriend(friendid=id64)) for id64 in id64s}
+
+    monkeypatch.setattr(state._user_loader, "load_batch", load_users)
+    now = time.monotonic()
+    monkeypatch.setattr(steam.cache, "time", SimpleNamespace(monotonic=lambda: now))
+    id64s = [USER_DATA.friendid + idx for idx in range(3)]
+
+    users = await state._maybe_users(id64s)
+    del users
+    gc.collect()  # nothing else holds the users now
+    assert await state._maybe_users(id64s[:2]) and fetched == [id64s]
+
+    now += 50
+    state.parse_persona_state_update(
+        friends.CMsgClientPersonaState(friends=[friends.CMsgClientPersonaStateFriend(friendid=id64s[0])])
+    )
+    now += 20
+    await state._maybe_users(id64s)
+    assert fetched[1:] == [id64s[1:]]  # the pushed persona kept the first user fresh
+
+    metrics = steam.PrometheusMetrics()
+    metrics.bind(state.client)
+    assert metrics.cache_stats()["users"] == (state._users.hits, state._users.misses, 0, 3)
+    assert 'steam_cache_hits_total{cache="users"} 3' in metrics.render().splitlines()
+
+
+def price(lowest: int) -> dict[str, Any]:
+    return {"success": True, "lowest_price": f"${lowest}.00", "median_price": f"${lowest}.50", "volume": "1,234"}
+
+
+@pytest.mark.asyncio
+async def test_price_cache_queue() -> None:
+    cache = steam.PriceCache(interval=0.01)
+    calls: list[tuple[int, str, steam.Currency]] = []
+    times: list[float] = []
+
+    async def get_price(app_id: int, name: str, currency: steam.Currency) -> dict[str, Any]:
+        calls.append((app_id, name, currency))
+        times.append(time.monotonic())
+        await asyncio.sleep(0)
+        if name == "broken":
+            raise ValueError(name)
+        return price(len(calls))
+
+    cache._fetch = get_price  # type: ignore
+    results = await asyncio.gather(
+        *(cache.fetch(440, name, priority=steam.cache.BACKGROUND) for name in ("a", "b", "c")),
+        cache.fetch(440, "z"),
+        cache.fetch(440, "a"),
+        cache.fetch(440, "a"),
+    )
+    # foreground requests skip the queue and requests for the same price share one request
+    assert [name for _, name, _ in calls] == ["z", "a", "b", "c"]
+    assert all(currency is steam.Currency.USD for _, _, currency in calls)
+    assert all(later - earlier >= 0.009 for earlier, later in itertools.pairwise(times))  # paced
+    assert results[4] is results[5] and results[4].lowest_price == 2.0
+    assert not any(result.stale for result in results)
+    assert cache.misses == 6 and cache.hits == 0 and len(cache) == 4 and not cache.queued
+
+    cached = await cache.fetch(440, "a")
+    assert len(calls) == 4 and cache.hits == 1
+    assert cached.fetched_at == results[4].fetched_at
+    assert cache.get(440, "b", steam.Currency.USD) is not None and cache.get(440, "b", steam.Currency.GBP) is None
+
+    # expired prices are fetched again, falling back to the old price if that fails
+    cache.ttl = 0
+    calls.clear()
+    assert (await cache.fetch(440, "a")).lowest_price == 1.0
+    with pytest.raises(ValueError):
+        await cache.fetch(440, "broken")
+    key = (AppID(440), "broken", steam.Currency.USD)
+    cache._store(key, price(9), results[0].fetched_at)  # type: ignore
+    stale = await cache.fetch(440, "broken")
+    assert stale.stale and stale.lowest_price == 9.0 and stale.fetched_at == results[0].fetched_at
+
+
+@pytest.mark.asyncio
+async def test_inventory_fetch_prices() -> None:
+    state, _ = make_state()
+    names = ["Key", "Hat", "Key", "Untradable"]
+    proto = econ.GetInventoryItemsWithDescriptionsResponse(
+        assets=[
+            econ.Asset(appid=440, contextid=2, assetid=idx + 1, classid=idx, instanceid=0, amount=1)
+            for idx in range(len(names))
+        ],
+        descriptions=[
+            econ.ItemDescription(
+                appid=440, classid=idx, instanceid=0, market_hash_name=name, marketable=name != "Untradable"
+            )
+            for idx, name in enumerate(names)
+        ],
+    )
+    inventory = steam.Inventory[steam.Item[steam.User], steam.User](
+        state,
+        proto,
+        owner=steam.PartialUser(state, USER_DATA.friendid),  # type: ignore
+        app=steam.TF2,
+        context_id=2,  # type: ignore
+        language=None,
+    )
+    fetched: list[str] = []
+
+    async def get_price(app_id: int, name: str, currency: steam.Currency) -> dict[str, Any]:
+        fetched.append(name)
+        if name == "Hat":
+            raise ValueError(name)
+        return price(5)
+
+    state._prices.interval = 0
+    state._prices._fetch = get_price  # type: ignore
+    prices = await inventory.fetch_prices(currency=steam.Currency.EUR)
+    assert fetched == ["Key", "Hat"]
+    assert list(prices) == ["Key"] and prices["Key"].currency is steam.Currency.EUR
+    assert (await inventory[0].price(currency=steam.Currency.EUR)).lowest_price == 5.0  # warmed
+    assert fetched == ["Key", "Hat"]
+
+
+@pytest.mark.asyncio
+async def test_price_cache_close_while_fetching() -> None:
+    cache = steam.PriceCache(interval=0)
+    started = asyncio.Event()
+
+    async def get_price(app_id: int, name: str, currency: steam.Currency) -> dict[str, Any]:
+        started.set()
+        await asyncio.sleep(10)
+        return price(1)
+
+    cache._fetch = get_price  # type: ignore
+    fetch = asyncio.create_task(cache.fetch(440, "x"))
+    await started.wait()
+    worker = cache._worker
+    assert worker is not None
+
+    cache.close()
+    with pytest.raises(asyncio.CancelledError):
+        await fetch
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+    assert worker.cancelled() and cache._worker is None and not cache.queued
+
+
+@pytest.mark.asyncio
+async def test_caches_cant_be_shared() -> None:
+    user_cache = steam.UserCache()
+    price_cache = steam.PriceCache()
+    client = steam.Client(user_cache=user_cache, price_cache=price_cache)
+    assert price_cache._fetch == client.http.get_price
+    with pytest.raises(ValueError):
+        steam.Client(user_cache=user_cache)
+    with pytest.raises(ValueError):
+        steam.Client(price_cache=price_cache)
+    with pytest.raises(ValueError):
+        steam.ClientPool(price_cache=steam.PriceCache())
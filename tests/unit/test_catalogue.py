@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import steam
+from steam.catalogue import normalise_name
+
+APPS = {
+    "include_games": [
+        {"appid": 10, "name": "Counter-Strike", "last_modified": 100, "price_change_number": 1},
+        {"appid": 730, "name": "Counter-Strike 2", "last_modified": 300, "price_change_number": 2},
+        {"appid": 440, "name": "Team Fortress 2", "last_modified": 200, "price_change_number": 3},
+        {"appid": 1, "name": "Pokémon™: Édition", "last_modified": 50, "price_change_number": 0},
+    ],
+    "include_dlc": [
+        {"appid": 2000, "name": "Counter-Strike Soundtrack", "last_modified": 150, "price_change_number": 4},
+    ],
+}
+
+
+def make_client(requests: list[dict[str, Any]], apps: dict[str, list[dict[str, Any]]]) -> Any:
+    async def get_all_apps(
+        modified_after: datetime | None = None, **kwargs: Any
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        (include,) = [name for name, value in kwargs.items() if name.startswith("include_") and value]
+        requests.append({"include": include, "modified_after": modified_after})
+        since = modified_after.timestamp() if modified_after is not None else 0
+        for app in apps.get(include, []):
+            if app["last_modified"] > since:
+                yield app
+
+    return SimpleNamespace(http=SimpleNamespace(get_all_apps=get_all_apps))
+
+
+def test_normalise_name() -> None:
+    assert normalise_name("Counter-Strike: Global Offensive™") == "counter strike global offensive"
+    assert normalise_name("Pokémon™: Édition") == "pokemon edition"
+
+
+@pytest.mark.asyncio
+async def test_app_catalogue(tmp_path: Path) -> None:
+    requests: list[dict[str, Any]] = []
+    path = tmp_path / "apps.db"
+    with steam.AppCatalogue(path) as catalogue:
+        assert catalogue.last_synced is None
+        assert await catalogue.sync(make_client(requests, APPS)) == 5
+        assert len(requests) == 5 and all(request["modified_after"] is None for request in requests)
+
+        app = catalogue.get(730)
+        assert app is not None and app.name == "Counter-Strike 2" and app.type is steam.AppType.Game
+        assert 2000 in catalogue and catalogue.get(3) is None
+
+        assert [app.id for app in catalogue.search("counter strike")] == [10, 730, 2000]
+        assert [app.id for app in catalogue.search("COUNTER-STRIKE", type=steam.AppType.DLC)] == [2000]
+        assert [app.id for app in catalogue.search("pokemon")] == [1]
+        assert [app.id for app in catalogue.search("counter", limit=1)] == [10]
+        assert [app.id for app in catalogue.fuzzy_search("team fortres")] == [440]
+        assert [app.id for app in catalogue.fuzzy_search("counter strik 2", limit=2)] == [730, 10]
+
+    # reopening the database only fetches what changed since each type was synced
+    requests.clear()
+    updated = {**APPS, "include_games": [*APPS["include_games"], {**APPS["include_games"][2], "last_modified": 400}]}
+    with steam.AppCatalogue(path) as catalogue:
+        assert len(catalogue) == 5
+        assert await catalogue.sync(make_client(requests, updated), types=steam.AppType.Game) == 1
+        assert requests == [{"include": "include_games", "modified_after": datetime.fromtimestamp(300).astimezone()}]
+        app = catalogue.get(440)
+        assert app is not None and app.last_modified.timestamp() == 400
+
+
+@pytest.mark.asyncio
+async def test_app_catalogue_interrupted_sync() -> None:
+    async def get_all_apps(**kwargs: Any) -> AsyncGenerator[dict[str, Any], None]:
+        yield APPS["include_games"][0]
+        raise steam.HTTPException.__new__(steam.HTTPException)
+
+    catalogue = steam.AppCatalogue()
+    with pytest.raises(steam.HTTPException):
+        await catalogue.sync(SimpleNamespace(http=SimpleNamespace(get_all_apps=get_all_apps)))  # type: ignore
+    assert len(catalogue) == 0 and catalogue.last_synced is None  # nothing was committed
@@ -379,6 +379,59 @@ async def test_converters() -> None:
         assert called_image_converter
 
 
+def test_cooldown() -> None:
+    cooldown = commands.Cooldown(2, 10, commands.BucketType.Default)
+    ctx = cast(commands.Context, None)  # the default bucket doesn't look at the context
+    bucket = commands.BucketType.Default.get_bucket(ctx)
+
+    cooldown(ctx)
+    assert cooldown.get_tokens(bucket) == 1
+    cooldown(ctx)
+    assert cooldown.get_tokens(bucket) == 0
+    with pytest.raises(commands.CommandOnCooldown):
+        cooldown(ctx)
+    assert cooldown.buckets == [bucket]
+    (first_call, _) = cooldown._buckets[bucket]
+    assert cooldown.get_retry_after(bucket, first_call + 10) == 0
+
+    cooldown.reset(bucket)
+    assert cooldown.get_tokens(bucket) == 2
+    assert not cooldown.buckets
+
+
+@pytest.mark.parametrize(
+    "prefixes, content, expected",
+    [
+        (("!", "!?", "?", "$", "steam "), "!?help", "!"),  # the first matching prefix wins
+        (("!?", "!", "?", "$", "steam "), "!?help", "!?"),
+        (("!", "!?", "?", "$", "steam "), "steam help", "steam "),
+        (("!", "!?", "?", "$", "steam "), "help", None),
+        (("!", "!?", "?", "$", ""), "help", ""),
+    ],
+)
+def test_prefix_trie(prefixes: tuple[str, ...], content: str, expected: str | None) -> None:
+    assert commands.utils.PrefixTrie(prefixes).match(content) == expected
+
+
+@pytest.mark.asyncio
+async def test_process_commands_prefixes() -> None:
+    calls: list[tuple[int, int | None, str]] = []
+
+    async with TheTestBot() as bot:
+        bot.command_prefix = ("!", "?", ".", "$", "steam ")
+
+        @bot.command
+        async def add(_, first: int, second: int | None = None, *, rest: str) -> None:
+            calls.append((first, second, rest))
+
+        message = copy(bot.MESSAGE)
+        for content in ("steam add 1 2 some more text", "$add 3 4 text", "add 4 5 text", "steam sub 1 2 text"):
+            message.content = message.clean_content = steam.utils.BBCodeStr(content, [])
+            await commands.Bot.process_commands(bot, message)
+
+    assert calls == [(1, 2, "some more text"), (3, 4, "text")]
+
+
 def teardown_module(_) -> None:
     for error in FAILS:
         traceback.print_exception(error)
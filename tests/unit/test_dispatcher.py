@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import steam
+from steam import EventDispatcher
+from steam._const import TaskGroup
+from steam.protobufs import notifications
+from steam.replay import DEFAULT_ID64, FakeCMServer, LogonScenario, chat_flood
+from tests.unit.test_replay import login, logout
+
+
+async def run(coro: Any, event_name: str, *args: Any, **kwargs: Any) -> None:
+    await coro(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_priorities() -> None:
+    order: list[str] = []
+
+    async def handler(name: str) -> None:
+        order.append(name)
+
+    dispatcher = EventDispatcher(workers=1)
+    dispatcher.submit(run, handler, "on_user_update", "user_update")
+    dispatcher.submit(run, handler, "on_friend_add", "friend_add")
+    dispatcher.submit(run, handler, "on_trade_receive", "trade_receive")
+    dispatcher.submit(run, handler, "on_message", "message")
+    assert dispatcher.depth == 4
+
+    async with TaskGroup() as tg:
+        dispatcher.start(tg)
+        while dispatcher.depth:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        dispatcher.stop()
+
+    assert order == ["trade_receive", "message", "friend_add", "user_update"]
+    assert dispatcher.stats["on_message"].count == 1
+
+
+def test_dispatcher_drop_oldest() -> None:
+    async def handler(name: str) -> None: ...
+
+    dispatcher = EventDispatcher(max_size=2)
+    dispatcher.submit(run, handler, "on_user_update", "first")
+    dispatcher.submit(run, handler, "on_user_update", "second")
+    dispatcher.submit(run, handler, "on_message", "message")
+    assert dispatcher.depth == 2
+    assert dispatcher.dropped == 1
+    assert [event.args for event in dispatcher._queues[2]] == [("second",)]
+
+    dispatcher.submit(run, handler, "on_trade_receive", "trade")
+    assert [event.args for event in dispatcher._queues[0]] == [("message",), ("trade",)]
+    dispatcher.submit(run, handler, "on_friend_add", "friend")  # less important than anything queued
+    assert dispatcher.dropped == 3
+    assert dispatcher.depth == 2
+    assert not dispatcher._queues.get(1)
+
+
+def test_dispatcher_coalesce() -> None:
+    async def handler(before: Any, after: Any) -> None: ...
+
+    user = SimpleNamespace(id=1)
+    dispatcher = EventDispatcher(policy="coalesce")
+    dispatcher.submit(run, handler, "on_user_update", user, "first")
+    dispatcher.submit(run, handler, "on_user_update", user, "second")
+    dispatcher.submit(run, handler, "on_user_update", SimpleNamespace(id=2), "other")
+    assert dispatcher.depth == 2
+    assert dispatcher.coalesced == 1
+    assert dispatcher._queues[2][0].args == (user, "second")
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_block_holds_handlers_back() -> None:
+    handled: list[str] = []
+
+    async def handler(name: str) -> None:
+        handled.append(name)
+
+    dispatcher = EventDispatcher(max_size=2, policy="block")
+    for idx in range(5):
+        dispatcher.submit(run, handler, "on_message", str(idx))
+    assert dispatcher.depth == 2 and dispatcher.held == 3 and not dispatcher.dropped
+
+    async with TaskGroup() as tg:
+        dispatcher.start(tg)
+        while dispatcher.depth:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        dispatcher.stop()
+
+    assert handled == ["0", "1", "2", "3", "4"]
+    assert dispatcher.max_depth == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_block_keeps_reading_replies() -> None:
+    # every worker waits for a reply from the CM while the queue is full, the reply must still be read
+    dispatcher = EventDispatcher(max_size=1, workers=2, policy="block")
+    handled = 0
+    done = asyncio.Event()
+
+    async with FakeCMServer(LogonScenario()) as server:
+        client = steam.Client(cms=[server.url], dispatcher=dispatcher)
+
+        @client.event
+        async def on_message(_: steam.Message) -> None:
+            nonlocal handled
+            await client.ws.send_um_and_wait(notifications.GetSteamNotificationsRequest())
+            handled += 1
+            if handled == 6:
+                done.set()
+
+        task = await login(client)
+        session = await server.wait_for_session()
+        await session.send(*chat_flood(DEFAULT_ID64 + 1, 6))
+        async with asyncio.timeout(10):
+            await done.wait()
+        await logout(client, task)
+
+    assert dispatcher.max_depth == 1 and not dispatcher.dropped
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import steam
+from steam.fleet import _summarise
+from steam.replay import DEFAULT_ID64, FakeCMServer, LogonScenario, chat_flood, make_refresh_token
+
+ACCOUNTS = {f"bot{idx}": DEFAULT_ID64 + idx for idx in range(3)}
+
+
+def test_summarise() -> None:
+    client = steam.Client()
+    user = steam.PartialUser(client._state, DEFAULT_ID64)
+    summary = _summarise(user)
+    assert summary["type"] == "PartialUser" and summary["id64"] == DEFAULT_ID64
+    assert _summarise([user], depth=0) == [DEFAULT_ID64]
+    assert _summarise({"state": steam.PersonaState.Online}) == {"state": steam.PersonaState.Online}
+
+
+@pytest.mark.asyncio
+async def test_fleet() -> None:
+    async with FakeCMServer(LogonScenario()) as server:
+        fleet = steam.Fleet(processes=2, restart_delay=0.1, cms=[server.url])
+        for name, id64 in ACCOUNTS.items():
+            fleet.add(name, refresh_token=make_refresh_token(id64))
+        with pytest.raises(ValueError):
+            fleet.add("bot0")
+        fleet.add("broken", refresh_token="not a token")  # shares a worker with at least one of the others
+        errors: list[tuple[str, steam.WorkerError]] = []
+
+        @fleet.event
+        async def on_account_error(account: str, error: steam.WorkerError) -> None:
+            errors.append((account, error))
+
+        async with fleet:
+            async with asyncio.timeout(60):
+                await fleet.wait_until_ready()
+            assert len(server.sessions) == len(ACCOUNTS)
+            await asyncio.sleep(0)
+            ((account, error),) = errors
+            assert account == "broken" and error.type == "ValueError"
+            assert all(worker.restarts == 0 for worker in fleet._workers.values())
+            assert await fleet.call("bot1", "is_ready") is True
+            with pytest.raises(steam.WorkerError) as exc_info:
+                await fleet.call("bot1", "_connect")
+            assert exc_info.value.type == "AttributeError"
+            with pytest.raises(ValueError):
+                await fleet.call("bot9", "is_ready")
+
+            message = asyncio.create_task(fleet.wait_for("message", timeout=30))
+            await server.sessions[0].send(*chat_flood(DEFAULT_ID64 + 10, 1, content="hi"))
+            event: steam.FleetEvent = await message
+            assert event.account in ACCOUNTS and event.shard == fleet.shard_for(event.account)
+            assert event.args[0]["content"] == "hi"
+            assert event.args[0]["author"] == DEFAULT_ID64 + 10
+
+            # kill a worker, it should be restarted and its accounts logged in again
+            crashed = asyncio.create_task(fleet.wait_for("worker_crash", timeout=30))
+            worker = fleet._workers[fleet.shard_for("bot1")]
+            assert worker.process is not None
+            worker.process.kill()
+            shard, exit_code = await crashed
+            assert shard == worker.shard and exit_code != 0
+            async with asyncio.timeout(60):
+                await fleet.wait_until_ready()
+            assert worker.restarts == 1
+            assert await fleet.call("bot1", "is_ready") is True
+            processes = [worker.process for worker in fleet._workers.values()]
+
+    assert all(process is not None and process.exitcode == 0 for process in processes)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+import pytest
+
+import steam
+from steam.gateway import CONNECT_RACE_SIZE, CMListCache, connect_to_first, rank_cms
+from steam.replay import DEFAULT_ID64, FakeCMServer, LogonScenario
+from tests.unit.test_replay import login, logout
+
+SERVERS = [{"endpoint": f"cm{idx}.steamserver.net:443", "load": idx, "wtd_load": idx} for idx in range(3)]
+
+
+def test_cm_list_cache(tmp_path: Path) -> None:
+    cache = CMListCache(tmp_path / "cms.json", ttl=60)
+    assert cache.load() is None
+
+    cache.save(0, SERVERS)  # type: ignore
+    assert cache.load() == SERVERS
+    assert cache.load(cell_id=1) is None
+
+    cache.discard("cm1.steamserver.net:443")
+    assert cache.load() == [SERVERS[0], SERVERS[2]]
+
+    data = json.loads(cache.path.read_text())
+    data["fetched_at"] = time.time() - 61
+    cache.path.write_text(json.dumps(data))
+    assert cache.load() is None
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def fake_cm(url: str, delay: float, fails: bool = False, cache: CMListCache | None = None) -> Any:
+    async def connect() -> FakeSocket:
+        await asyncio.sleep(delay)
+        if fails:
+            raise aiohttp.ClientConnectionError(url)
+        return FakeSocket()
+
+    return SimpleNamespace(url=url, weighted_load=0, connect=connect, _state=SimpleNamespace(cm_list_cache=cache))
+
+
+@pytest.mark.asyncio
+async def test_connect_to_first(tmp_path: Path) -> None:
+    cache = CMListCache(tmp_path / "cms.json")
+    cache.save(0, SERVERS)  # type: ignore
+    cms = [
+        fake_cm("cm0.steamserver.net:443", 0, fails=True, cache=cache),  # fails straight away, so the next starts
+        fake_cm("cm1.steamserver.net:443", 5),  # hangs
+        fake_cm("cm2.steamserver.net:443", 0.05),
+    ]
+    start = time.perf_counter()
+    result = await connect_to_first(cms)
+    assert time.perf_counter() - start < 1
+    assert result is not None
+    cm, socket = result
+    assert cm is cms[2] and not socket.closed
+    assert "cm0.steamserver.net:443" not in [server["endpoint"] for server in cache.load()]  # type: ignore
+
+    assert await connect_to_first([fake_cm("cm0.steamserver.net:443", 0, fails=True)]) is None
+
+
+@pytest.mark.asyncio
+async def test_rank_cms() -> None:
+    def pinged(url: str, latency: float, load: float) -> Any:
+        async def ping() -> float:
+            cm.latency = latency
+            return load
+
+        cm = SimpleNamespace(url=url, latency=float("inf"), ping=ping)
+        return cm
+
+    cms = [
+        pinged("unreachable", float("inf"), float("inf")),
+        pinged("slow", 0.5, 0),
+        pinged("busy", 0.1, 400),
+        pinged("fast", 0.05, 10),
+        pinged("ok", 0.2, 0),
+    ]
+    ranked = [cm.url for cm in await rank_cms(cms)]
+    assert ranked == ["fast", "ok", "slow", "busy", "unreachable"]
+
+    # accounts are spread over the best CMs, always picking the same one for the same key
+    firsts = {(await rank_cms(cms, spread_key=key))[0].url for key in range(CONNECT_RACE_SIZE)}
+    assert firsts == set(ranked[:CONNECT_RACE_SIZE])
+    assert (await rank_cms(cms, spread_key=6))[0].url == (await rank_cms(cms, spread_key=6))[0].url
+
+
+@pytest.mark.asyncio
+async def test_login_skips_dead_cm() -> None:
+    async with FakeCMServer(LogonScenario()) as server:
+        client = steam.Client(cms=["ws://127.0.0.1:1/cmsocket/", server.url])
+        task = await login(client)
+        assert client.ws is not None and client.ws.cm.url == server.url
+        await logout(client, task)
+
+
+class FriendsScenario(LogonScenario):
+    def __init__(self, friend_ids: list[int]):
+        super().__init__(friend_ids=friend_ids)
+        self.requested: list[list[int]] = []
+
+    async def friend_data(self, session: Any, msg: Any) -> None:
+        if requested := [id64 for id64 in msg.friends if id64 != DEFAULT_ID64]:
+            self.requested.append(requested)
+        await super().friend_data(session, msg)
+
+
+@pytest.mark.asyncio
+async def test_resume_keeps_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay, *args: sleep(min(delay, 0.01), *args))  # skip the throttle
+    scenario = FriendsScenario([DEFAULT_ID64 + 1, DEFAULT_ID64 + 2])
+    added: list[steam.Friend] = []
+    removed: list[steam.Friend] = []
+
+    async with FakeCMServer(scenario) as server:
+        client = steam.Client(cms=[server.url], resume=True)
+
+        @client.event
+        async def on_friend_add(friend: steam.Friend) -> None:
+            added.append(friend)
+
+        @client.event
+        async def on_friend_remove(friend: steam.Friend) -> None:
+            removed.append(friend)
+
+        task = await login(client)
+        user = client.user
+        kept = client.get_user(DEFAULT_ID64 + 2)
+        assert scenario.requested == [[DEFAULT_ID64 + 1, DEFAULT_ID64 + 2]]
+
+        scenario.friend_ids = [DEFAULT_ID64 + 2, DEFAULT_ID64 + 3]
+        ready = asyncio.create_task(client.wait_for("ready", timeout=10))
+        await (await server.wait_for_session()).socket.close()
+        await ready
+        await asyncio.sleep(0.05)
+
+        assert client.user is user
+        assert client.get_user(DEFAULT_ID64 + 2) is kept
+        assert scenario.requested[-1] == [DEFAULT_ID64 + 3]  # only the new friend is fetched
+        assert sorted(friend.id64 for friend in await client.user.friends()) == [DEFAULT_ID64 + 2, DEFAULT_ID64 + 3]
+        assert [friend.id64 for friend in added] == [DEFAULT_ID64 + 3]
+        assert [friend.id64 for friend in removed] == [DEFAULT_ID64 + 1]
+        await logout(client, task)
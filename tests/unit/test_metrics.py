@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from yarl import URL
+
+import steam
+from steam.gateway import AsyncKeepAliveHandler
+from steam.metrics import LoopLagMonitor, PrometheusMetrics, route
+from steam.replay import DEFAULT_ID64, FakeCMServer, LogonScenario, chat_flood
+from tests.unit.test_replay import login, logout
+
+
+def test_route() -> None:
+    assert route(URL("https://steamcommunity.com/profiles/76561198000000000/inventory/440/2")) == (
+        "steamcommunity.com/profiles/{id}/inventory/{id}/{id}"
+    )
+    assert route(URL("https://api.steampowered.com/IPlayerService/GetOwnedGames/v1")) == (
+        "api.steampowered.com/IPlayerService/GetOwnedGames/v1"
+    )
+
+
+def test_render() -> None:
+    metrics = PrometheusMetrics(buckets=(0.1, 1))
+    metrics.message_received("ClientPersonaState", 10)
+    metrics.message_received("ClientPersonaState", 20)
+    metrics.http_request("GET", 'example.com/"quoted"', 200, 0.5, 2)
+    metrics.rate_limited("example.com/", 4)
+    metrics.event_handled("message", 0.05, failed=True)
+    metrics.reconnected()
+
+    lines = metrics.render().splitlines()
+    assert 'steam_messages_received_total{msg="ClientPersonaState"} 2' in lines
+    assert 'steam_message_bytes_received_total{msg="ClientPersonaState"} 30' in lines
+    labels = 'method="GET",route="example.com/\\"quoted\\""'
+    assert f'steam_http_request_duration_seconds_bucket{{{labels},status="200",le="0.1"}} 0' in lines
+    assert f'steam_http_request_duration_seconds_bucket{{{labels},status="200",le="1.0"}} 1' in lines
+    assert f'steam_http_request_duration_seconds_bucket{{{labels},status="200",le="+Inf"}} 1' in lines
+    assert f"steam_http_retries_total{{{labels}}} 2" in lines
+    assert 'steam_http_rate_limit_delay_seconds_total{route="example.com/"} 4.0' in lines
+    assert 'steam_event_handler_duration_seconds_count{event="message"} 1' in lines
+    assert 'steam_event_handler_errors_total{event="message"} 1' in lines
+    assert "steam_reconnects_total 1" in lines
+    assert "# TYPE steam_listeners gauge" in lines
+
+
+@pytest.mark.asyncio
+async def test_client_reports_metrics() -> None:
+    metrics = PrometheusMetrics()
+    handled = asyncio.Event()
+
+    async with FakeCMServer(LogonScenario()) as server:
+        client = steam.Client(cms=[server.url], metrics=metrics)
+        assert metrics.client is client
+
+        @client.event
+        async def on_message(_: steam.Message) -> None:
+            handled.set()
+
+        task = await login(client)
+        session = await server.wait_for_session()
+        await session.send(*chat_flood(DEFAULT_ID64 + 1, 5))
+        async with asyncio.timeout(10):
+            await handled.wait()
+        await logout(client, task)
+
+    assert metrics.messages_sent["ClientLogon"][0] == 1
+    assert metrics.messages_received["ClientLogOnResponse"][0] == 1
+    assert metrics.messages_received["FriendMessagesClient.IncomingMessage#1"][0] == 5
+    assert metrics.messages_sent["SteamNotification.GetSteamNotifications#1"][0] == 1
+    assert metrics.events["message"].count >= 1
+    phases = ("connect", "authenticate", "logon", "client_user", "friends", "chat_groups", "emoticons", "ready")
+    assert all(metrics.logon_phases[phase].count == 1 for phase in phases)
+    assert 'steam_logon_phase_duration_seconds_count{phase="ready"} 1' in metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_task_heartbeat_and_loop_monitor() -> None:
+    metrics = PrometheusMetrics()
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.2, watchdog=True)
+
+    async with FakeCMServer(LogonScenario(heartbeat_seconds=1)) as server:
+        client = steam.Client(cms=[server.url], metrics=metrics, heartbeat="task", loop_monitor=monitor)
+        threads = threading.active_count()
+        task = await login(client)
+        assert isinstance(client.ws._keep_alive, AsyncKeepAliveHandler)  # type: ignore
+        assert monitor.is_running()
+
+        session = await server.wait_for_session()
+        async with asyncio.timeout(5):
+            while not session.heartbeats:
+                await asyncio.sleep(0.05)
+
+        time.sleep(0.5)  # block the loop so the watchdog catches it
+        await asyncio.sleep(0.05)
+        await logout(client, task)
+
+    assert not monitor.is_running()
+    assert threading.active_count() <= threads  # only the watchdog, which has stopped, was started
+    assert monitor.blocked >= 1 and monitor.max_lag >= 0.4
+    assert any(__file__ in site for site, _ in monitor.top_call_sites())
+    assert metrics.loop_lags.count > 1
+    assert "steam_event_loop_lag_seconds_count" in metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_shared_metrics() -> None:
+    metrics = PrometheusMetrics()
+    monitor = LoopLagMonitor()
+    clients = [steam.Client(metrics=metrics, loop_monitor=monitor) for _ in range(3)]
+    assert metrics.clients == tuple(clients) and metrics.client is clients[0]
+    monitor._clients.update(clients)
+
+    monitor._record(0.01)
+    assert metrics.loop_lags.count == 1  # once for the whole pool
+
+    await clients[0].close()
+    assert metrics.clients == tuple(clients[1:]) and metrics.client is clients[1]
+    metrics.bind(clients[1])
+    assert metrics.clients == tuple(clients[1:])
+    for client in clients[1:]:
+        await client.close()
+    assert metrics.clients == () and metrics.client is None
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import pytest
+
+import steam
+from steam.replay import DEFAULT_ID64, FakeCMServer, LogonScenario, make_refresh_token
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter() -> None:
+    limiter = steam.RateLimiter(per_second=100)
+    start = time.monotonic()
+    await asyncio.gather(*(limiter.acquire("example.com") for _ in range(5)))
+    await limiter.acquire("other.example.com")  # hosts are limited separately
+    assert 0.03 <= time.monotonic() - start < 0.5
+
+    limiter.back_off("example.com", 0.1)
+    start = time.monotonic()
+    await limiter.acquire("example.com")
+    assert time.monotonic() - start >= 0.09
+    assert limiter.waited > 0.1
+
+
+@pytest.mark.asyncio
+async def test_pool_shares_resources() -> None:
+    metrics = steam.PrometheusMetrics()
+    async with (
+        FakeCMServer(LogonScenario()) as server,
+        steam.ClientPool(login_interval=0.05, cms=[server.url], metrics=metrics) as pool,
+    ):
+        clients = [pool.add() for _ in range(3)]
+        started: list[float] = []
+        for idx, client in enumerate(clients):
+            await pool.login(client, refresh_token=make_refresh_token(DEFAULT_ID64 + idx))
+            started.append(time.monotonic())
+        async with asyncio.timeout(10):
+            await pool.wait_until_ready()
+
+        assert started[-1] - started[0] >= 0.09  # logins are staggered
+        assert [client.user.id64 for client in clients] == [DEFAULT_ID64 + idx for idx in range(3)]
+        assert all(client.http._session.connector is pool.connector for client in clients)
+        assert all(client._state.cm_list_cache is pool.cm_list_cache for client in clients)
+        assert all(client.http._rate_limiter is pool.rate_limiter for client in clients)
+        assert all(client._heartbeat == "task" for client in clients)
+        assert metrics.clients == tuple(clients)
+        assert metrics.messages_received["ClientLogOnResponse"][0] == 3
+        assert "steam_clients 3" in metrics.render().splitlines()
+        connector = pool.connector
+
+    assert all(client.is_closed() for client in clients)
+    assert connector.closed
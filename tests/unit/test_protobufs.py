@@ -0,0 +1,38 @@
+import importlib
+import subprocess
+import sys
+
+import pytest
+
+from steam.protobufs import LAZY_EMSGS, LAZY_MODULES, LAZY_UM_SERVICES, ProtobufMessage, UnifiedMessage
+
+
+@pytest.mark.parametrize("name", sorted(LAZY_MODULES))
+def test_lazy_module_index(name: str) -> None:
+    module = importlib.import_module(f"steam.protobufs.{name}")
+    services = set()
+    emsgs = set()
+    for value in vars(module).values():
+        if not isinstance(value, type) or value.__module__ != module.__name__:
+            continue
+        if issubclass(value, UnifiedMessage):
+            services.add(value.UM_NAME.partition(".")[0])
+        elif issubclass(value, ProtobufMessage):
+            emsgs.add(value.MSG)
+
+    assert services == {service for service, module_name in LAZY_UM_SERVICES.items() if module_name == name}
+    assert emsgs == {emsg for emsg, module_name in LAZY_EMSGS.items() if module_name == name}
+
+
+def test_lazy_modules_are_lazy() -> None:
+    code = """
+import sys
+import steam
+from steam.protobufs import LAZY_MODULES
+from steam.protobufs.msg import get_um
+
+assert not any(f"steam.protobufs.{name}" in sys.modules for name in LAZY_MODULES)
+assert get_um("TwoFactor.QueryStatus#1", True).__name__ == "StatusResponse"
+assert "steam.protobufs.two_factor" in sys.modules
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,90 @@
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+
+import steam
+from steam.gateway import ConnectionClosed
+from steam.replay import (
+    DEFAULT_ID64,
+    CMRecorder,
+    FakeCMServer,
+    LogonScenario,
+    Recording,
+    ReplayScenario,
+    chat_flood,
+    make_refresh_token,
+    multi,
+)
+
+FRIEND_ID64 = DEFAULT_ID64 + 1
+
+
+async def login(client: steam.Client) -> asyncio.Task[None]:
+    task = asyncio.create_task(client.login(refresh_token=make_refresh_token()))
+    async with asyncio.timeout(10):
+        await client.wait_until_ready()
+    return task
+
+
+async def logout(client: steam.Client, task: asyncio.Task[None]) -> None:
+    await client.close()
+    try:
+        async with asyncio.timeout(10):
+            await task
+    except* ConnectionClosed:  # the websocket closing after the client has closed isn't handled by login
+        pass
+
+
+def test_recording_round_trip() -> None:
+    file = io.BytesIO()
+    recorder = CMRecorder(file)
+    recorder.record(True, b"\x01\x02")
+    recorder.record(False, memoryview(b"\x03"))
+    data = file.getvalue()
+
+    recording = Recording.load(io.BytesIO(data))
+    assert [(frame.sent, frame.data) for frame in recording] == [(True, b"\x01\x02"), (False, b"\x03")]
+    assert recording[0].timestamp <= recording[1].timestamp
+
+    with pytest.raises(ValueError):
+        Recording.load(io.BytesIO(b"not a recording"))
+
+
+@pytest.mark.asyncio
+async def test_login_to_fake_cm(tmp_path: Path) -> None:
+    path = tmp_path / "logon.rec.gz"
+    recorder = CMRecorder(path)
+    messages: list[steam.Message] = []
+
+    async with FakeCMServer(LogonScenario(friend_ids=[FRIEND_ID64])) as server:
+        client = steam.Client(cms=[server.url], recorder=recorder)
+
+        @client.event
+        async def on_message(message: steam.Message) -> None:
+            messages.append(message)
+
+        task = await login(client)
+        assert client.user.id64 == DEFAULT_ID64
+        assert [friend.id64 for friend in await client.user.friends()] == [FRIEND_ID64]
+
+        session = await server.wait_for_session()
+        await session.send(*chat_flood(FRIEND_ID64, 50), multi(*chat_flood(FRIEND_ID64, 50)))
+        async with asyncio.timeout(10):
+            while len(messages) < 100:
+                await asyncio.sleep(0.01)
+        await logout(client, task)
+    recorder.close()
+
+    recording = Recording.load(path)
+    assert recording.frames[0].sent  # the client says hello first
+    assert any(not frame.sent and frame.msg == steam.protobufs.EMsg.Multi for frame in recording)
+
+    # the client can log in against the recording without a scenario
+    async with FakeCMServer(scenario := ReplayScenario(recording, timeout=1)) as server:
+        client = steam.Client(cms=[server.url])
+        task = await login(client)
+        assert [friend.id64 for friend in await client.user.friends()] == [FRIEND_ID64]
+        await logout(client, task)
+    assert not scenario.skipped
@@ -0,0 +1,105 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from steam import _scrape
+
+MEMBERS_PAGE = """
+<div class="group_paging">
+    <p>Showing <span>1 - 2</span> of 3 pages</p>
+</div>
+<div class="member_block officer" data-miniprofile="1">ignored, not in the member list</div>
+<div id="memberList">
+    <div class="member_block" data-miniprofile="{}"><a>first</a></div>
+    <div data-miniprofile="{}" class="online member_block"><a>second</a></div>
+</div>
+"""
+INVITES_PAGE = """
+<div class="invite_row">
+    <a class="linkStandard steamLink" href="javascript:OpenGroupChat( '103582791429521412' )">A clan</a>
+    <a class="linkStandard" href="https://steamcommunity.com/profiles/76561198000000001" data-miniprofile="1">them</a>
+</div>
+<div class="invite_row">
+    <a class="linkStandard steamLink" href="javascript:OpenGroupChat( '103582791429521413' )">Another clan</a>
+    <a class="linkStandard" href="https://steamcommunity.com/profiles/76561198000000002" data-miniprofile="2">them</a>
+</div>
+"""
+RSS = """<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0"><channel>
+<item><guid isPermaLink="true">https://steamcommunity.com/gid/1/announcements/detail/123</guid></item>
+<item><guid isPermaLink="true">https://steamcommunity.com/gid/1/announcements/detail/456</guid></item>
+</channel></rss>
+"""
+EVENTS = """<response><results>
+<div class="eventBlock"><div class="eventBlockTitle">
+    <a class="headlineLink" href="https://steamcommunity.com/groups/a/events/789">An event</a>
+</div></div>
+</results></response>
+"""
+
+
+@pytest.mark.parametrize(
+    "page",
+    [MEMBERS_PAGE, MEMBERS_PAGE.replace('data-miniprofile="{}"', "data-miniprofile={}")],  # the second falls back
+)
+def test_clan_members_page(page: str) -> None:
+    assert _scrape.clan_members_page(page.format(10, 11)) == (2, [10, 11])
+
+
+def test_clan_invitees() -> None:
+    expected = {103582791429521412: 76561197960265729, 103582791429521413: 76561197960265730}
+    assert _scrape.clan_invitees(INVITES_PAGE) == expected
+    assert _scrape._clan_invitees_soup(INVITES_PAGE) == expected
+    assert _scrape.clan_invitees("<p>No pending invites</p>") == {}
+
+
+def test_clan_announcement_and_event_ids() -> None:
+    assert _scrape.clan_announcement_ids(RSS) == _scrape._clan_announcement_ids_soup(RSS) == [123, 456]
+    assert _scrape.clan_event_ids(EVENTS) == [789]
+    unquoted = EVENTS.replace('"https://steamcommunity.com/groups/a/events/789"', "/groups/a/events/789")
+    assert _scrape.clan_event_ids(unquoted) == [789]  # falls back
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, charset: str | None = None):
+        self.body = body
+        self.charset = charset
+        self.read_chunks = 0
+        self.content = self
+
+    async def iter_chunked(self, size: int) -> Any:
+        for idx in range(0, len(self.body), size):
+            self.read_chunks += 1
+            await asyncio.sleep(0)
+            yield self.body[idx : idx + size]
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self) -> str:
+        return self.body.decode("latin-1")
+
+
+@pytest.mark.asyncio
+async def test_search_stops_reading_once_found() -> None:
+    page = (
+        '<script type="text/javascript">var g_rgAppContextData = {"440":{"appid":440,"name":"Team Fortress 2"}};\n'
+        + "<div>ünïcode</div>" * _scrape.CHUNK_SIZE
+        + "</script>"
+    ).encode()
+    r = FakeResponse(page)
+    match, html = await _scrape.search(r, _scrape.INVENTORY_INFO_RE)  # type: ignore
+    assert r.read_chunks == 1
+    assert _scrape.inventory_info(match, html)["440"]["name"] == "Team Fortress 2"
+
+    r = FakeResponse(b"<p>private</p>")
+    match, html = await _scrape.search(r, _scrape.INVENTORY_INFO_RE)  # type: ignore
+    with pytest.raises(ValueError):
+        _scrape.inventory_info(match, html)
+
+
+@pytest.mark.asyncio
+async def test_read_text() -> None:
+    assert await _scrape.read_text(FakeResponse("ü".encode())) == "ü"  # type: ignore
+    assert await _scrape.read_text(FakeResponse("ü".encode("latin-1"))) == "ü"  # type: ignore  # not UTF-8
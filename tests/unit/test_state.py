@@ -0,0 +1,467 @@
+import asyncio
+import gzip
+import zlib
+from copy import copy
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import steam
+from steam import User
+from steam._const import WRITE_U32, TaskGroup
+from steam.chat import _MemberStore
+from steam.clan import Clan
+from steam.gateway import SteamWebSocket
+from steam.protobufs import EMsg, base, chat, client_server, friends, notifications
+from steam.state import ConnectionState, NotificationPoller
+from tests.unit.mocks import USER_DATA
+from tests.unit.test_scrape import MEMBERS_PAGE
+
+
+@pytest.mark.asyncio
+async def test_notification_poller_coalesces() -> None:
+    responses = [
+        [],
+        [notifications.SteamNotificationData(notification_id=1, notification_type=3)],
+    ]
+
+    async def fetch_notifications() -> list[notifications.SteamNotificationData]:
+        await asyncio.sleep(0)
+        return responses.pop(0)
+
+    async with TaskGroup() as tg:
+        state = SimpleNamespace(_tg=tg, _handled_notification_ids={}, fetch_notifications=fetch_notifications)
+        poller = NotificationPoller(state, initial_delay=0, max_polls=5)  # type: ignore
+        for _ in range(10):
+            poller.trigger()
+
+    assert poller.triggers == 10
+    assert poller.coalesced == 9
+    assert poller.polls == 2
+    assert not poller.is_running()
+
+
+@pytest.mark.asyncio
+async def test_notification_poller_gives_up() -> None:
+    async def fetch_notifications() -> list[notifications.SteamNotificationData]:
+        return [notifications.SteamNotificationData(notification_id=1, notification_type=3)]
+
+    async with TaskGroup() as tg:
+        state = SimpleNamespace(_tg=tg, _handled_notification_ids={1: None}, fetch_notifications=fetch_notifications)
+        poller = NotificationPoller(state, initial_delay=0, max_polls=3)  # type: ignore
+        poller.trigger()
+
+    assert poller.polls == 3
+
+
+def make_state() -> tuple[ConnectionState, list[tuple[Any, ...]]]:
+    client = steam.Client()
+    dispatched: list[tuple[Any, ...]] = []
+    client._state.dispatch = lambda *args: dispatched.append(args)  # type: ignore
+    return client._state, dispatched
+
+
+@pytest.mark.asyncio
+async def test_persona_state_update_skips_unchanged() -> None:
+    state, dispatched = make_state()
+    user = User(state, USER_DATA)
+    state._users.store(user)
+
+    state.parse_persona_state_update(friends.CMsgClientPersonaState(friends=[USER_DATA]))
+    assert not dispatched
+
+    changed = copy(USER_DATA)
+    changed.player_name = "a new name"
+    state.parse_persona_state_update(friends.CMsgClientPersonaState(friends=[changed]))
+    ((event, before, after),) = dispatched
+    assert event == "user_update"
+    assert before.name == "a user"
+    assert after is user
+    assert after.name == "a new name"
+
+
+@pytest.mark.asyncio
+async def test_persona_state_update_coalesces() -> None:
+    state, dispatched = make_state()
+    state.user_update_window = 0.01
+    user = User(state, USER_DATA)
+    state._users.store(user)
+
+    for name in ("first", "second", "third"):
+        changed = copy(USER_DATA)
+        changed.player_name = name
+        state.parse_persona_state_update(friends.CMsgClientPersonaState(friends=[changed]))
+    assert not dispatched
+    await asyncio.sleep(0.02)
+
+    ((_, before, after),) = dispatched
+    assert before.name == "a user"
+    assert after.name == "third"
+
+
+def make_multi(count: int, *, zipped: bool) -> tuple[base.CMsgMulti, list[bytes]]:
+    frames = [
+        bytes(friends.CMsgClientPersonaState(friends=[USER_DATA], status_flags=idx)) for idx in range(count)
+    ]
+    body = b"".join(WRITE_U32(len(frame)) + frame for frame in frames)
+    if zipped:
+        return base.CMsgMulti(size_unzipped=len(body), message_body=gzip.compress(body)), frames
+    return base.CMsgMulti(message_body=body), frames
+
+
+@pytest.mark.parametrize("zipped", [False, True])
+def test_handle_multi(zipped: bool) -> None:
+    msg, frames = make_multi(100, zipped=zipped)
+    received: list[bytes] = []
+    state = SimpleNamespace(ws=SimpleNamespace(receive=lambda frame: received.append(bytes(frame))))
+    ConnectionState.handle_multi(state, msg)  # type: ignore
+    assert received == frames
+
+
+def test_handle_multi_size_mismatch() -> None:
+    msg, _ = make_multi(10, zipped=True)
+    msg.size_unzipped -= 1
+    received: list[bytes] = []
+    state = SimpleNamespace(ws=SimpleNamespace(receive=received.append))
+    ConnectionState.handle_multi(state, msg)  # type: ignore
+    assert not received
+
+
+def test_handle_multi_parses() -> None:
+    msg, frames = make_multi(100, zipped=True)
+    parsed: list[friends.CMsgClientPersonaState] = []
+    ws = SimpleNamespace(
+        _state=SimpleNamespace(parsers={EMsg.ClientPersonaState: lambda _, msg: parsed.append(msg)}),
+        listeners=[],
+        _metrics=None,
+    )
+    state = SimpleNamespace(ws=SimpleNamespace(receive=lambda frame: SteamWebSocket.receive(ws, frame)))  # type: ignore
+    ConnectionState.handle_multi(state, msg)  # type: ignore
+
+    assert len(parsed) == len(frames)
+    assert isinstance(parsed[0].friends[0].avatar_hash, bytes)
+
+
+def test_um_parsers() -> None:
+    assert ConnectionState.um_parsers[chat.IncomingChatMessageNotification.UM_NAME] == (
+        chat.IncomingChatMessageNotification,
+        ConnectionState.handle_chat_message,
+    )
+    assert ConnectionState.parsers[EMsg.ServiceMethod] is ConnectionState.parse_um
+
+
+@pytest.mark.asyncio
+async def test_parse_um() -> None:
+    client = steam.Client()
+    state = client._state
+    handled: list[Any] = []
+
+    async def async_parser(_: ConnectionState, msg: chat.IncomingChatMessageNotification) -> None:
+        handled.append(msg)
+
+    listened: list[Any] = []
+    client.add_um_listener(chat.IncomingChatMessageNotification, listened.append)
+    state.um_parsers = {  # type: ignore
+        chat.IncomingChatMessageNotification.UM_NAME: (chat.IncomingChatMessageNotification, async_parser),
+        chat.MessageReactionNotification.UM_NAME: (chat.MessageReactionNotification, lambda _, msg: handled.append(msg)),
+    }
+
+    msg = chat.IncomingChatMessageNotification(message="hello")
+    result = state.parse_um(msg)
+    assert listened == [msg]
+    assert not handled
+    assert result is not None
+    await result
+    assert handled == [msg]
+
+    reaction = chat.MessageReactionNotification()
+    assert state.parse_um(reaction) is None  # sync parsers run inline
+    assert handled == [msg, reaction]
+
+    assert state.parse_um(chat.GetMyChatRoomGroupsRequest()) is None  # no parser for the request
+    client.remove_um_listener(chat.IncomingChatMessageNotification, listened.append)
+    assert not state.um_listeners
+
+
+def make_ticket(id64: int) -> Any:
+    auth_ticket = id64.to_bytes(8, "little") * 6
+    return SimpleNamespace(
+        app=SimpleNamespace(id=440),
+        user=SimpleNamespace(id64=id64),
+        auth_ticket=auth_ticket,
+        crc=zlib.crc32(auth_ticket),
+        is_valid=lambda: True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_auth_list_batches() -> None:
+    state, dispatched = make_state()
+    sent: list[client_server.CMsgClientAuthList] = []
+
+    async def send_proto_and_wait(msg: client_server.CMsgClientAuthList, check: Any) -> Any:
+        sent.append(msg)
+        ack = client_server.CMsgClientAuthListAck(message_sequence=msg.message_sequence)
+        assert check(ack)
+        return ack
+
+    tickets = [make_ticket(id64) for id64 in range(76561198000000001, 76561198000000004)]
+    async with TaskGroup() as tg:
+        state.client.ws = SimpleNamespace(tg=tg, send_proto_and_wait=send_proto_and_wait)  # type: ignore
+        state.client.http.user = SimpleNamespace(id64=76561198000000000)  # type: ignore
+        await asyncio.gather(*(state.activate_auth_session_tickets(ticket) for ticket in tickets))
+        assert len(sent) == 1
+        assert [ticket.ticket_crc for ticket in sent[0].tickets] == [ticket.crc for ticket in tickets]
+
+        state.handle_ticket_auth_complete(
+            client_server.CMsgClientTicketAuthComplete(ticket_crc=tickets[1].crc, eauth_session_response=5)
+        )
+        assert dispatched[0][:2] == ("authentication_ticket_update", tickets[1])
+        assert tickets[1].crc not in state._active_auth_tickets_by_crc
+
+        await asyncio.gather(*(state.deactivate_auth_session_tickets(ticket) for ticket in tickets[::2]))
+        assert len(sent) == 2
+        assert not sent[1].tickets and sent[1].message_sequence == 2
+        state.client.ws = None
+
+
+@pytest.mark.asyncio
+async def test_verify_many() -> None:
+    state, _ = make_state()
+    fetched: list[list[int]] = []
+    in_flight = max_in_flight = 0
+
+    async def verify_app_ticket(app_id: int, ticket: str, key: str | None) -> dict[str, Any]:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        id64 = int(ticket[:2])
+        return {"result": "OK", "steamid": id64, "ownersteamid": id64 + 1, "vacbanned": False, "publisherbanned": False}
+
+    async def _maybe_users(id64s: Any) -> list[Any]:
+        id64s = list(id64s)
+        fetched.append(id64s)
+        return [SimpleNamespace(id64=id64) for id64 in id64s]
+
+    state.http.verify_app_ticket = verify_app_ticket  # type: ignore
+    state._maybe_users = _maybe_users  # type: ignore
+    tickets = [
+        SimpleNamespace(_state=state, app=SimpleNamespace(id=440), _ticket=SimpleNamespace(buffer=bytes([id64])))
+        for id64 in (0x10, 0x20)
+    ]
+    results = await steam.AuthenticationTicket.verify_many(tickets)  # type: ignore
+    assert fetched == [[10, 11, 20, 21]]
+    assert [(result.user.id64, result.owner.id64) for result in results] == [(10, 11), (20, 21)]
+    assert all(results)
+
+    tickets *= 10
+    assert len(await steam.AuthenticationTicket.verify_many(tickets)) == 20  # type: ignore
+    assert max_in_flight == steam.app.MAX_CONCURRENT_VERIFICATIONS
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_coalesced_and_batched() -> None:
+    state, _ = make_state()
+    batches: list[list[int]] = []
+
+    async def load_users(id64s: list[int]) -> dict[int, Any]:
+        batches.append(id64s)
+        await asyncio.sleep(0.01)
+        return {id64: SimpleNamespace(id64=id64) for id64 in id64s if id64 != 0}
+
+    state._user_loader.load_batch = load_users  # type: ignore
+    ids = [USER_DATA.friendid + idx for idx in range(250)]
+    results = await asyncio.gather(
+        state.fetch_users(ids[:150]),
+        state.fetch_users(ids[100:]),
+        state.fetch_user(ids[0]),
+        state._maybe_users([ids[0], 0]),
+    )
+    assert sorted(map(len, batches)) == [51, 100, 100]  # every ID is only requested once, in full batches
+    assert [user.id64 for user in results[0]] == ids[:150]
+    assert results[2].id64 == ids[0]
+    assert results[3][1] is None
+
+    calls = 0
+
+    async def load_player_count(app_ids: list[int]) -> dict[int, int]:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError(app_ids)
+
+    state._player_count_loader.load_batch = load_player_count  # type: ignore
+    cancelled = asyncio.create_task(state.fetch_app_player_count(440))
+    waiting = [asyncio.create_task(state.fetch_app_player_count(440)) for _ in range(3)]
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    results = await asyncio.gather(*waiting, return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)  # the cancelled caller didn't cancel the others
+
+
+@pytest.mark.asyncio
+async def test_fetch_users_enriched() -> None:
+    state, _ = make_state()
+    ids = [USER_DATA.friendid + idx for idx in range(250)]
+    user_batches: list[list[int]] = []
+    ban_batches: list[tuple[int, ...]] = []
+    badge_calls: list[int] = []
+
+    async def load_users(id64s: list[int]) -> dict[int, Any]:
+        user_batches.append(id64s)
+        await asyncio.sleep(0)
+        return {id64: SimpleNamespace(id64=id64) for id64 in id64s}
+
+    async def get_user_bans(*id64s: int) -> list[dict[str, Any]]:
+        ban_batches.append(id64s)
+        return [
+            {
+                "steamid": id64,
+                "community_banned": False,
+                "vac_banned": id64 == ids[0],
+                "number_of_vac_bans": 0,
+                "days_since_last_ban": 0,
+                "number_of_game_bans": 0,
+                "economy_ban": "none",
+            }
+            for id64 in id64s
+        ]
+
+    async def load_levels(id32s: list[int]) -> dict[int, int]:
+        return dict.fromkeys(id32s, 10)
+
+    async def get_user_badges(id64: int) -> dict[str, Any]:
+        badge_calls.append(id64)
+        return {
+            "player_level": 10,
+            "player_xp": 0,
+            "player_xp_needed_to_level_up": 0,
+            "player_xp_needed_current_level": 0,
+            "badges": [],
+        }
+
+    state._user_loader.load_batch = load_users  # type: ignore
+    state._level_loader.load_batch = load_levels  # type: ignore
+    state.http.get_user_bans = get_user_bans  # type: ignore
+    state.http.get_user_badges = get_user_badges  # type: ignore
+
+    cache: dict[int, steam.EnrichedUser] = {}
+    records = [record async for record in state.fetch_users_enriched(ids, {"user", "ban", "level"}, 2, cache)]
+    assert sorted(record.id64 for record in records) == ids
+    assert sorted(map(len, user_batches)) == sorted(map(len, ban_batches)) == [50, 100, 100]
+    assert all(record.user is not None and record.level == 10 for record in records)
+    assert cache[ids[0]].ban is not None and cache[ids[0]].ban.is_vac_banned()
+
+    user_batches.clear()
+    ban_batches.clear()
+    records = [record async for record in state.fetch_users_enriched(ids[:3], {"ban", "badges"}, 2, cache)]
+    assert not user_batches and not ban_batches  # only the missing badges were fetched
+    assert sorted(badge_calls) == ids[:3]
+    assert all(record.badges is not None and record.badges.level == 10 for record in records)
+    assert records[0].fields == {"user", "ban", "level", "badges"}
+
+    async def fail_badges(id64: int) -> dict[str, Any]:
+        await asyncio.sleep(0.01)  # after the level has been fetched
+        raise steam.HTTPException(SimpleNamespace(status=500, reason="", headers={}), "")  # type: ignore
+
+    state.http.get_user_badges = fail_badges  # type: ignore
+    cache[ids[3]] = cached = steam.EnrichedUser(ids[3], fields=frozenset({"user"}))  # type: ignore
+    with pytest.raises(ExceptionGroup):
+        [record async for record in state.fetch_users_enriched(ids[3:4], {"level", "badges"}, 2, cache)]
+    assert cache[ids[3]] is cached and cached == steam.EnrichedUser(ids[3], fields=frozenset({"user"}))  # type: ignore
+
+    with pytest.raises(ValueError):
+        await anext(state.fetch_users_enriched(ids, {"friends"}, 2, None))
+
+
+def test_member_store_is_compact() -> None:
+    store = _MemberStore(
+        [
+            chat.Member(1, state=chat.EChatRoomJoinState.Joined, rank=chat.EChatRoomGroupRank.Officer),
+            chat.Member(2, state=chat.EChatRoomJoinState.Joined, rank=chat.EChatRoomGroupRank.Member),
+            chat.Member(3, state=chat.EChatRoomJoinState.Joined, rank=chat.EChatRoomGroupRank.Member, role_ids=[7]),
+        ]
+    )
+    assert len(store) == 3 and list(store) == [1, 2, 3]
+    assert store[1].rank == chat.EChatRoomGroupRank.Officer
+    assert store[3].role_ids == [7]
+    assert store._states[2] is store._SHARED[(chat.EChatRoomGroupRank.Member, chat.EChatRoomJoinState.Joined)]
+
+    assert store.pop(3).role_ids == [7]
+    store[2] = chat.Member(2, state=chat.EChatRoomJoinState.Joined, time_kick_expire=1)
+    assert 2 in store and store[2].time_kick_expire == 1
+    del store[2]
+    assert 2 not in store and len(store) == 1
+    with pytest.raises(KeyError):
+        del store[2]
+
+
+@pytest.mark.asyncio
+async def test_clan_member_pages_are_fetched_concurrently() -> None:
+    state, _ = make_state()
+    in_flight = max_in_flight = 0
+
+    async def get(url: str, params: dict[str, Any]) -> str:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        page = params["p"]
+        await asyncio.sleep(0.01 * (10 - page))  # later pages finish first
+        in_flight -= 1
+        return MEMBERS_PAGE.replace("1 - 2", "1 - 9").format(page * 2, page * 2 + 1)
+
+    state.http.get = get  # type: ignore
+    ids = [id async for id in state.http.get_clan_members(steam.ID(1, type=steam.Type.Clan).id64)]
+    assert ids == list(range(2, 20))  # still in page order
+    assert max_in_flight == steam.http.MAX_CONCURRENT_MEMBER_PAGES
+
+
+@pytest.mark.asyncio
+async def test_clan_stream_members() -> None:
+    state, _ = make_state()
+    clan = Clan(state, 1)
+    clan._id = 5  # type: ignore
+    clan._partial_members = _MemberStore(
+        chat.Member(USER_DATA.friendid + idx, state=chat.EChatRoomJoinState.Joined) for idx in range(250)
+    )
+    in_flight = max_in_flight = 0
+    pages: list[tuple[int, int, int]] = []
+
+    def make_user(id: int) -> User:
+        data = copy(USER_DATA)
+        data.friendid = steam.ID(id).id64
+        return User(state, data)
+
+    async def fetch_chat_group_members(_: int, __: int, change_number: int, start: int, stop: int) -> list[User]:
+        nonlocal in_flight, max_in_flight
+        pages.append((change_number, start, stop))
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        # the view skips the first member of each page
+        return [make_user(USER_DATA.friendid + idx) for idx in range(start, stop)]
+
+    looked_up: list[list[int]] = []
+
+    async def maybe_users(id64s: Any) -> list[User]:
+        id64s = list(id64s)
+        looked_up.append(id64s)
+        return [make_user(id64) for id64 in id64s]
+
+    state.fetch_chat_group_members = fetch_chat_group_members  # type: ignore
+    state._maybe_users = maybe_users  # type: ignore
+
+    members = [member async for member in clan.stream_members(max_concurrency=2)]
+    assert sorted(member.id for member in members) == sorted(clan._partial_members)
+    assert [change_number for change_number, _, _ in pages] == [1, 2, 3]
+    assert max_in_flight == 2
+    assert len(looked_up) == 1 and len(looked_up[0]) == 3  # the missing members were looked up together
+    assert not clan._members  # nothing was kept
+
+    members = await clan.chunk()
+    assert clan.chunked and len(members) == 250
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import random
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, NamedTuple
@@ -104,6 +105,25 @@ async def test_maybe_coroutine() -> None:
     assert await utils.maybe_coroutine(function_2) == 2
 
 
+@pytest.mark.asyncio
+async def test_batch_loader_cancelled() -> None:
+    started = asyncio.Event()
+
+    async def load_batch(keys: list[int]) -> dict[int, int]:
+        started.set()
+        await asyncio.sleep(10)
+        return {}
+
+    loader = utils.BatchLoader(load_batch, max_size=2)
+    waiting = asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+    await started.wait()
+    (task,) = loader._tasks
+    task.cancel()
+    assert all(isinstance(result, asyncio.CancelledError) for result in await waiting)
+    assert task.cancelled()  # the cancellation propagates rather than being swallowed
+    assert not loader._in_flight
+
+
 user_1 = utils.TradeURLInfo(
     id=ID(440528954),
     token="MpmarfFH",